@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+
+# (vault, unit nav, ts, gross exposure or None)
+NavObservation = Tuple[str, float, float, "float | None"]
+# (kind, vault, message, context)
+RuleAlert = Tuple[str, str, str, Dict[str, Any]]
+
+# deployments `alerts` keys -> VaultRules fields
+_SPEC_FIELDS = {
+    "drawdownPct": "drawdown_pct",
+    "navJumpPct": "jump_pct",
+    "staleSec": "stale_sec",
+    "maxExposure": "max_exposure",
+}
+
+
+class VaultRules:
+    """Thresholds for one vault; None disables a rule."""
+
+    __slots__ = ("drawdown_pct", "jump_pct", "stale_sec", "max_exposure", "source")
+
+    def __init__(
+        self,
+        drawdown_pct: float | None = None,
+        jump_pct: float | None = None,
+        stale_sec: float | None = None,
+        max_exposure: float | None = None,
+        source: object = None,
+    ):
+        self.drawdown_pct = drawdown_pct
+        self.jump_pct = jump_pct
+        self.stale_sec = stale_sec
+        self.max_exposure = max_exposure
+        # the spec object this was compiled from, to detect changes by identity
+        self.source = source
+
+
+def compile_rules(spec: Mapping[str, Any] | None, defaults: VaultRules) -> VaultRules:
+    """Overlay a per-vault spec (deployments `alerts` entry) on the defaults.
+
+    Non-positive or unparsable values disable the rule.
+    """
+    rules = VaultRules(defaults.drawdown_pct, defaults.jump_pct, defaults.stale_sec, defaults.max_exposure, spec)
+    if not isinstance(spec, Mapping):
+        return rules
+    for key, field in _SPEC_FIELDS.items():
+        if key not in spec:
+            continue
+        try:
+            value = float(spec[key]) if spec[key] is not None else None
+        except (TypeError, ValueError):
+            value = None
+        setattr(rules, field, value if value and value > 0 else None)
+    return rules
+
+
+class _VaultState:
+    __slots__ = ("peak", "last_nav", "last_ts", "stale_alerted", "watched")
+
+    def __init__(self) -> None:
+        self.peak: float | None = None
+        self.last_nav: float | None = None
+        self.last_ts = 0.0
+        self.stale_alerted = False
+        # has an entry in the deadline heap
+        self.watched = False
+
+
+class RuleEngine:
+    """Per-vault NAV rules evaluated over batches of snapshots.
+
+    Rules are compiled once per vault and recompiled only when the spec
+    returned by `rules_for` is a different object. With a `generation`
+    callable, `rules_for` is not consulted at all while the token it returns
+    stays the same object; it is read once per `evaluate` / `check_stale`
+    call, so a batch costs one lookup instead of one per vault. Staleness is tracked in a
+    deadline heap holding at most one entry per vault, so a check touches
+    only vaults whose deadline has come up.
+    `permit(vault, kind)` gates each alert (cooldown) before state that
+    depends on delivery is updated.
+    """
+
+    def __init__(
+        self,
+        defaults: VaultRules | None = None,
+        rules_for: Callable[[str], Mapping[str, Any] | None] | None = None,
+        generation: Callable[[], object] | None = None,
+    ):
+        self.defaults = defaults or VaultRules()
+        self._rules_for = rules_for or (lambda _vault: None)
+        self._generation = generation
+        # token the compiled rules were built under; None = check specs per call
+        self._token: object = None
+        self._compiled: Dict[str, VaultRules] = {}
+        self._state: Dict[str, _VaultState] = {}
+        # (deadline, vault); re-armed on pop if the vault has reported since
+        self._deadlines: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.evaluated = 0
+
+    def set_rule_source(
+        self,
+        rules_for: Callable[[str], Mapping[str, Any] | None],
+        generation: Callable[[], object] | None = None,
+    ) -> None:
+        with self._lock:
+            self._rules_for = rules_for
+            self._generation = generation
+            self._token = None
+            self._compiled.clear()
+
+    def set_defaults(self, defaults: VaultRules) -> None:
+        """Replace the fallback rules; every vault is recompiled against them."""
+        with self._lock:
+            self.defaults = defaults
+            self._compiled.clear()
+
+    def _sync_generation(self) -> None:
+        # caller holds _lock
+        if self._generation is None:
+            return
+        try:
+            token = self._generation()
+        except Exception:
+            token = None
+        if token is None or token is not self._token:
+            self._compiled.clear()
+            self._token = token
+
+    def rules(self, vault: str) -> VaultRules:
+        compiled = self._compiled.get(vault)
+        if compiled is not None and self._token is not None:
+            return compiled
+        try:
+            spec = self._rules_for(vault)
+        except Exception:
+            spec = None
+        if compiled is None or compiled.source is not spec:
+            compiled = self._compiled[vault] = compile_rules(spec, self.defaults)
+        return compiled
+
+    def evaluate(
+        self,
+        batch: Iterable[NavObservation],
+        permit: Callable[[str, str], bool] = lambda _v, _k: True,
+    ) -> List[RuleAlert]:
+        out: List[RuleAlert] = []
+        with self._lock:
+            self._sync_generation()
+            for vault, nav, ts, exposure in batch:
+                self.evaluated += 1
+                rules = self.rules(vault)
+                st = self._state.get(vault)
+                if st is None:
+                    st = self._state[vault] = _VaultState()
+                prev = st.last_nav
+                st.last_nav, st.last_ts, st.stale_alerted = nav, ts, False
+                if rules.stale_sec and not st.watched:
+                    st.watched = True
+                    heapq.heappush(self._deadlines, (ts + rules.stale_sec, vault))
+                if rules.jump_pct and prev and abs(nav / prev - 1.0) >= rules.jump_pct and permit(vault, "nav_jump"):
+                    pct = (nav / prev - 1.0) * 100
+                    out.append(
+                        (
+                            "nav_jump",
+                            vault,
+                            f"[VaultCraft] Vault {vault} NAV jump {pct:+.2f}%",
+                            {"nav": f"{nav:.4f}", "prev": f"{prev:.4f}"},
+                        )
+                    )
+                if rules.max_exposure and exposure is not None and exposure >= rules.max_exposure and permit(vault, "exposure"):
+                    out.append(
+                        (
+                            "exposure",
+                            vault,
+                            f"[VaultCraft] Vault {vault} exposure {exposure:.2f}x",
+                            {"limit": f"{rules.max_exposure:.2f}"},
+                        )
+                    )
+                # drawdown from the running peak; the peak resets once an alert goes out
+                if st.peak is None or nav > st.peak:
+                    st.peak = nav
+                    continue
+                if not rules.drawdown_pct or st.peak <= 0:
+                    continue
+                drawdown = (st.peak - nav) / st.peak
+                if drawdown < rules.drawdown_pct or not permit(vault, "nav"):
+                    continue
+                out.append(
+                    (
+                        "nav_drawdown",
+                        vault,
+                        f"[VaultCraft] Vault {vault} NAV drawdown {round(drawdown * 100, 2):.2f}%",
+                        {"nav": f"{nav:.4f}", "peak": f"{st.peak:.4f}"},
+                    )
+                )
+                st.peak = nav
+        return out
+
+    def check_stale(
+        self,
+        now: float,
+        permit: Callable[[str, str], bool] = lambda _v, _k: True,
+    ) -> List[RuleAlert]:
+        """Alert once for each vault whose last snapshot is older than its `stale_sec`."""
+        out: List[RuleAlert] = []
+        with self._lock:
+            self._sync_generation()
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, vault = heapq.heappop(self._deadlines)
+                st = self._state[vault]
+                st.watched = False
+                stale_sec = self.rules(vault).stale_sec
+                if not stale_sec or st.stale_alerted:
+                    continue
+                ts = st.last_ts
+                if ts + stale_sec > now:
+                    # reported since this entry was armed
+                    st.watched = True
+                    heapq.heappush(self._deadlines, (ts + stale_sec, vault))
+                    continue
+                st.stale_alerted = True
+                if permit(vault, "stale"):
+                    out.append(
+                        (
+                            "stale",
+                            vault,
+                            f"[VaultCraft] Vault {vault} NAV stale for {now - ts:.0f}s",
+                            {"lastTs": f"{ts:.0f}"},
+                        )
+                    )
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"vaults": len(self._state), "evaluated": self.evaluated, "staleWatch": len(self._deadlines)}
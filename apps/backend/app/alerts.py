@@ -1,31 +1,226 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
 import time
 
 import httpx
 
-from .settings import Settings
+from .alert_rules import NavObservation, RuleEngine, VaultRules
+from .settings import settings
+from .telemetry import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class AlertDispatcher:
+    """Delivers webhook alerts from a background event loop.
+
+    `submit` only enqueues, so callers on the order/event path never wait
+    on the webhook. A pooled `httpx.AsyncClient` does the delivery with
+    bounded concurrency and exponential-backoff retries on network errors,
+    429 and 5xx. Pending deliveries are capped; overflow is dropped.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 1000,
+        timeout: float = 5.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_connections: int = 4,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._max_queue = max(1, int(max_queue))
+        self._timeout = timeout
+        self._retries = max(0, int(retries))
+        self._backoff = max(0.0, float(backoff))
+        self._max_connections = max(1, int(max_connections))
+        self._transport = transport
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._slots: asyncio.Semaphore | None = None
+        # in-flight deliveries; the loop itself only holds weak references to tasks
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._thread: threading.Thread | None = None
+        self._cond = threading.Condition()
+        self._pending = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.latency = Histogram()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._cond:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(ready,), name="alert-dispatch", daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop  # type: ignore[return-value]
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._slots = asyncio.Semaphore(self._max_connections)
+        limits = httpx.Limits(max_connections=self._max_connections, max_keepalive_connections=self._max_connections)
+        self._client = httpx.AsyncClient(timeout=self._timeout, limits=limits, transport=self._transport)
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._client.aclose())
+            loop.close()
+
+    def submit(self, url: str, params: Dict[str, Any]) -> bool:
+        """Queue one GET to `url`; False when the queue is full and it was dropped."""
+        with self._cond:
+            if self._pending >= self._max_queue:
+                self.dropped += 1
+                return False
+            self._pending += 1
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(self._spawn, loop, url, params)
+        return True
+
+    def _spawn(self, loop: asyncio.AbstractEventLoop, url: str, params: Dict[str, Any]) -> None:
+        task = loop.create_task(self._deliver(url, params))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("alert delivery failed", exc_info=task.exception())
+
+    def call_later(self, delay: float, fn: Callable[[], None]) -> None:
+        """Run `fn` on the dispatcher loop after `delay` seconds."""
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(loop.call_later, max(0.0, delay), fn)
+
+    async def _deliver(self, url: str, params: Dict[str, Any]) -> None:
+        assert self._client is not None and self._slots is not None
+        ok = False
+        try:
+            async with self._slots:
+                for attempt in range(self._retries + 1):
+                    if attempt:
+                        self.retried += 1
+                        await asyncio.sleep(self._backoff * (2 ** (attempt - 1)))
+                    started = time.perf_counter()
+                    try:
+                        resp = await self._client.get(url, params=params)
+                    except Exception:
+                        continue
+                    finally:
+                        self.latency.observe(time.perf_counter() - started)
+                    if resp.status_code < 500 and resp.status_code != 429:
+                        ok = True
+                        break
+        finally:
+            with self._cond:
+                if ok:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+                self._pending -= 1
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every queued alert is delivered or given up; False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 2.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "pending": self._pending,
+                "sent": self.sent,
+                "failed": self.failed,
+                "retried": self.retried,
+                "dropped": self.dropped,
+                "latencySec": self.latency.snapshot(),
+            }
 
 
 class AlertManager:
-    def __init__(self) -> None:
-        self._nav_highs: Dict[str, float] = {}
+    def __init__(self, dispatcher: AlertDispatcher | None = None) -> None:
         self._last_sent: Dict[str, float] = {}
+        self._dispatcher = dispatcher
+        # digest: (kind, vault) -> messages held for the next summary
+        self._lock = threading.Lock()
+        self._digest: Dict[Tuple[str, str], List[str]] = {}
+        self._digest_scheduled = False
+        self._webhook_calls: Deque[float] = deque()
+        self.digests_sent = 0
+        self.rate_limited = 0
+        self.rules = RuleEngine()
+        # settings the current defaults were built from; checked per evaluation
+        self._defaults_key: Tuple[Any, ...] | None = None
+
+    def _get_rules(self) -> RuleEngine:
+        key = (
+            settings.ALERT_NAV_DRAWDOWN_PCT,
+            settings.ALERT_NAV_JUMP_PCT,
+            settings.ALERT_STALE_SEC,
+            settings.ALERT_MAX_EXPOSURE,
+        )
+        if key != self._defaults_key:
+            drawdown, jump, stale, exposure = key
+            self.rules.set_defaults(
+                VaultRules(
+                    drawdown_pct=drawdown or None,
+                    jump_pct=jump or None,
+                    stale_sec=stale or None,
+                    max_exposure=exposure or None,
+                )
+            )
+            self._defaults_key = key
+        return self.rules
 
-    def _settings(self) -> Settings:
-        return Settings()
+    def _get_dispatcher(self) -> AlertDispatcher:
+        if self._dispatcher is None:
+            self._dispatcher = AlertDispatcher(
+                max_queue=settings.ALERT_QUEUE_MAX,
+                timeout=settings.ALERT_TIMEOUT_SEC,
+                retries=settings.ALERT_RETRIES,
+                backoff=settings.ALERT_RETRY_BACKOFF_SEC,
+                max_connections=settings.ALERT_MAX_CONNECTIONS,
+            )
+        return self._dispatcher
 
     def _cooldown_permits(self, key: str, cooldown: float) -> bool:
         now = time.time()
-        last = self._last_sent.get(key)
-        if last is not None and now - last < cooldown:
-            return False
-        self._last_sent[key] = now
-        return True
+        # called from rule evaluation on the daemon and from event callers
+        with self._lock:
+            last = self._last_sent.get(key)
+            if last is not None and now - last < cooldown:
+                return False
+            self._last_sent[key] = now
+            return True
 
-    def _send(self, message: str, context: Dict[str, Any] | None = None) -> None:
-        settings = self._settings()
+    def _send(self, message: str, context: Dict[str, Any] | None = None, kind: str = "alert", vault: str = "") -> None:
         url = settings.ALERT_WEBHOOK_URL
         if not url:
             return
@@ -34,37 +229,100 @@ class AlertManager:
             extra = ", ".join(f"{k}={v}" for k, v in context.items())
             if extra:
                 payload = f"{message} | {extra}"
+        window = float(settings.ALERT_DIGEST_WINDOW_SEC or 0.0)
+        now = time.time()
+        send_now = False
+        schedule: float | None = None
+        with self._lock:
+            if window <= 0 and not self._digest:
+                wait = self._rate_wait(now)
+                if wait <= 0:
+                    self._webhook_calls.append(now)
+                    send_now = True
+                else:
+                    # over the cap: hold it for a summary once the cap frees up
+                    self.rate_limited += 1
+            if not send_now:
+                self._digest.setdefault((kind, vault), []).append(payload)
+                if not self._digest_scheduled:
+                    self._digest_scheduled = True
+                    schedule = max(window, self._rate_wait(now))
         try:
-            httpx.get(url, params={"message": payload}, timeout=5.0)
+            if send_now:
+                self._get_dispatcher().submit(url, {"message": payload})
+            elif schedule is not None:
+                self._get_dispatcher().call_later(schedule, self.flush_digest)
         except Exception:
             pass
 
+    def _rate_wait(self, now: float) -> float:
+        """Seconds until the per-minute webhook cap allows another call (caller holds _lock)."""
+        cap = int(settings.ALERT_MAX_SENDS_PER_MIN or 0)
+        calls = self._webhook_calls
+        while calls and now - calls[0] >= 60.0:
+            calls.popleft()
+        if cap <= 0 or len(calls) < cap:
+            return 0.0
+        return calls[-cap] + 60.0 - now
+
+    def flush_digest(self) -> None:
+        """Send everything collected as one summary (deferred again while rate-capped)."""
+        url = settings.ALERT_WEBHOOK_URL
+        now = time.time()
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        with self._lock:
+            if not self._digest:
+                self._digest_scheduled = False
+                return
+            wait = self._rate_wait(now)
+            if wait <= 0:
+                groups, self._digest = self._digest, {}
+                self._digest_scheduled = False
+                self._webhook_calls.append(now)
+                self.digests_sent += 1
+        try:
+            if wait > 0:
+                self._get_dispatcher().call_later(wait, self.flush_digest)
+            elif url:
+                self._get_dispatcher().submit(url, {"message": _format_digest(groups)})
+        except Exception:
+            pass
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return self._dispatcher.flush(timeout) if self._dispatcher is not None else True
+
+    def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.close()
+
+    def stats(self) -> Dict[str, object] | None:
+        if self._dispatcher is None:
+            return None
+        with self._lock:
+            digest = {
+                "digestPending": sum(len(v) for v in self._digest.values()),
+                "digestsSent": self.digests_sent,
+                "rateLimited": self.rate_limited,
+            }
+        return {**self._dispatcher.stats(), **digest}
+
+    def _permit(self, vault: str, kind: str) -> bool:
+        return self._cooldown_permits(f"{vault}:{kind}", float(settings.ALERT_COOLDOWN_SEC or 0.0))
+
     def on_nav(self, vault: str, nav: float) -> None:
-        settings = self._settings()
+        self.on_snapshots([(vault, nav, time.time(), None)])
+
+    def on_snapshots(self, batch: List[NavObservation]) -> None:
+        """Evaluate per-vault NAV rules for a batch of snapshots, plus staleness."""
         if not settings.ALERT_WEBHOOK_URL:
             return
-        high = self._nav_highs.get(vault)
-        if high is None or nav > high:
-            self._nav_highs[vault] = nav
-            return
-        if high <= 0:
-            return
-        drawdown = (high - nav) / high
-        if drawdown < settings.ALERT_NAV_DRAWDOWN_PCT:
-            return
-        cooldown = float(settings.ALERT_COOLDOWN_SEC or 0.0)
-        key = f"{vault}:nav"
-        if not self._cooldown_permits(key, cooldown):
-            return
-        pct = round(drawdown * 100, 2)
-        self._send(
-            f"[VaultCraft] Vault {vault} NAV drawdown {pct:.2f}%",
-            {"nav": f"{nav:.4f}", "peak": f"{high:.4f}"},
-        )
-        self._nav_highs[vault] = nav
+        rules = self._get_rules()
+        fired = rules.evaluate(batch, permit=self._permit) if batch else []
+        fired += rules.check_stale(time.time(), permit=self._permit)
+        for kind, vault, message, context in fired:
+            self._send(message, context, kind=kind, vault=vault)
 
     def on_event(self, vault: str, event: Dict[str, Any]) -> None:
-        settings = self._settings()
         if not settings.ALERT_WEBHOOK_URL:
             return
         status = str(event.get("status", "")).lower()
@@ -79,8 +337,24 @@ class AlertManager:
         context: Dict[str, Any] = {"type": event_type, "status": status}
         if detail is not None:
             context["detail"] = detail
-        self._send(f"[VaultCraft] {event_type} {status}", context)
+        self._send(f"[VaultCraft] {event_type} {status}", context, kind=f"{event_type} {status}", vault=vault)
 
 
-manager = AlertManager()
+def _format_digest(groups: Dict[Tuple[str, str], List[str]], max_vaults: int = 5) -> str:
+    """One message for a window of alerts, grouped by kind and then vault."""
+    total = sum(len(v) for v in groups.values())
+    if total == 1:
+        return next(iter(groups.values()))[0]
+    by_kind: Dict[str, List[Tuple[str, int]]] = {}
+    for (kind, vault), msgs in groups.items():
+        by_kind.setdefault(kind, []).append((vault, len(msgs)))
+    lines = [f"[VaultCraft] Alert digest: {total} alerts"]
+    for kind, vaults in sorted(by_kind.items(), key=lambda kv: -sum(n for _, n in kv[1])):
+        vaults.sort(key=lambda vn: -vn[1])
+        shown = ", ".join((v or "-") + (f" x{n}" if n > 1 else "") for v, n in vaults[:max_vaults])
+        more = f", +{len(vaults) - max_vaults} more" if len(vaults) > max_vaults else ""
+        lines.append(f"- {kind} x{sum(n for _, n in vaults)} ({len(vaults)} vaults: {shown}{more})")
+    return "\n".join(lines)
 
+
+manager = AlertManager()
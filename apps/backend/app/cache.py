@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import threading
 import time
-from typing import Dict, Generic, Hashable, Tuple, TypeVar, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Hashable, Sequence, Tuple, TypeVar, Optional
 
 
 K = TypeVar("K", bound=Hashable)
@@ -32,3 +34,39 @@ class TTLCache(Generic[K, V]):
     def clear(self) -> None:
         self._store.clear()
 
+
+def file_signature(path: Path) -> Tuple[str, int | None, int | None]:
+    try:
+        st = path.stat()
+    except OSError:
+        return (str(path), None, None)
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+class FileSignatureCache(Generic[V]):
+    """Memoize a value derived from files; reload when any file's path, mtime or size changes.
+
+    `extra` lets callers fold in an in-process write counter for writes that
+    land within the filesystem's timestamp granularity.
+    """
+
+    def __init__(self) -> None:
+        self._sig: Tuple[Any, ...] | None = None
+        self._value: Optional[V] = None
+        self._lock = threading.Lock()
+
+    def get(self, paths: Sequence[Path], load: Callable[[], V], extra: Hashable = None) -> V:
+        sig = (tuple(file_signature(p) for p in paths), extra)
+        with self._lock:
+            if self._sig == sig:
+                return self._value  # type: ignore[return-value]
+        value = load()
+        with self._lock:
+            self._sig = sig
+            self._value = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sig = None
+            self._value = None
@@ -2,30 +2,266 @@ from __future__ import annotations
 
 import threading
 import time
-from typing import Callable, List
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List
 
-from .navcalc import snapshot_now
+from .alert_rules import NavObservation
+from .navcalc import last_exposure, snapshot_if_changed, snapshot_now
+from .price_provider import CachedPriceRouter
+from .scheduler import CadenceScheduler
+from .telemetry import Histogram
+
+
+class _Inflight:
+    __slots__ = ("future", "queued", "started", "timed_out")
+
+    def __init__(self, queued: float):
+        self.future: Future | None = None
+        self.queued = queued
+        # set by the worker; the per-vault deadline runs from here, not from submit
+        self.started: float | None = None
+        self.timed_out = False
+
+    def overdue(self, now: float, timeout: float) -> bool:
+        return self.started is not None and now - self.started >= timeout
 
 
 class SnapshotDaemon:
-    def __init__(self, list_vaults: Callable[[], List[str]], interval_sec: float = 15.0):
+    def __init__(
+        self,
+        list_vaults: Callable[[], List[str]],
+        interval_sec: float = 15.0,
+        max_workers: int = 8,
+        vault_timeout_sec: float | None = None,
+        change_threshold_bps: float | None = None,
+        heartbeat_sec: float = 300.0,
+        cadence_for: Callable[[str], float] | None = None,
+        on_snapshots: Callable[[List[NavObservation]], None] | None = None,
+    ):
         self._list_vaults = list_vaults
         self._interval = interval_sec
+        # per-vault cadence; the vault list itself is refreshed every interval
+        self._cadence_for = cadence_for or (lambda _vid: interval_sec)
+        # runtime overrides (set_cadence); win over cadence_for across refreshes
+        self._cadence_overrides: Dict[str, float] = {}
+        self.scheduler = CadenceScheduler()
+        self._max_workers = max(1, int(max_workers))
+        # per-vault deadline; defaults to one interval
+        self._vault_timeout = vault_timeout_sec if vault_timeout_sec else interval_sec
+        # change-aware mode: skip vaults whose positions and prices are unchanged
+        self._change_bps = change_threshold_bps
+        self._heartbeat = heartbeat_sec
+        self._prices = CachedPriceRouter() if change_threshold_bps is not None else None
+        # NAVs written since the last hand-off, delivered as one batch (e.g. to alert rules)
+        self._on_snapshots = on_snapshots
+        self._observed: List[NavObservation] = []
         self._stop = threading.Event()
+        self._wake = threading.Event()
         self._thread: threading.Thread | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._inflight: Dict[str, _Inflight] = {}
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.vault_timeouts = 0
+        self.vault_skipped_busy = 0
+        self.vault_skipped_idle = 0
+        # instrumentation
+        self.tick_duration = Histogram()
+        self.vault_latency = Histogram()
+        self.queue_wait = Histogram()
+        self.failures: Dict[str, int] = {}
+        self.last_success: Dict[str, float] = {}
+
+    @property
+    def missed_intervals(self) -> int:
+        return self.scheduler.missed
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="snapshot")
+            return self._pool
+
+    def _snapshot(self, vid: str) -> float | None:
+        started = time.perf_counter()
+        try:
+            if self._change_bps is None:
+                unit = snapshot_now(vid)
+            else:
+                unit = snapshot_if_changed(vid, self._change_bps, self._heartbeat, router=self._prices)
+        except Exception as exc:
+            with self._lock:
+                name = type(exc).__name__
+                self.failures[name] = self.failures.get(name, 0) + 1
+            raise
+        finally:
+            self.vault_latency.observe(time.perf_counter() - started)
+        now = time.time()
+        with self._lock:
+            self.last_success[vid] = now
+            if unit is None:
+                self.vault_skipped_idle += 1
+            elif self._on_snapshots is not None:
+                self._observed.append((vid, float(unit), now, last_exposure(vid)))
+        return unit
+
+    def _emit_snapshots(self) -> None:
+        if self._on_snapshots is None:
+            return
+        with self._lock:
+            batch, self._observed = self._observed, []
+        # called even when empty so time-based rules (staleness) still run
+        try:
+            self._on_snapshots(batch)
+        except Exception:
+            pass
+
+    def _run_item(self, vid: str, item: _Inflight) -> float | None:
+        item.started = time.time()
+        self.queue_wait.observe(max(0.0, item.started - item.queued))
+        return self._snapshot(vid)
+
+    def _submit(self, vid: str, now: float) -> Future | None:
+        prev = self._inflight.get(vid)
+        if prev is not None and not prev.future.done():
+            # still working on an earlier run; don't queue behind it
+            self.vault_skipped_busy += 1
+            return None
+        item = _Inflight(now)
+        item.future = self._executor().submit(self._run_item, vid, item)
+        self._inflight[vid] = item
+        return item.future
+
+    def _reap(self, now: float) -> None:
+        for vid, item in list(self._inflight.items()):
+            if item.future.done():
+                self._inflight.pop(vid, None)
+                try:
+                    item.future.result()
+                except Exception:
+                    pass
+            elif not item.timed_out and item.overdue(now, self._vault_timeout):
+                item.timed_out = True
+                self.vault_timeouts += 1
+
+    def _dispatch(self, ids: List[str], now: float, track: bool = True) -> List[Future]:
+        submitted = [f for f in (self._submit(vid, now) for vid in ids) if f is not None]
+        if not submitted or not track:
+            return submitted
+        # a tick lasts until its last vault finishes
+        started = time.perf_counter()
+        remaining = [len(submitted)]
+
+        def _done(_fut: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self.tick_duration.observe(time.perf_counter() - started)
+
+        for fut in submitted:
+            fut.add_done_callback(_done)
+        return submitted
 
     def tick(self) -> None:
+        """Snapshot every listed vault once, waiting up to the per-vault deadline."""
         ids = self._list_vaults()
+        now = time.time()
+        started = time.perf_counter()
+        submitted = self._dispatch(ids, now, track=False)
+        if submitted:
+            _, pending = wait(submitted, timeout=self._vault_timeout)
+            running = [i for i in self._inflight.values() if i.future in pending and i.started is not None]
+            if running:
+                # each deadline counts from that vault's own start
+                last = max(i.started for i in running) + self._vault_timeout
+                _, pending = wait(pending, timeout=max(0.0, last - time.time()))
+            self.tick_duration.observe(time.perf_counter() - started)
+            # anything that has run for its full deadline is timed out; queued work is not
+            now = time.time()
+            for item in self._inflight.values():
+                if item.future in pending and not item.timed_out and item.overdue(now, self._vault_timeout):
+                    item.timed_out = True
+                    self.vault_timeouts += 1
+        self._reap(time.time())
+        self._emit_snapshots()
+        self.ticks += 1
+
+    def _refresh_schedule(self, now: float) -> None:
+        ids = set(self._list_vaults())
+        for vid in self.scheduler.vaults():
+            if vid not in ids:
+                self.scheduler.remove(vid)
         for vid in ids:
-            try:
-                snapshot_now(vid)
-            except Exception:
-                pass
+            cadence = self.cadence(vid)
+            if self.scheduler.cadence(vid) != cadence:
+                self.scheduler.schedule(vid, cadence, now)
+
+    def cadence(self, vault: str) -> float:
+        """Effective cadence: runtime override, else `cadence_for`."""
+        with self._lock:
+            override = self._cadence_overrides.get(vault)
+        return override if override is not None else float(self._cadence_for(vault))
+
+    def set_cadence(self, vault: str, cadence_sec: float | None) -> None:
+        """Re-prioritise a vault at runtime; None (or <= 0) returns it to its configured cadence."""
+        with self._lock:
+            if cadence_sec is None or cadence_sec <= 0:
+                self._cadence_overrides.pop(vault, None)
+            else:
+                self._cadence_overrides[vault] = float(cadence_sec)
+        if vault in self.scheduler.vaults():
+            self.scheduler.schedule(vault, self.cadence(vault))
+        self._wake.set()
+
+    def cadence_overrides(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._cadence_overrides)
 
     def run(self) -> None:
+        next_refresh = 0.0
         while not self._stop.is_set():
-            self.tick()
-            self._stop.wait(self._interval)
+            now = time.time()
+            if now >= next_refresh:
+                try:
+                    self._refresh_schedule(now)
+                except Exception:
+                    pass
+                next_refresh = now + self._interval
+            due = self.scheduler.pop_due(now)
+            self._dispatch(due, now)
+            if due:
+                self.ticks += 1
+            self._reap(now)
+            self._emit_snapshots()
+            nxt = self.scheduler.next_due()
+            until = next_refresh if nxt is None else min(nxt, next_refresh)
+            # wake at least once per deadline so timeouts are noticed promptly
+            self._wake.wait(max(0.0, min(until - time.time(), self._vault_timeout)))
+            self._wake.clear()
+
+    def stats(self, per_vault: bool = False) -> Dict[str, object]:
+        with self._lock:
+            failures = dict(self.failures)
+            last_success = dict(self.last_success)
+        out: Dict[str, object] = {
+            "ticks": self.ticks,
+            "missedIntervals": self.missed_intervals,
+            "vaultTimeouts": self.vault_timeouts,
+            "vaultSkippedBusy": self.vault_skipped_busy,
+            "vaultSkippedIdle": self.vault_skipped_idle,
+            "inflight": sum(1 for item in list(self._inflight.values()) if item.future and not item.future.done()),
+            "failures": failures,
+            "lastSuccessTs": max(last_success.values()) if last_success else None,
+            "tickDurationSec": self.tick_duration.snapshot(),
+            "vaultLatencySec": self.vault_latency.snapshot(),
+            "queueWaitSec": self.queue_wait.snapshot(),
+            "queue": self.scheduler.stats(),
+            "cadenceOverrides": self.cadence_overrides(),
+        }
+        if per_vault:
+            out["lastSuccessByVault"] = last_success
+        return out
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -36,8 +272,13 @@ class SnapshotDaemon:
 
     def stop(self) -> None:
         self._stop.set()
+        self._wake.set()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=1.0)
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
 
     def is_running(self) -> bool:
         return bool(self._thread and self._thread.is_alive())
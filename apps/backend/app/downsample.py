@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+
+Point = Tuple[float, float]
+
+
+def lttb(points: Sequence[Point], max_points: int) -> List[Point]:
+    """Largest-Triangle-Three-Buckets reduction of a (ts, value) series.
+
+    Keeps the first and last points and, for every bucket in between, the point
+    forming the largest triangle with the previously kept point and the average
+    of the next bucket. Series already within `max_points` are returned as-is.
+    """
+    n = len(points)
+    if max_points <= 0:
+        return []
+    if n <= max_points or n <= 2:
+        return list(points)
+    if max_points < 3:
+        return [points[0], points[-1]][:max_points]
+
+    out: List[Point] = [points[0]]
+    every = (n - 2) / (max_points - 2)
+    a = 0
+    for i in range(max_points - 2):
+        # average of the next bucket (the last bucket averages just the final point)
+        nxt_start = int((i + 1) * every) + 1
+        nxt_end = min(int((i + 2) * every) + 1, n)
+        if nxt_start >= nxt_end:
+            nxt_start, nxt_end = n - 1, n
+        span = nxt_end - nxt_start
+        avg_x = sum(p[0] for p in points[nxt_start:nxt_end]) / span
+        avg_y = sum(p[1] for p in points[nxt_start:nxt_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = points[a]
+        best = start
+        best_area = -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        out.append(points[best])
+        a = best
+    out.append(points[-1])
+    return out
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Dict, List
+
+
+class Subscription:
+    """Per-vault event feed bound to one asyncio loop.
+
+    Events are handed over with `call_soon_threadsafe`, so publishers may run
+    on any thread. The queue is bounded; when a slow consumer falls behind
+    the oldest event is dropped and counted.
+    """
+
+    def __init__(self, bus: "EventBus", vault: str, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.vault = vault
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max(1, int(maxsize)))
+        self.dropped = 0
+        self._bus = bus
+
+    def _offer(self, event: Dict[str, Any]) -> None:
+        # runs on self.loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def next_batch(self, timeout: float | None = None) -> List[Dict[str, Any]]:
+        """Wait up to `timeout` for an event, then take everything already queued."""
+        try:
+            first = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        batch = [first]
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self._subs: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, vault: str, maxsize: int = 1000) -> Subscription:
+        """Subscribe the running event loop to `vault`'s events."""
+        sub = Subscription(self, vault, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subs.setdefault(vault, []).append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.vault)
+            if subs and sub in subs:
+                subs.remove(sub)
+                if not subs:
+                    del self._subs[sub.vault]
+
+    def publish(self, vault: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subs = list(self._subs.get(vault, ()))
+            self.published += 1
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # loop already closed; the consumer is gone
+                self.unsubscribe(sub)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            subs = [s for group in self._subs.values() for s in group]
+            return {
+                "subscribers": len(subs),
+                "vaults": len(self._subs),
+                "published": self.published,
+                "dropped": sum(s.dropped for s in subs),
+            }
@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+# buffered: batched by a background thread, left to the OS page cache
+# fsync:    batched by a background thread, fsync'd after every batch
+# sync:     written and fsync'd inline by the caller (legacy, slowest)
+DURABILITY_MODES = ("buffered", "fsync", "sync")
+# floor for the background flush period; 0 would make the writer thread spin
+MIN_FLUSH_INTERVAL = 0.01
+
+
+class EventLogWriter:
+    """Append-only JSONL writer that keeps file I/O off the caller's thread.
+
+    Lines are queued (bounded; overflow is dropped and counted) and a daemon
+    thread writes everything queued once per `flush_interval` in one call.
+
+    The file at `path` is the active segment. Rotation is opt-in: with
+    `segment_sec` or `segment_max_bytes` set, once the file spans that long
+    or grows that large it is moved aside and sealed into a (gzip) segment
+    next to it with a sidecar index; see `list_segments` / `read_segment`.
+    Sealing runs without the write lock, so writers carry on into a fresh
+    active file meanwhile.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        flush_interval: float = 0.2,
+        max_queue: int = 10_000,
+        durability: str = "buffered",
+        segment_sec: float = 0.0,
+        segment_max_bytes: int = 0,
+        compress: bool = True,
+        retain_segments: int = 0,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"unsupported durability mode: {durability}")
+        self.path = Path(path)
+        self.durability = durability
+        self._interval = max(MIN_FLUSH_INTERVAL, float(flush_interval))
+        self._segment_sec = float(segment_sec or 0)
+        self._segment_max_bytes = int(segment_max_bytes or 0)
+        self._compress = compress
+        self._retain = int(retain_segments or 0)
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._io_lock = threading.Lock()
+        # serializes sealing of rotated files, separately from writers
+        self._seal_lock = threading.Lock()
+        self._rotated = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # first-record time of the active segment; None until known
+        self._segment_start: float | None = None
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.rotations = 0
+        self.last_flush_ts: float | None = None
+
+    def append(self, line: str) -> bool:
+        """Queue one serialized record; False when the queue is full and it was dropped."""
+        if self.durability == "sync":
+            with self._io_lock:
+                sealing = self._write([line])
+            if sealing is not None:
+                self._seal(sealing)
+            return True
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.flush()
+        self.flush()
+
+    def _drain(self) -> List[str]:
+        lines: List[str] = []
+        while True:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                return lines
+
+    def _write(self, lines: List[str]) -> Path | None:
+        # caller holds _io_lock so batches land in queue order; returns a file to seal
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self._segment_start is None:
+                self._segment_start = _first_record_ts(self.path) or time.time()
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in lines))
+                if self.durability != "buffered":
+                    f.flush()
+                    os.fsync(f.fileno())
+                size = f.tell()
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return None
+        with self._lock:
+            self.written += len(lines)
+            self.batches += 1
+            self.last_flush_ts = time.time()
+        if (self._segment_sec and time.time() - self._segment_start >= self._segment_sec) or (
+            self._segment_max_bytes and size >= self._segment_max_bytes
+        ):
+            return self._detach()
+        return None
+
+    def flush(self) -> None:
+        """Write everything queued so far (also called by the background thread)."""
+        with self._io_lock:
+            lines = self._drain()
+            sealing = self._write(lines) if lines else None
+        if sealing is not None:
+            self._seal(sealing)
+
+    def rotate(self) -> Dict[str, Any] | None:
+        """Flush and seal the active segment now; returns its index (None if empty)."""
+        with self._io_lock:
+            lines = self._drain()
+            sealing = self._write(lines) if lines else None
+            if sealing is None:
+                sealing = self._detach()
+        return self._seal(sealing) if sealing is not None else None
+
+    def _detach(self) -> Path | None:
+        # caller holds _io_lock: move the active file aside so writers start a new one
+        self._segment_start = None
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        self._rotated += 1
+        sealing = self.path.with_name(f"{self.path.name}.rotating.{self._rotated}")
+        try:
+            os.replace(self.path, sealing)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return None
+        return sealing
+
+    def _seal(self, sealing: Path) -> Dict[str, Any] | None:
+        with self._seal_lock:
+            try:
+                index = seal_segment(sealing, self.path, compress=self._compress)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                return None
+            with self._lock:
+                self.rotations += 1
+            if self._retain:
+                for old in list_segments(self.path)[: -self._retain]:
+                    _remove_segment(self.path, old)
+            return index
+
+    def close(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "durability": self.durability,
+                "queueDepth": self._queue.qsize(),
+                "dropped": self.dropped,
+                "written": self.written,
+                "batches": self.batches,
+                "errors": self.errors,
+                "rotations": self.rotations,
+                "lastFlushTs": self.last_flush_ts,
+            }
+
+
+def _first_record_ts(path: Path) -> float | None:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return float(json.loads(f.readline()).get("ts"))
+    except Exception:
+        return None
+
+
+def _segment_prefix(active: Path) -> str:
+    # events.jsonl -> events.<start>.jsonl.gz + events.<start>.idx.json
+    return active.name[: -len(active.suffix)] if active.suffix else active.name
+
+
+def _index_path(active: Path, name: str) -> Path:
+    return active.with_name(name.split(".jsonl")[0] + ".idx.json")
+
+
+def seal_segment(source: Path, active: Path, compress: bool = True) -> Dict[str, Any]:
+    """Turn a closed JSONL file into a segment next to `active` and index it.
+
+    The index records per-vault ts bounds, counts, highest seq and the
+    (uncompressed) byte offsets of each vault's first and last line, so
+    readers can skip segments entirely and stop early within one. It is written last; a
+    segment without an index is invisible to readers.
+    """
+    vaults: Dict[str, Dict[str, Any]] = {}
+    min_ts = max_ts = None
+    count = 0
+    offset = 0
+    # stream into a temp file; the final name needs the first ts, known only at the end
+    ext = ".jsonl.gz" if compress else ".jsonl"
+    tmp = source.with_name(source.name + ext + ".tmp")
+    opener = gzip.open if compress else open
+    with source.open("rb") as f, opener(tmp, "wb") as out:
+        for raw in f:
+            out.write(raw)
+            at, offset = offset, offset + len(raw)
+            try:
+                rec = json.loads(raw)
+                vault, ts = str(rec["vault"]), float(rec.get("ts", 0))
+            except Exception:
+                continue
+            v = vaults.get(vault)
+            if v is None:
+                v = vaults[vault] = {"minTs": ts, "maxTs": ts, "count": 1, "first": at, "last": at}
+            else:
+                v["minTs"], v["maxTs"] = min(v["minTs"], ts), max(v["maxTs"], ts)
+                v["count"] += 1
+                v["last"] = at
+            seq = rec.get("seq")
+            if isinstance(seq, int) and seq > v.get("lastSeq", 0):
+                v["lastSeq"] = seq
+            min_ts = ts if min_ts is None else min(min_ts, ts)
+            max_ts = ts if max_ts is None else max(max_ts, ts)
+            count += 1
+    start = int((min_ts if min_ts is not None else time.time()) * 1000)
+    prefix = _segment_prefix(active)
+    name = f"{prefix}.{start}{ext}"
+    seq = 1
+    while active.with_name(name).exists():
+        # two segments starting in the same millisecond
+        name = f"{prefix}.{start}-{seq}{ext}"
+        seq += 1
+    os.replace(tmp, active.with_name(name))
+    index = {"file": name, "minTs": min_ts, "maxTs": max_ts, "count": count, "bytes": offset, "vaults": vaults}
+    idx_path = _index_path(active, name)
+    idx_tmp = idx_path.with_name(idx_path.name + ".tmp")
+    idx_tmp.write_text(json.dumps(index), encoding="utf-8")
+    os.replace(idx_tmp, idx_path)
+    source.unlink()
+    return index
+
+
+def list_segments(active: str | Path) -> List[Dict[str, Any]]:
+    """Sealed segment indexes for the log at `active`, oldest first."""
+    active = Path(active)
+    out: List[Dict[str, Any]] = []
+    if not active.parent.exists():
+        return out
+    for p in active.parent.glob(f"{_segment_prefix(active)}.*.idx.json"):
+        try:
+            index = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if isinstance(index, dict) and index.get("file"):
+            out.append(index)
+    out.sort(key=lambda i: (i.get("minTs") or 0.0, i["file"]))
+    return out
+
+
+def _remove_segment(active: Path, index: Dict[str, Any]) -> None:
+    name = str(index["file"])
+    for p in (active.with_name(name), _index_path(active, name)):
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def read_segment(
+    active: str | Path,
+    index: Dict[str, Any],
+    vault: str,
+    since: float | None = None,
+    until: float | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream `vault`'s records with ts in [since, until) from one sealed segment."""
+    meta = index.get("vaults", {}).get(vault)
+    if not meta:
+        return
+    if (since is not None and meta["maxTs"] < since) or (until is not None and meta["minTs"] >= until):
+        return
+    path = Path(active).with_name(str(index["file"]))
+    opener = gzip.open if path.suffix == ".gz" else open
+    offset = 0
+    try:
+        with opener(path, "rb") as f:
+            for raw in f:
+                at, offset = offset, offset + len(raw)
+                if at < meta["first"]:
+                    continue
+                if at > meta["last"]:
+                    break
+                rec = _parse_record(raw, vault, since, until)
+                if rec is not None:
+                    yield rec
+    except OSError:
+        return
+
+
+def read_active(
+    active: str | Path,
+    vault: str,
+    since: float | None = None,
+    until: float | None = None,
+    max_bytes: int | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream `vault`'s records with ts in [since, until) from the unsealed active segment, newest first.
+
+    The file is read from its end and the scan stops at the first record (of
+    any vault) older than `since`: records are appended as they are stamped,
+    so everything before it is older too. `max_bytes` caps the read anyway.
+    """
+    for line in iter_lines_reversed(active, max_bytes=max_bytes):
+        try:
+            rec = json.loads(line)
+            ts = float(rec.get("ts", 0))
+        except Exception:
+            continue
+        if since is not None and ts < since:
+            return
+        if not isinstance(rec, dict) or rec.pop("vault", None) != vault or (until is not None and ts >= until):
+            continue
+        yield rec
+
+
+def _parse_record(raw: bytes, vault: str, since: float | None, until: float | None) -> Dict[str, Any] | None:
+    try:
+        rec = json.loads(raw)
+        if not isinstance(rec, dict) or rec.pop("vault", None) != vault:
+            return None
+        ts = float(rec.get("ts", 0))
+    except Exception:
+        return None
+    if (since is not None and ts < since) or (until is not None and ts >= until):
+        return None
+    return rec
+
+
+def iter_lines_reversed(path: str | Path, max_bytes: int | None = None, chunk_size: int = 1 << 16) -> Iterator[str]:
+    """Yield the lines of `path` last-first, reading at most `max_bytes` from the end.
+
+    A line cut off by the byte budget is not yielded.
+    """
+    if max_bytes is not None and max_bytes <= 0:
+        return
+    p = Path(path)
+    try:
+        f = p.open("rb")
+    except OSError:
+        return
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        start = max(0, pos - max_bytes) if max_bytes is not None else 0
+        # one extra byte tells whether the budget starts on a line boundary
+        floor = max(0, start - 1)
+        carry = b""
+        while pos > floor:
+            step = min(chunk_size, pos - floor)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + carry
+            parts = buf.split(b"\n")
+            # parts[0] may continue in the previous chunk
+            carry = parts[0]
+            for raw in reversed(parts[1:]):
+                if raw.strip():
+                    yield raw.decode("utf-8", errors="replace")
+        if start == 0 and carry.strip():
+            yield carry.decode("utf-8", errors="replace")
+
+
+def _segment_tail(path: Path, size: int | None, max_bytes: int | None) -> List[bytes]:
+    """The lines of a sealed segment within its last `max_bytes`, read forward.
+
+    Gzip cannot be read backwards, so the stream is decompressed in chunks:
+    the part before the budget (known from the index's `bytes`) is skipped
+    and the lines kept are bounded by the budget, never the whole segment.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    kept: "deque[bytes]" = deque()
+    held = 0
+    with opener(path, "rb") as f:
+        partial = False
+        if max_bytes is not None and size is not None and size > max_bytes:
+            # land one byte early to tell whether the budget starts a line
+            f.seek(size - max_bytes - 1)
+            partial = f.read(1) != b"\n"
+        for raw in f:
+            if partial:
+                partial = False
+                continue
+            kept.append(raw)
+            held += len(raw)
+            while max_bytes is not None and held > max_bytes:
+                held -= len(kept.popleft())
+    return list(kept)
+
+
+def iter_recent_lines(active: str | Path, max_bytes: int | None = None) -> Iterator[str]:
+    """Lines newest-first across the active segment and then sealed segments.
+
+    `max_bytes` bounds the (uncompressed) bytes read overall.
+    """
+    budget = max_bytes
+    for line in iter_lines_reversed(active, max_bytes=budget):
+        if budget is not None:
+            budget -= len(line) + 1
+        yield line
+    for index in reversed(list_segments(active)):
+        if budget is not None and budget <= 0:
+            return
+        path = Path(active).with_name(str(index["file"]))
+        try:
+            lines = _segment_tail(path, index.get("bytes"), budget)
+        except (OSError, EOFError):
+            continue
+        for raw in reversed(lines):
+            if budget is not None:
+                budget -= len(raw)
+                if budget < 0:
+                    return
+            if raw.strip():
+                yield raw.rstrip(b"\n").decode("utf-8", errors="replace")
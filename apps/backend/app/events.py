@@ -1,34 +1,133 @@
 from __future__ import annotations
 
+import heapq
 import json
 import os
-from pathlib import Path
+import threading
+from bisect import bisect_left, bisect_right
 from typing import Dict, List, Any
 import time
 
 from .alerts import manager as alert_manager
+from .eventbus import EventBus
+from .eventlog import EventLogWriter, iter_recent_lines, list_segments, read_active, read_segment
+
+
+def _event_ts(event: Dict[str, Any]) -> float:
+    try:
+        return float(event.get("ts", 0))
+    except Exception:
+        return 0.0
+
+
+class _TsIndex:
+    """Events ordered by ts with a parallel key list for bisect lookups."""
+
+    __slots__ = ("ts", "events")
+
+    def __init__(self) -> None:
+        self.ts: List[float] = []
+        self.events: List[Dict[str, Any]] = []
+
+    def insert(self, ts: float, event: Dict[str, Any]) -> None:
+        # equal timestamps keep arrival order
+        if not self.ts or ts >= self.ts[-1]:
+            self.ts.append(ts)
+            self.events.append(event)
+        else:
+            idx = bisect_right(self.ts, ts)
+            self.ts.insert(idx, ts)
+            self.events.insert(idx, event)
+
+    def drop_front(self, n: int) -> None:
+        del self.ts[0:n]
+        del self.events[0:n]
+
+    def tail(self, since: float | None = None, limit: int | None = None) -> List[Dict[str, Any]]:
+        """Events with ts >= `since`, at most the last `limit` of them."""
+        start = 0 if since is None else bisect_left(self.ts, since)
+        if limit:
+            start = max(start, len(self.ts) - limit)
+        return self.events[start:]
+
+    def __len__(self) -> int:
+        return len(self.ts)
 
 
 class EventStore:
-    def __init__(self, log_file: str | None = None, capacity: int = 2000):
-        self._events: Dict[str, List[Dict[str, Any]]] = {}
+    def __init__(
+        self,
+        log_file: str | None = None,
+        capacity: int = 2000,
+        flush_interval: float = 0.2,
+        max_queue: int = 10_000,
+        durability: str = "buffered",
+        segment_sec: float = 0.0,
+        segment_max_bytes: int = 0,
+        compress: bool = True,
+        retain_segments: int = 0,
+    ):
+        self._events: Dict[str, _TsIndex] = {}
+        # vault -> event type -> events of that type, same ordering as _events
+        self._by_type: Dict[str, Dict[str, _TsIndex]] = {}
+        # vault -> events in arrival (= seq) order, and the last seq handed out
+        self._arrival: Dict[str, List[Dict[str, Any]]] = {}
+        self._last_seq: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # push feed for live consumers (e.g. /ws/quant)
+        self.bus = EventBus()
         self._log_file = log_file
         self._capacity = capacity
+        self._writer = (
+            EventLogWriter(
+                log_file,
+                flush_interval=flush_interval,
+                max_queue=max_queue,
+                durability=durability,
+                segment_sec=segment_sec,
+                segment_max_bytes=segment_max_bytes,
+                compress=compress,
+                retain_segments=retain_segments,
+            )
+            if log_file
+            else None
+        )
 
     def add(self, vault: str, event: Dict[str, Any]) -> None:
-        arr = self._events.setdefault(vault, [])
         event.setdefault("ts", time.time())
-        arr.append(event)
-        if len(arr) > self._capacity:
-            del arr[0 : len(arr) - self._capacity]
-        if self._log_file:
-            try:
-                p = Path(self._log_file)
-                p.parent.mkdir(parents=True, exist_ok=True)
-                with p.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps({"vault": vault, **event}, ensure_ascii=False) + "\n")
-            except Exception:
-                pass
+        ts = _event_ts(event)
+        with self._lock:
+            seq = self._last_seq.get(vault, 0) + 1
+            self._last_seq[vault] = seq
+            event["seq"] = seq
+            arrival = self._arrival.setdefault(vault, [])
+            arrival.append(event)
+            if len(arrival) > self._capacity:
+                del arrival[0 : len(arrival) - self._capacity]
+            idx = self._events.setdefault(vault, _TsIndex())
+            by_type = self._by_type.setdefault(vault, {})
+            idx.insert(ts, event)
+            by_type.setdefault(str(event.get("type")), _TsIndex()).insert(ts, event)
+            overflow = len(idx) - self._capacity
+            if overflow > 0:
+                # the oldest events are also the oldest of their type
+                for old in idx.events[:overflow]:
+                    ty = str(old.get("type"))
+                    sub = by_type[ty]
+                    sub.drop_front(1)
+                    if not sub:
+                        del by_type[ty]
+                idx.drop_front(overflow)
+            if self._writer is not None:
+                # queued under the lock so the log stays in seq order
+                try:
+                    self._writer.append(json.dumps({"vault": vault, **event}, ensure_ascii=False))
+                except Exception:
+                    pass
+        try:
+            self.bus.publish(vault, event)
+        except Exception:
+            pass
         try:
             alert_manager.on_event(vault, event)
         except Exception:
@@ -41,16 +140,192 @@ class EventStore:
         since: float | None = None,
         types: List[str] | None = None,
     ) -> List[Dict[str, Any]]:
-        arr = list(self._events.get(vault, []))
-        if since is not None:
-            arr = [e for e in arr if float(e.get("ts", 0)) >= float(since)]
+        """Events for `vault` in ts order, optionally from `since` and of the given `types`.
+
+        Only the matching tail is sliced out (O(log n + k)); multi-type
+        queries merge the per-type indexes.
+        """
+        since_f = float(since) if since is not None else None
+        # limit=0 has always meant "no limit"
+        cap = limit if limit is not None and limit > 0 else None
+        with self._lock:
+            if types:
+                by_type = self._by_type.get(vault, {})
+                parts = [by_type[t].tail(since_f, cap) for t in dict.fromkeys(types) if t in by_type]
+                if len(parts) == 1:
+                    return parts[0]
+                arr = list(heapq.merge(*parts, key=_event_ts))
+                return arr[-cap:] if cap else arr
+            idx = self._events.get(vault)
+            return idx.tail(since_f, cap) if idx is not None else []
+
+    def page(
+        self,
+        vault: str,
+        after_seq: int = 0,
+        limit: int | None = None,
+        types: List[str] | None = None,
+    ) -> Dict[str, Any]:
+        """Events with seq > `after_seq` in seq order, at most `limit` of them.
+
+        Seqs are per-vault and contiguous in memory, so the cursor is an
+        offset computation (bisect only if a restored log had gaps).
+        `gap` is set when `after_seq` predates the in-memory window, or lies
+        beyond `lastSeq`: a cursor from before a restart whose numbering was
+        not recovered. Such a cursor is read as 0, so the client resyncs from
+        the oldest event held.
+        """
+        tset = set(types) if types else None
+        with self._lock:
+            arrival = self._arrival.get(vault, [])
+            last_seq = self._last_seq.get(vault, 0)
+            start = 0
+            stale = after_seq > last_seq
+            if stale:
+                after_seq = 0
+            if arrival:
+                first = arrival[0]["seq"]
+                start = after_seq - first + 1
+                if not (0 <= start < len(arrival) and arrival[start]["seq"] == after_seq + 1):
+                    start = bisect_right(arrival, after_seq, key=lambda e: e["seq"])
+                gap = stale or after_seq < first - 1
+            else:
+                # nothing held: any seq still unread is gone
+                gap = stale or after_seq < last_seq
+            out: List[Dict[str, Any]] = []
+            i = start
+            while i < len(arrival) and not (limit and len(out) >= limit):
+                e = arrival[i]
+                if tset is None or str(e.get("type")) in tset:
+                    out.append(e)
+                i += 1
+            # with a type filter, skip the non-matching rest before reporting hasMore
+            while tset is not None and i < len(arrival) and str(arrival[i].get("type")) not in tset:
+                i += 1
+            next_seq = arrival[i - 1]["seq"] if i > start else max(after_seq, 0)
+            return {
+                "events": out,
+                "nextSeq": next_seq,
+                "lastSeq": last_seq,
+                "hasMore": i < len(arrival),
+                "gap": gap,
+            }
+
+    def restore(self, max_bytes: int | None = 64 << 20) -> int:
+        """Reload the newest `capacity` events per vault from the log file.
+
+        The log (active file, then sealed segments newest first) is read
+        backwards and at most `max_bytes` from its end, so boot time stays
+        flat however large the log grows; vaults quiet for longer than that
+        window come back empty, but their seq numbering continues from the
+        highest seq in the sealed segment indexes. Restored events are neither
+        re-logged nor passed to alerts. Returns the number restored.
+        """
+        if not self._log_file:
+            return 0
+        self.flush()
+        newest_first: Dict[str, List[Dict[str, Any]]] = {}
+        for line in iter_recent_lines(self._log_file, max_bytes=max_bytes):
+            try:
+                rec = json.loads(line)
+                vault = rec.pop("vault")
+            except Exception:
+                continue
+            if not isinstance(vault, str):
+                continue
+            bucket = newest_first.setdefault(vault, [])
+            if len(bucket) < self._capacity:
+                bucket.append(rec)
+        restored = 0
+        with self._lock:
+            for vault, recs in newest_first.items():
+                if vault in self._events:
+                    continue  # never clobber live events
+                idx = self._events[vault] = _TsIndex()
+                by_type = self._by_type[vault] = {}
+                # logged seqs are kept; pre-seq records are numbered after their predecessor
+                arrival = list(reversed(recs))
+                prev = 0
+                for rec in arrival:
+                    logged = rec.get("seq")
+                    if not isinstance(logged, int):
+                        rec["seq"] = prev + 1
+                    prev = rec["seq"]
+                arrival.sort(key=lambda e: e["seq"])
+                self._arrival[vault] = arrival
+                self._last_seq[vault] = arrival[-1]["seq"]
+                for rec in sorted(arrival, key=_event_ts):
+                    ts = _event_ts(rec)
+                    idx.insert(ts, rec)
+                    by_type.setdefault(str(rec.get("type")), _TsIndex()).insert(ts, rec)
+                restored += len(recs)
+            for index in list_segments(self._log_file):
+                for vault, meta in index.get("vaults", {}).items():
+                    # vaults outside the byte budget: only their numbering comes back
+                    seq = meta.get("lastSeq")
+                    if vault not in self._events and isinstance(seq, int) and seq > self._last_seq.get(vault, 0):
+                        self._last_seq[vault] = seq
+        return restored
+
+    def oldest_ts(self, vault: str) -> float | None:
+        with self._lock:
+            idx = self._events.get(vault)
+            return idx.ts[0] if idx else None
+
+    def evicted(self, vault: str) -> bool:
+        """True when `vault` has logged events no longer held in memory."""
+        with self._lock:
+            return self._last_seq.get(vault, 0) > len(self._arrival.get(vault, ()))
+
+    def history(
+        self,
+        vault: str,
+        since: float | None = None,
+        until: float | None = None,
+        types: List[str] | None = None,
+        max_bytes: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Logged events for `vault` with ts in [since, until), read from disk.
+
+        Sealed segments are skipped via their index unless they hold `vault`
+        in range; the active segment is read from its end back to `since`,
+        at most `max_bytes` of it. Returns [] without a log.
+        """
+        if not self._log_file:
+            return []
+        self.flush()
+        out: List[Dict[str, Any]] = []
+        for index in list_segments(self._log_file):
+            out.extend(read_segment(self._log_file, index, vault, since, until))
+        out.extend(read_active(self._log_file, vault, since, until, max_bytes=max_bytes))
         if types:
             tset = set(types)
-            arr = [e for e in arr if str(e.get("type")) in tset]
-        if limit is not None and limit >= 0:
-            return arr[-limit:]
-        return arr
+            out = [e for e in out if str(e.get("type")) in tset]
+        out.sort(key=_event_ts)
+        return out
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    def log_stats(self) -> Dict[str, Any] | None:
+        return self._writer.stats() if self._writer is not None else None
 
 
 EVENT_LOG_FILE = os.getenv("EVENT_LOG_FILE") or None
-store = EventStore(log_file=EVENT_LOG_FILE)
+store = EventStore(
+    log_file=EVENT_LOG_FILE,
+    flush_interval=float(os.getenv("EVENT_LOG_FLUSH_SEC") or 0.2),
+    max_queue=int(os.getenv("EVENT_LOG_QUEUE_MAX") or 10_000),
+    durability=os.getenv("EVENT_LOG_DURABILITY") or "buffered",
+    segment_sec=float(os.getenv("EVENT_LOG_SEGMENT_SEC") or 0),
+    segment_max_bytes=int(os.getenv("EVENT_LOG_SEGMENT_MAX_BYTES") or 0),
+    compress=(os.getenv("EVENT_LOG_COMPRESS") or "1") not in ("0", "false", "False"),
+    retain_segments=int(os.getenv("EVENT_LOG_RETAIN_SEGMENTS") or 0),
+)
+EVENT_RESTORE_MAX_BYTES = int(os.getenv("EVENT_RESTORE_MAX_BYTES") or 64 << 20)
+EVENT_HISTORY_MAX_BYTES = int(os.getenv("EVENT_HISTORY_MAX_BYTES") or 64 << 20)
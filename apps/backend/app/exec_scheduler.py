@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Set, Tuple
+
+from .settings import settings
+
+
+class SchedulerFull(RuntimeError):
+    pass
+
+
+class VaultScheduler:
+    """Runs order work in submission order per vault, different vaults in parallel.
+
+    Each vault has a FIFO of pending jobs and at most one drain task on a
+    bounded thread pool, so one vault's orders and fills never overlap while
+    up to `max_workers` vaults make progress at once. A drain gives its
+    worker back after `batch` jobs so a busy vault cannot starve the rest.
+    `max_pending` caps queued plus running jobs across all vaults.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 1000, batch: int = 16):
+        self._max_workers = max(1, int(max_workers))
+        self._max_pending = max(1, int(max_pending))
+        self._batch = max(1, int(batch))
+        self._queues: Dict[str, Deque[Tuple[Callable[[], Any], Future]]] = {}
+        self._active: Set[str] = set()
+        self._pending = 0
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.completed = 0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # caller holds self._lock; recreated lazily after shutdown()
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="exec-vault")
+        return self._pool
+
+    def submit(self, vault: str, fn: Callable[[], Any]) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if self._pending >= self._max_pending:
+                raise SchedulerFull("exec scheduler full")
+            self._pending += 1
+            self._queues.setdefault(vault, deque()).append((fn, fut))
+            if vault not in self._active:
+                self._active.add(vault)
+                self._executor().submit(self._drain, vault)
+        return fut
+
+    def run(self, vault: str, fn: Callable[[], Any]) -> Any:
+        """Run `fn` in `vault`'s order and wait for its result."""
+        return self.submit(vault, fn).result()
+
+    def _drain(self, vault: str) -> None:
+        for _ in range(self._batch):
+            with self._lock:
+                q = self._queues.get(vault)
+                if not q:
+                    self._queues.pop(vault, None)
+                    self._active.discard(vault)
+                    return
+                fn, fut = q.popleft()
+            if fut.set_running_or_notify_cancel():
+                try:
+                    fut.set_result(fn())
+                except BaseException as exc:
+                    fut.set_exception(exc)
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+                if self._pending == 0:
+                    self._idle.notify_all()
+        with self._lock:
+            if self._queues.get(vault):
+                # requeue behind other vaults' drains
+                self._executor().submit(self._drain, vault)
+            else:
+                self._queues.pop(vault, None)
+                self._active.discard(vault)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until no job is queued or running."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "activeVaults": len(self._active),
+                "workers": self._max_workers,
+                "completed": self.completed,
+            }
+
+
+scheduler = VaultScheduler(
+    max_workers=int(settings.EXEC_QUEUE_WORKERS),
+    max_pending=int(settings.EXEC_QUEUE_MAX),
+)
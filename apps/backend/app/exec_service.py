@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 import json
+import threading
 import time
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, List, Tuple
 
 from .ack_tracker import record as record_ack
 from .events import store as event_store
 from .hyper_exec import HyperExecClient, Order
 from .listener_registry import register as register_listener_vault
 from .navcalc import snapshot_now
-from .positions import apply_close, apply_fill, get_profile
-from .price_provider import PriceRouter
+from .positions import apply_close, apply_fills, get_profile
+from .price_provider import CachedPriceRouter, PriceProvider, PriceRouter
+from .risk_policy import PolicyBook, RiskPolicy
 from .settings import Settings, settings
 
 try:  # pragma: no cover - optional dependency
@@ -59,6 +61,20 @@ class ExecDriver:
     def close(self, symbol: str, size: float | None = None) -> Dict[str, Any]:  # pragma: no cover - interface
         raise NotImplementedError
 
+    def open_bulk(self, orders: List[Order]) -> Dict[str, Any]:
+        """Send several opens; `legs` holds one ack payload per order, in order.
+
+        Venues without a bulk API fall back to one `open` per leg.
+        """
+        legs: List[Any] = []
+        for order in orders:
+            try:
+                res = self.open(order)
+                legs.append(res.get("ack") if isinstance(res, dict) else res)
+            except Exception as exc:
+                legs.append({"error": str(exc)})
+        return {"ack": None, "legs": legs}
+
 
 class HyperSDKDriver(ExecDriver):
     def __init__(self, base_url: str | None = None, private_key: str | None = None):
@@ -132,6 +148,36 @@ class HyperSDKDriver(ExecDriver):
             )
         return {"ack": res}
 
+    def _order_request(self, order: Order) -> Dict[str, Any]:
+        is_buy = order.side == "buy"
+        if (order.order_type or "market").lower() == "limit":
+            px = float(order.limit_price)
+            order_type = {"limit": {"tif": (order.time_in_force or "Gtc").title()}}
+        else:
+            # market legs go out as aggressive IOC limits, as market_open does
+            slippage = self._reduce_slippage if order.reduce_only else self._market_slippage
+            px = float(self._exch._slippage_price(order.symbol, is_buy, slippage, None))  # type: ignore[attr-defined]
+            order_type = {"limit": {"tif": "Ioc"}}
+        return {
+            "coin": order.symbol,
+            "is_buy": is_buy,
+            "sz": float(order.size),
+            "limit_px": px,
+            "order_type": order_type,
+            "reduce_only": order.reduce_only,
+        }
+
+    def open_bulk(self, orders: List[Order]) -> Dict[str, Any]:
+        """One signed `bulk_orders` action for all legs."""
+        res = self._exch.bulk_orders([self._order_request(o) for o in orders])
+        statuses = None
+        if isinstance(res, dict) and isinstance(res.get("response"), dict):
+            statuses = (res["response"].get("data") or {}).get("statuses")
+        if not isinstance(statuses, list) or len(statuses) != len(orders):
+            # the action as a whole was rejected
+            statuses = [{"error": str(res)}] * len(orders)
+        return {"ack": res, "legs": statuses}
+
     def close(self, symbol: str, size: float | None = None) -> Dict[str, Any]:
         res = self._exch.market_close(
             coin=symbol,
@@ -168,33 +214,151 @@ class MockGoldDriver(ExecDriver):
         return {"ack": self._ack(symbol, size, "close")}
 
 
+_DRIVER_FACTORIES: Dict[str, Callable[[], ExecDriver]] = {
+    "hyper": lambda: HyperSDKDriver(),
+    "mock_gold": lambda: MockGoldDriver(),
+}
+
+
 class ExecService:
-    def __init__(self, driver: ExecDriver | None = None):
+    """Order validation and routing to venue drivers.
+
+    Meant to be long-lived: drivers are built once per venue and reused, so
+    the wallet and `Exchange` (which fetches exchange metadata) are set up
+    only on first use or by `warm_up()`. Safe to share across threads.
+    Settings are read once at construction (and again by `reset()`); risk
+    limits are compiled from them and overlaid per vault by `policies`.
+    Notional checks only read the price book of `prices`: a stale or missing
+    entry is refreshed on a background thread, and the order goes on with
+    the stale price (or, with none yet, without a notional check).
+    """
+
+    def __init__(self, driver: ExecDriver | None = None, prices: PriceProvider | None = None):
         self._driver_override = driver
-        self._hyper_driver: ExecDriver | None = None
-        self._mock_gold_driver: ExecDriver | None = None
-
-    def _hyper_driver(self) -> ExecDriver:
-        if self._driver_override:
-            return self._driver_override
-        if self._hyper_driver is None:
-            self._hyper_driver = HyperSDKDriver()
-        return self._hyper_driver
+        self._drivers: Dict[str, ExecDriver] = {}
+        self._lock = threading.Lock()
+        self._warm_errors: Dict[str, str] = {}
+        self._prices = prices
+        # price book keys with a background fetch in flight
+        self._refreshing: set[str] = set()
+        self._env = Settings()
+        self.policies = PolicyBook(RiskPolicy.from_settings(self._env))
+        self._price_max_age = float(self._env.EXEC_PRICE_MAX_AGE_SEC)
+
+    def use_prices(self, prices: PriceProvider) -> None:
+        """Share a (cached) price provider, e.g. the API's, for notional checks."""
+        self._prices = prices
+
+    def _price_source(self) -> PriceProvider:
+        if self._prices is None:
+            self._prices = CachedPriceRouter(PriceRouter())
+        return self._prices
+
+    def _price(self, venue: str, symbol: str) -> float:
+        key = f"{venue}::{symbol}"
+        prices = self._price_source()
+        peek = getattr(prices, "peek", None)
+        if peek is None:
+            # a provider without a price book can only be asked directly
+            try:
+                return float(prices.get_index_prices([key]).get(key, 0.0) or 0.0)
+            except Exception:
+                return 0.0
+        cached = peek(key, self._price_max_age)
+        if cached:
+            return cached
+        self.refresh_prices([key])
+        return peek(key, float("inf")) or 0.0
+
+    def _driver(self, venue_key: str) -> ExecDriver:
+        driver = self._drivers.get(venue_key)
+        if driver is not None:
+            return driver
+        with self._lock:
+            driver = self._drivers.get(venue_key)
+            if driver is None:
+                driver = self._drivers[venue_key] = _DRIVER_FACTORIES[venue_key]()
+                self._warm_errors.pop(venue_key, None)
+            return driver
 
     def _resolve_driver(self, venue: str) -> ExecDriver:
         venue_key = (venue or "hyper").lower()
         if self._driver_override:
             return self._driver_override
-        if venue_key == "hyper":
-            return self._hyper_driver()
-        if venue_key == "mock_gold":
-            if self._mock_gold_driver is None:
-                self._mock_gold_driver = MockGoldDriver()
-            return self._mock_gold_driver
-        raise ValueError(f"unsupported venue: {venue}")
+        if venue_key not in _DRIVER_FACTORIES:
+            raise ValueError(f"unsupported venue: {venue}")
+        return self._driver(venue_key)
+
+    def warm_up(self) -> Dict[str, bool]:
+        """Build drivers for the allowed venues ahead of the first order.
+
+        The hyper driver is only built when live exec is enabled; a venue that
+        fails here is retried on its first order.
+        """
+        ready: Dict[str, bool] = {}
+        for venue_key in sorted(self.policies.defaults.venues & set(_DRIVER_FACTORIES)):
+            if venue_key == "hyper" and not self._env.ENABLE_LIVE_EXEC:
+                continue
+            try:
+                self._resolve_driver(venue_key)
+                ready[venue_key] = True
+            except Exception as exc:
+                self._warm_errors[venue_key] = str(exc)
+                ready[venue_key] = False
+        return ready
+
+    def _default_tokens(self) -> List[str]:
+        policy = self.policies.defaults
+        return [f"{venue}::{sym}" for venue in sorted(policy.venues) for sym in sorted(policy.symbols)]
+
+    def prime_prices(self) -> int:
+        """Fetch prices for the default allowed symbols into the price book."""
+        tokens = self._default_tokens()
+        if not tokens:
+            return 0
+        try:
+            return len(self._price_source().get_index_prices(tokens))
+        except Exception:
+            return 0
+
+    def refresh_prices(self, tokens: List[str] | None = None) -> None:
+        """Fetch `tokens` (default: the allowed symbols) into the price book on a background thread.
+
+        Tokens already being fetched are skipped, so a burst of orders on a
+        stale symbol costs one fetch.
+        """
+        tokens = self._default_tokens() if tokens is None else tokens
+        with self._lock:
+            pending = [t for t in dict.fromkeys(tokens) if t not in self._refreshing]
+            self._refreshing.update(pending)
+        if pending:
+            threading.Thread(target=self._fetch_prices, args=(pending,), name="exec-prices", daemon=True).start()
+
+    def _fetch_prices(self, tokens: List[str]) -> None:
+        try:
+            self._price_source().get_index_prices(tokens)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(tokens)
 
-    def _run_with_retry(self, func: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> tuple[Dict[str, Any], bool, int]:
+    def reset(self) -> None:
+        """Drop built drivers and recompile risk limits, e.g. after a key or config change."""
         env = Settings()
+        with self._lock:
+            self._drivers.clear()
+            self._warm_errors.clear()
+            self._env = env
+            self._price_max_age = float(env.EXEC_PRICE_MAX_AGE_SEC)
+        self.policies.set_defaults(RiskPolicy.from_settings(env))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"drivers": sorted(self._drivers), "warmErrors": dict(self._warm_errors)}
+
+    def _run_with_retry(self, func: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> tuple[Dict[str, Any], bool, int]:
+        env = self._env
         max_extra = max(0, int(getattr(env, "EXEC_RETRY_ATTEMPTS", 0)))
         backoff = max(0.0, float(getattr(env, "EXEC_RETRY_BACKOFF_SEC", 0.0)))
         attempts = 0
@@ -210,65 +374,39 @@ class ExecService:
             if backoff > 0:
                 time.sleep(backoff)
 
-    def _allowed_venues(self) -> set[str]:
-        env = Settings()
-        return {v.strip().lower() for v in str(getattr(env, "EXEC_ALLOWED_VENUES", "hyper")).split(",") if v.strip()}
-
-    def _validate(self, order: Order) -> None:
-        env = Settings()
-        venue = (order.venue or "hyper").lower()
-        if venue not in self._allowed_venues():
-            raise ValueError("venue not allowed")
-        allowed = {s.strip().upper() for s in env.EXEC_ALLOWED_SYMBOLS.split(",") if s.strip()}
-        sym = order.symbol.upper()
-        if sym not in allowed:
-            raise ValueError("symbol not allowed")
-        if order.size <= 0:
-            raise ValueError("size must be > 0")
-        lev = order.leverage if order.leverage is not None else env.EXEC_MIN_LEVERAGE
-        if lev < env.EXEC_MIN_LEVERAGE or lev > env.EXEC_MAX_LEVERAGE:
-            raise ValueError("leverage out of range")
-        kind = (order.order_type or "market").lower()
-        if kind not in {"market", "limit"}:
-            raise ValueError("unsupported order_type")
-        if kind == "limit" and (order.limit_price is None or order.limit_price <= 0):
-            raise ValueError("limit_price required for limit order")
-        if order.stop_loss is not None and order.stop_loss <= 0:
-            raise ValueError("stop_loss must be positive")
-        if order.take_profit is not None and order.take_profit <= 0:
-            raise ValueError("take_profit must be positive")
-        price_key = f"{venue}::{sym}"
-        price = 0.0
-        try:
-            price = PriceRouter().get_index_prices([price_key]).get(price_key, 0.0)
-        except Exception:
-            price = 0.0
-        notional = abs(order.size) * (price or 0.0)
-        if price > 0.0 and notional > env.EXEC_MAX_NOTIONAL_USD:
-            raise ValueError("notional exceeds limit")
-        if price > 0.0 and notional < env.EXEC_MIN_NOTIONAL_USD:
-            raise ValueError("notional below minimum")
+    def _validate(self, order: Order, vault: str | None = None) -> None:
+        policy = self.policies.policy(vault)
+        policy.check(order)
+        policy.check_notional(order, self._price((order.venue or "hyper").lower(), order.symbol.upper()))
 
     def _apply_position_open(self, vault: str, order: Order, venue: str, live: bool) -> None:
-        if live and not settings.APPLY_LIVE_TO_POSITIONS:
+        self._apply_fills(vault, [(order, venue, live)])
+
+    def _apply_fills(self, vault: str, fills: List[Tuple[Order, str, bool]]) -> None:
+        """Persist (order, venue, live) fills in one write, then snapshot NAV once."""
+        fills = [
+            f
+            for f in fills
+            if (settings.APPLY_LIVE_TO_POSITIONS if f[2] else settings.APPLY_DRY_RUN_TO_POSITIONS)
+        ]
+        if not fills:
             return
-        if not live and not settings.APPLY_DRY_RUN_TO_POSITIONS:
-            return
-        apply_fill(vault, order.symbol, order.size, order.side, venue=venue)
+        apply_fills(vault, [(order.symbol, order.size, order.side, venue) for order, venue, _ in fills])
         unit = snapshot_now(vault)
-        event_store.add(
-            vault,
-            {
-                "type": "fill",
-                "status": "applied",
-                "source": "ack" if live else "dry_run",
-                "symbol": order.symbol,
-                "side": order.side,
-                "size": order.size,
-                "unitNav": unit,
-                "venue": venue,
-            },
-        )
+        for order, venue, live in fills:
+            event_store.add(
+                vault,
+                {
+                    "type": "fill",
+                    "status": "applied",
+                    "source": "ack" if live else "dry_run",
+                    "symbol": order.symbol,
+                    "side": order.side,
+                    "size": order.size,
+                    "unitNav": unit,
+                    "venue": venue,
+                },
+            )
 
     def _apply_position_close(self, vault: str, symbol: str, size: float | None, venue: str, live: bool) -> None:
         if live and not settings.APPLY_LIVE_TO_POSITIONS:
@@ -293,13 +431,13 @@ class ExecService:
 
     def open(self, vault: str, order: Order) -> Dict[str, Any]:
         try:
-            self._validate(order)
+            self._validate(order, vault)
         except Exception as exc:
             event_store.add(vault, {"type": "exec_open", "status": "rejected", "error": str(exc)})
             return {"ok": False, "error": str(exc)}
         venue = (order.venue or "hyper").lower()
         register_listener_vault(vault)
-        env = Settings()
+        env = self._env
         if venue == "hyper" and not env.ENABLE_LIVE_EXEC:
             payload = HyperExecClient().build_open_order(order)
             event_store.add(vault, {"type": "exec_open", "status": "dry_run", "payload": payload, "venue": venue})
@@ -322,10 +460,64 @@ class ExecService:
             event_store.add(vault, {"type": "exec_open", "status": "error", "error": str(exc), "venue": venue})
             return {"ok": False, "error": str(exc)}
 
+    def open_batch(self, vault: str, orders: List[Order]) -> Dict[str, Any]:
+        """Validate every leg, send each venue's legs as one bulk order, apply fills in one write.
+
+        Any validation failure rejects the whole batch before anything is sent.
+        Bulk sends are not retried: a partially filled batch must not be resent.
+        """
+        errors = []
+        for i, order in enumerate(orders):
+            try:
+                self._validate(order, vault)
+            except Exception as exc:
+                errors.append({"index": i, "symbol": order.symbol, "ok": False, "error": str(exc)})
+        if errors:
+            event_store.add(vault, {"type": "exec_batch", "status": "rejected", "legs": len(orders), "errors": errors})
+            return {"ok": False, "error": "validation failed", "results": errors}
+        register_listener_vault(vault)
+        live = bool(self._env.ENABLE_LIVE_EXEC)
+        groups: Dict[str, List[int]] = {}
+        for i, order in enumerate(orders):
+            groups.setdefault((order.venue or "hyper").lower(), []).append(i)
+        results: List[Dict[str, Any]] = [{} for _ in orders]
+        fills: List[Tuple[Order, str, bool]] = []
+        for venue, idx in groups.items():
+            legs = [orders[i] for i in idx]
+            if venue == "hyper" and not live:
+                client = HyperExecClient()
+                for i, order in zip(idx, legs):
+                    payload = client.build_open_order(order)
+                    results[i] = {"index": i, "symbol": order.symbol, "venue": venue, "ok": True, "dry_run": True, "payload": payload}
+                    fills.append((order, venue, False))
+                continue
+            leg_live = venue == "hyper" and live
+            try:
+                acks = self._resolve_driver(venue).open_bulk(legs)["legs"]
+            except Exception as exc:
+                acks = [{"error": str(exc)}] * len(legs)
+            for i, order, ack in zip(idx, legs, acks):
+                ok = not _payload_has_error(ack)
+                results[i] = {"index": i, "symbol": order.symbol, "venue": venue, "ok": ok, "dry_run": ok and not leg_live, "payload": ack}
+                if ok:
+                    fills.append((order, venue, leg_live))
+        if live and any(live_fill for _, _, live_fill in fills):
+            record_ack(vault)
+        self._apply_fills(vault, fills)
+        ok_count = sum(1 for r in results if r["ok"])
+        if all(r["dry_run"] for r in results):
+            status = "dry_run"
+        elif ok_count == len(results):
+            status = "ack"
+        else:
+            status = "partial" if ok_count else "error"
+        event_store.add(vault, {"type": "exec_batch", "status": status, "legs": len(orders), "filled": ok_count})
+        return {"ok": ok_count == len(results), "results": results}
+
     def close(self, vault: str, symbol: str, size: float | None = None, venue: str = "hyper") -> Dict[str, Any]:
         venue_key = (venue or "hyper").lower()
         register_listener_vault(vault)
-        env = Settings()
+        env = self._env
         if venue_key == "hyper" and not env.ENABLE_LIVE_EXEC:
             payload = HyperExecClient().build_close_order(symbol=symbol, size=size)
             event_store.add(vault, {"type": "exec_close", "status": "dry_run", "payload": payload, "venue": venue_key})
@@ -356,7 +548,7 @@ class ExecService:
                 record_ack(vault)
                 self._apply_position_close(vault, symbol, size, venue_key, live=True)
                 return {"ok": True, "payload": ack, "attempts": attempts}
-            if Settings().ENABLE_CLOSE_FALLBACK_RO:
+            if env.ENABLE_CLOSE_FALLBACK_RO:
                 prof = get_profile(vault)
                 per_venue = prof.get("positionsByVenue", {}) or {}
                 pos = float(per_venue.get(venue_key, {}).get(symbol, 0.0))
@@ -388,3 +580,7 @@ class ExecService:
         except Exception as exc:
             event_store.add(vault, {"type": "exec_close", "status": "error", "error": str(exc), "venue": venue_key})
             return {"ok": False, "error": str(exc)}
+
+
+# shared instance for the API; drivers persist across requests
+service = ExecService()
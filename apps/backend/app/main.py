@@ -8,20 +8,24 @@ from typing import Any, Dict, List, Optional
 
 import asyncio
 import time
-from fastapi import Body, Depends, FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi import Body, Depends, FastAPI, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel, ConfigDict
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from .metrics import compute_metrics
+from .metrics import compute_metrics, compute_metrics_batch, shutdown_pool as shutdown_metrics_pool
 from .hyper_client import HyperHTTP, DEFAULT_API
 from .price_provider import PriceRouter, CachedPriceRouter
 from .hyper_exec import HyperExecClient, Order
-from .cache import TTLCache
+from .cache import FileSignatureCache, TTLCache
 from .settings import settings
-from .positions import get_profile
+from .positions import get_profile, store_generation as positions_store_generation
 from .snapshots import store as snapshot_store
-from .events import store as event_store
-from .exec_service import ExecService
+from .downsample import lttb
+from .events import EVENT_HISTORY_MAX_BYTES, EVENT_RESTORE_MAX_BYTES, store as event_store
+from .exec_service import service as exec_service
+from .exec_scheduler import SchedulerFull, scheduler as exec_scheduler
+from .order_queue import OrderQueueFull, pipeline as order_pipeline
 from .daemon import SnapshotDaemon
 from .user_listener import UserEventsListener, last_ws_event
 from .ack_tracker import last as last_ack_event
@@ -217,20 +221,7 @@ def _collect_status_snapshot(vault_id: str | None = None):
         "exec_max_notional_usd": getattr(settings, "EXEC_MAX_NOTIONAL_USD", None),
         "exec_min_notional_usd": getattr(settings, "EXEC_MIN_NOTIONAL_USD", None),
     }
-    risk_template = {
-        "allowedSymbols": flags["allowed_symbols"],
-        "allowedVenues": flags["allowed_venues"],
-        "minLeverage": flags["exec_min_leverage"],
-        "maxLeverage": flags["exec_max_leverage"],
-        "minNotionalUsd": flags["exec_min_notional_usd"],
-        "maxNotionalUsd": flags["exec_max_notional_usd"],
-    }
-    if vault_id:
-        meta = _lookup_vault_meta(vault_id)
-        risk_override = meta.get("risk") if isinstance(meta, dict) else None
-        if isinstance(risk_override, dict) and risk_override:
-            risk_template = {**risk_template, **risk_override}
-    flags["risk_template"] = risk_template
+    flags["risk_template"] = _risk_template(vault_id)
     try:
         http = HyperHTTP()
         info = http.rpc_ping()
@@ -266,6 +257,20 @@ def _collect_status_snapshot(vault_id: str | None = None):
         "listenerLastTs": last_ws,
         "lastAckTs": last_ack,
     }
+    if _snapshot_daemon is not None:
+        daemon_stats = _snapshot_daemon.stats()
+        state["snapshotQueue"] = daemon_stats.pop("queue")
+        state["snapshotStats"] = daemon_stats
+    state["eventBus"] = event_store.bus.stats()
+    state["exec"] = exec_service.stats()
+    state["orders"] = order_pipeline.stats()
+    state["execScheduler"] = exec_scheduler.stats()
+    alert_stats = alert_manager.stats()
+    if alert_stats is not None:
+        state["alerts"] = {**alert_stats, "rules": alert_manager.rules.stats()}
+    event_log = event_store.log_stats()
+    if event_log is not None:
+        state["eventLog"] = event_log
     return {"ok": True, "flags": flags, "network": rpc, "state": state}
 
 
@@ -311,6 +316,29 @@ def api_status(vault: str | None = None):
     return _collect_status_snapshot(vault)
 
 
+@app.get("/api/v1/ops/snapshots")
+def api_ops_snapshots():
+    """Snapshot daemon timing, failure counters and per-vault last success."""
+    if _snapshot_daemon is None:
+        return {"running": False}
+    return {"running": _snapshot_daemon.is_running(), **_snapshot_daemon.stats(per_vault=True)}
+
+
+@app.post("/api/v1/ops/snapshots/cadence/{vault}")
+def api_ops_snapshot_cadence(
+    vault: str,
+    sec: float | None = None,
+    _token: str | None = Depends(require_deployment_key),
+):
+    """Override a vault's snapshot cadence at runtime; omit `sec` to restore the configured one."""
+    if _snapshot_daemon is None:
+        raise HTTPException(status_code=409, detail="snapshot daemon not running")
+    if sec is not None and sec <= 0:
+        raise HTTPException(status_code=400, detail="sec must be > 0")
+    _snapshot_daemon.set_cadence(vault, sec)
+    return {"vault": vault, "cadenceSec": _snapshot_daemon.cadence(vault), "override": sec is not None}
+
+
 @app.post("/metrics")
 def metrics_endpoint(nav_series: list[float]):
     """Compute basic metrics from a NAV series (daily)."""
@@ -318,12 +346,17 @@ def metrics_endpoint(nav_series: list[float]):
 
 
 # --- v1 API skeleton ---
+def _stored_metrics(address: str) -> Dict[str, Any]:
+    stored = snapshot_store.metrics(address)
+    return stored if stored is not None else compute_metrics([])
+
+
 @app.get("/api/v1/metrics/{address}")
 def api_metrics(address: str, series: Optional[str] = None):
     """Compute metrics for a vault address.
 
     - Optional query `series` as comma-separated NAV values for demo/testing.
-    - In production, NAV would be sourced from storage/indexer.
+    - Otherwise served from the running daily statistics kept by the snapshot store.
     """
     if series:
         try:
@@ -331,29 +364,88 @@ def api_metrics(address: str, series: Optional[str] = None):
         except ValueError:
             return {"error": "invalid series"}
         return compute_metrics(nav)
-    # Fallback demo series
-    demo = [1.0, 1.01, 0.99, 1.03, 1.05]
-    return compute_metrics(demo)
+    return _stored_metrics(address)
+
+
+_ROLLING_WINDOWS = {"30d": 30, "90d": 90, "1y": 365}
+
+
+def _parse_rolling_window(window: str) -> int:
+    key = window.strip().lower()
+    if key in _ROLLING_WINDOWS:
+        return _ROLLING_WINDOWS[key]
+    try:
+        days = int(key[:-1] if key.endswith("d") else key)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="invalid window") from exc
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="invalid window")
+    return days
+
+
+@app.get("/api/v1/metrics/{address}/rolling")
+def api_metrics_rolling(address: str, window: str = "30d"):
+    """Trailing-window metrics over the daily NAV closes of a vault.
+
+    `window` accepts `30d`, `90d`, `1y` or a number of days.
+    """
+    days = _parse_rolling_window(window)
+    starts, engine = snapshot_store.rolling(address)
+    series = [{"ts": starts[i], **engine.at(i, days)} for i in range(days, len(engine))]
+    return {
+        "address": address,
+        "window": window,
+        "days": days,
+        "latest": series[-1] if series else None,
+        "series": series,
+    }
+
+
+class MetricsBatchPayload(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    series: Dict[str, List[float]] = {}
+    vaults: List[str] = []
+
+
+@app.post("/api/v1/metrics/batch")
+def api_metrics_batch(payload: MetricsBatchPayload):
+    """Compute metrics for many inline series and/or stored vault histories at once."""
+    out = compute_metrics_batch(
+        payload.series,
+        pool_min_batch=int(getattr(settings, "METRICS_BATCH_POOL_MIN", 512)),
+        workers=getattr(settings, "METRICS_BATCH_WORKERS", None),
+    )
+    for vid in payload.vaults:
+        out[vid] = _stored_metrics(vid)
+    return {"metrics": out}
 
 
 _nav_cache = TTLCache[str, List[float]](ttl_seconds=float(getattr(settings, "NAV_CACHE_TTL", 2.0)))
+_nav_series_cache = TTLCache[str, List[Dict[str, float]]](
+    ttl_seconds=float(getattr(settings, "NAV_CACHE_TTL", 2.0))
+)
 
 
 @app.get("/api/v1/nav/{address}")
-def api_nav(address: str, window: int = 30):
+def api_nav(address: str, window: int = 30, max_points: int | None = None):
     """Return NAV series for a vault.
 
     v0 demo: compute NAV from a static cash+positions profile per vault id using
     current index prices. Series is a flat timeline using the same NAV value
     repeated, suitable for UI until storage/backfill is added.
+
+    `max_points` reduces stored snapshots with LTTB so charts keep their shape.
     """
-    cache_key = f"{address}:{window}"
+    cache_key = f"{address}:{window}" if max_points is None else f"{address}:{window}:{max_points}"
     cached = _nav_cache.get(cache_key)
     if cached is not None:
         return {"address": address, "nav": cached}
     # Prefer stored snapshots if available
     series = snapshot_store.get(address, window=window)
     if series:
+        if max_points is not None:
+            series = lttb(series, max_points)
         nav = [round(v, 6) for (_, v) in series]
         _nav_cache.set(cache_key, nav)
         return {"address": address, "nav": nav}
@@ -369,19 +461,56 @@ def api_nav(address: str, window: int = 30):
     nav_val = HyperExecClient.pnl_to_nav(
         cash=profile.get("cash", 1_000_000.0), positions=positions_flat, index_prices=prices
     )
-    nav = [round(nav_val / profile.get("denom", 1_000_000.0), 6)] * max(1, window)
+    points = window if max_points is None else min(window, max_points)
+    nav = [round(nav_val / profile.get("denom", 1_000_000.0), 6)] * max(1, points)
     _nav_cache.set(cache_key, nav)
     return {"address": address, "nav": nav}
 
 
 @app.get("/api/v1/nav_series/{address}")
-def api_nav_series(address: str, since: float | None = None, window: int | None = None):
+def api_nav_series(
+    address: str,
+    since: float | None = None,
+    window: int | None = None,
+    resolution: str | None = None,
+    max_points: int | None = None,
+):
+    if resolution and resolution != "raw":
+        try:
+            buckets = snapshot_store.get_rollup(address, resolution, since_ts=since, window=window)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {
+            "address": address,
+            "resolution": resolution,
+            "series": [
+                {
+                    "ts": ts,
+                    "open": round(o, 6),
+                    "high": round(h, 6),
+                    "low": round(lo, 6),
+                    "close": round(c, 6),
+                    "nav": round(c, 6),
+                }
+                for (ts, o, h, lo, c) in buckets
+            ],
+        }
+    cache_key = f"{address}:{since}:{window}:{max_points}"
+    if max_points is not None:
+        cached = _nav_series_cache.get(cache_key)
+        if cached is not None:
+            return {"address": address, "series": cached}
     if since is not None:
         series = snapshot_store.get_since(address, since_ts=float(since))
     else:
         w = window if window is not None else 60
         series = snapshot_store.get(address, window=int(w))
-    return {"address": address, "series": [{"ts": ts, "nav": round(nav, 6)} for (ts, nav) in series]}
+    if max_points is not None:
+        series = lttb(series, max_points)
+    points = [{"ts": ts, "nav": round(nav, 6)} for (ts, nav) in series]
+    if max_points is not None:
+        _nav_series_cache.set(cache_key, points)
+    return {"address": address, "series": points}
 
 
 @app.post("/api/v1/nav/snapshot/{address}")
@@ -412,6 +541,7 @@ def api_nav_snapshot(
         nav = round(nav_val / profile.get("denom", 1_000_000.0), 6)
     snapshot_store.add(address, float(nav), ts)
     _nav_cache.clear()
+    _nav_series_cache.clear()
     logger.info(
         "nav snapshot stored",
         extra={
@@ -429,24 +559,42 @@ def api_nav_snapshot(
 
 
 @app.get("/api/v1/events/{address}")
-def api_events(address: str, limit: int | None = None, since: float | None = None, types: Optional[str] = None):
+def api_events(
+    address: str,
+    limit: int | None = None,
+    since: float | None = None,
+    types: Optional[str] = None,
+    after_seq: int | None = None,
+):
     ty = [t for t in (types.split(',') if types else []) if t]
+    if after_seq is not None:
+        # exact incremental sync: page forward from a per-vault sequence cursor
+        if after_seq < 0:
+            raise HTTPException(status_code=400, detail="after_seq must be >= 0")
+        page = event_store.page(address, after_seq=after_seq, limit=limit, types=ty if ty else None)
+        return {"address": address, **page}
     ev = event_store.list(address, limit=limit, since=since, types=ty if ty else None)
+    if since is not None and not (limit and len(ev) >= limit) and event_store.evicted(address):
+        # older than the in-memory window: stream the rest from the on-disk log
+        oldest = event_store.oldest_ts(address)
+        if oldest is None or since < oldest:
+            older = event_store.history(
+                address, since=since, until=oldest, types=ty if ty else None, max_bytes=EVENT_HISTORY_MAX_BYTES
+            )
+            if older:
+                ev = older + ev
+                if limit and limit > 0:
+                    ev = ev[-limit:]
     return {"address": address, "events": ev}
 
 
 # --- Markets & Prices ---
+_DEFAULT_PAIRS: List[Dict[str, object]] = [{"symbol": "BTC", "leverage": 5}, {"symbol": "ETH", "leverage": 5}]
+
+
 def _load_pairs_from_deployments() -> List[Dict[str, object]]:
-    f = Path("deployments") / "hyper-testnet.json"
-    if f.exists():
-        try:
-            data = json.loads(f.read_text())
-            pairs = data.get("config", {}).get("pairs", [])
-            if isinstance(pairs, list) and pairs:
-                return pairs
-        except Exception:
-            pass
-    return [{"symbol": "BTC", "leverage": 5}, {"symbol": "ETH", "leverage": 5}]
+    pairs = _deployments_model()["pairs"]
+    return [dict(p) for p in pairs] if pairs else [dict(p) for p in _DEFAULT_PAIRS]
 
 
 def _deployments_path() -> Path:
@@ -468,6 +616,7 @@ def _write_deployments_doc(doc: Dict[str, Any]) -> None:
     f.parent.mkdir(parents=True, exist_ok=True)
     text = json.dumps(doc, indent=2, ensure_ascii=False)
     f.write_text(text + "\n", encoding="utf-8")
+    _invalidate_deployments()
 
 
 def _ensure_deployments_container(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -488,28 +637,78 @@ def _ensure_deployments_container(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
     return cleaned
 
 
-def _load_deployments_meta() -> List[Dict[str, object]]:
-    data = _read_deployments_doc()
+def _build_deployments_model(f: Path) -> Dict[str, Any]:
+    """Parse a deployments doc into pairs and per-vault meta keyed by lowercase vault id."""
+    data: Dict[str, Any] = {}
+    if f.exists():
+        try:
+            data = json.loads(f.read_text() or "{}")
+        except Exception:
+            data = {}
+    if not isinstance(data, dict):
+        data = {}
+    config = data.get("config")
+    pairs = config.get("pairs") if isinstance(config, dict) else None
     deployments = data.get("deployments")
     if isinstance(deployments, list):
-        return [d for d in deployments if isinstance(d, dict)]
-    legacy = {}
-    if isinstance(data.get("vault"), str):
-        legacy["vault"] = data.get("vault")
-    if data.get("asset"):
-        legacy["asset"] = data.get("asset")
-    return [legacy] if legacy.get("vault") else []
+        entries = [d for d in deployments if isinstance(d, dict)]
+    else:
+        legacy: Dict[str, object] = {}
+        if isinstance(data.get("vault"), str):
+            legacy["vault"] = data.get("vault")
+        if data.get("asset"):
+            legacy["asset"] = data.get("asset")
+        entries = [legacy] if legacy.get("vault") else []
+    meta: Dict[str, Dict[str, object]] = {}
+    for entry in entries:
+        val = entry.get("vault")
+        if isinstance(val, str):
+            # first entry wins, as the old linear scan did
+            meta.setdefault(val.lower(), entry)
+    return {
+        "pairs": [p for p in pairs if isinstance(p, dict)] if isinstance(pairs, list) else [],
+        "meta": meta,
+    }
+
+
+# bumped on in-process writes so same-tick rewrites are never served stale
+_deployments_generation = 0
+_deployments_cache = FileSignatureCache[Dict[str, Any]]()
+
+
+def _deployments_model() -> Dict[str, Any]:
+    f = _deployments_path()
+    return _deployments_cache.get([f], lambda: _build_deployments_model(f), extra=_deployments_generation)
+
+
+def _invalidate_deployments() -> None:
+    global _deployments_generation
+    _deployments_generation += 1
+    _vault_index_cache.clear()
 
 
 def _lookup_vault_meta(vault_id: str | None) -> Dict[str, object]:
+    """Deployment entry for `vault_id` (case-insensitive); treat the result as read-only."""
     if not vault_id:
         return {}
-    vid = vault_id.lower()
-    for entry in _load_deployments_meta():
-        val = entry.get("vault")
-        if isinstance(val, str) and val.lower() == vid:
-            return entry
-    return {}
+    return _deployments_model()["meta"].get(vault_id.lower(), {})
+
+
+def _risk_template(vault_id: str | None = None) -> Dict[str, object]:
+    """Execution risk limits from settings, overlaid with the vault's deployment override."""
+    template: Dict[str, object] = {
+        "allowedSymbols": getattr(settings, "EXEC_ALLOWED_SYMBOLS", ""),
+        "allowedVenues": getattr(settings, "EXEC_ALLOWED_VENUES", "hyper"),
+        "minLeverage": getattr(settings, "EXEC_MIN_LEVERAGE", None),
+        "maxLeverage": getattr(settings, "EXEC_MAX_LEVERAGE", None),
+        "minNotionalUsd": getattr(settings, "EXEC_MIN_NOTIONAL_USD", None),
+        "maxNotionalUsd": getattr(settings, "EXEC_MAX_NOTIONAL_USD", None),
+    }
+    if vault_id:
+        risk_override = _lookup_vault_meta(vault_id).get("risk")
+        if isinstance(risk_override, dict) and risk_override:
+            template = {**template, **risk_override}
+    return template
 
 
 _RISK_FIELDS = {
@@ -607,7 +806,7 @@ def _ensure_quant_orders_enabled() -> None:
         raise HTTPException(status_code=503, detail="quant order api disabled")
 
 
-class QuantOrderPayload(BaseModel):
+class QuantLegPayload(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     symbol: str
@@ -621,7 +820,6 @@ class QuantOrderPayload(BaseModel):
     time_in_force: str | None = None
     stop_loss: float | None = None
     take_profit: float | None = None
-    vault: str = "_global"
 
     def to_order(self) -> Order:
         return Order(
@@ -639,6 +837,17 @@ class QuantOrderPayload(BaseModel):
         )
 
 
+class QuantOrderPayload(QuantLegPayload):
+    vault: str = "_global"
+
+
+class QuantBatchPayload(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    vault: str = "_global"
+    legs: List[QuantLegPayload]
+
+
 class QuantClosePayload(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -654,6 +863,8 @@ def api_markets():
 
 
 _price_provider = CachedPriceRouter()
+# pre-trade notional checks read this provider's price book
+exec_service.use_prices(_price_provider)
 
 
 @app.get("/api/v1/price")
@@ -723,35 +934,32 @@ async def ws_quant(websocket: WebSocket):
         interval = 5.0
     interval = max(1.0, min(interval, 30.0))
     last_positions: Dict[str, float] | None = None
-    event_cursor: float | None = None
-    EVENT_CURSOR_EPS = 1e-6
     MAX_BOOT_EVENTS = 20
+    # subscribe before the bootstrap read so nothing falls in between
+    sub = event_store.bus.subscribe(vault)
     try:
+        events = event_store.list(vault, limit=MAX_BOOT_EVENTS)
+        booted = {id(e) for e in events}
+        payload: Dict[str, Any] = {}
+        prices: Dict[str, float] = {}
+        next_status = 0.0
         while True:
-            payload = _collect_status_snapshot()
-            try:
-                profile = get_profile(vault)
-            except Exception:
-                profile = {}
-            allowed_symbols = payload["flags"].get("allowed_symbols") or ""
-            symbols = [s.strip().upper() for s in allowed_symbols.split(",") if s.strip()]
-            prices: Dict[str, float] = {}
-            if symbols:
+            # status (RPC ping) and prices refresh once per interval; events push a
+            # snapshot immediately with only the positions re-read. Blocking reads
+            # run in the threadpool so one slow RPC does not stall the event loop.
+            if time.monotonic() >= next_status:
+                payload = await run_in_threadpool(_collect_status_snapshot)
+                allowed_symbols = payload["flags"].get("allowed_symbols") or ""
+                symbols = [s.strip().upper() for s in allowed_symbols.split(",") if s.strip()]
                 try:
-                    prices = _price_provider.get_index_prices(symbols)
+                    prices = await run_in_threadpool(_price_provider.get_index_prices, symbols) if symbols else {}
                 except Exception:
                     prices = {}
-            events: List[Dict[str, Any]]
-            if event_cursor is None:
-                events = event_store.list(vault, limit=MAX_BOOT_EVENTS)
-            else:
-                events = event_store.list(vault, since=event_cursor)
-            if events:
-                try:
-                    latest = max(float(e.get("ts", 0.0)) for e in events)
-                except Exception:
-                    latest = time.time()
-                event_cursor = latest + EVENT_CURSOR_EPS
+                next_status = time.monotonic() + interval
+            try:
+                profile = await run_in_threadpool(get_profile, vault)
+            except Exception:
+                profile = {}
             positions_map = _flat_positions(profile)
             deltas = _positions_delta(last_positions, positions_map)
             last_positions = dict(positions_map)
@@ -769,9 +977,17 @@ async def ws_quant(websocket: WebSocket):
             if deltas:
                 message["deltas"] = {"positions": deltas}
             await websocket.send_json(message)
-            await asyncio.sleep(interval)
+            while True:
+                events = await sub.next_batch(timeout=max(0.0, next_status - time.monotonic()))
+                if booted and events:
+                    events = [e for e in events if id(e) not in booted]
+                    booted = set()
+                if events or time.monotonic() >= next_status:
+                    break
     except WebSocketDisconnect:
         return
+    finally:
+        sub.close()
 
 
 @app.post("/api/v1/register_deployment")
@@ -829,6 +1045,7 @@ def api_register_deployment(
         meta["name"] = name
     f.parent.mkdir(parents=True, exist_ok=True)
     f.write_text(json.dumps(meta, indent=2, ensure_ascii=False))
+    _invalidate_deployments()
     logger.info(
         "deployment metadata updated",
         extra={
@@ -844,8 +1061,27 @@ def api_register_deployment(
 
 
 # --- Exec Service (dry-run env-controlled) ---
+async def _run_serialized(vault: str, job):
+    """Run order work in the vault's queue on the exec scheduler and await it.
+
+    Gives up with 503 after EXEC_REQUEST_TIMEOUT_SEC; a job still queued by
+    then is cancelled, one already running is left to finish.
+    """
+    try:
+        fut = exec_scheduler.submit(vault, job)
+    except SchedulerFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    timeout = float(settings.EXEC_REQUEST_TIMEOUT_SEC or 0) or None
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(fut), timeout)
+    except asyncio.TimeoutError as exc:
+        # wait_for cancels the wrapper, which cancels `fut` unless it already started
+        detail = "exec timed out in queue" if fut.cancelled() else "exec timed out; order may still complete"
+        raise HTTPException(status_code=503, detail=detail) from exc
+
+
 @app.post("/api/v1/exec/open")
-def api_exec_open(
+async def api_exec_open(
     symbol: str,
     size: float,
     side: str,
@@ -860,23 +1096,20 @@ def api_exec_open(
     vault: str = "_global",
     _token: str | None = Depends(require_deployment_key),
 ):
-    svc = ExecService()
-    result = svc.open(
-        vault,
-        Order(
-            symbol=symbol,
-            size=size,
-            side=side,
-            venue=venue,
-            reduce_only=reduce_only,
-            leverage=leverage,
-            order_type=order_type,
-            limit_price=limit_price,
-            time_in_force=time_in_force,
-            stop_loss=stop_loss,
-            take_profit=take_profit,
-        ),
+    order = Order(
+        symbol=symbol,
+        size=size,
+        side=side,
+        venue=venue,
+        reduce_only=reduce_only,
+        leverage=leverage,
+        order_type=order_type,
+        limit_price=limit_price,
+        time_in_force=time_in_force,
+        stop_loss=stop_loss,
+        take_profit=take_profit,
     )
+    result = await _run_serialized(vault, lambda: exec_service.open(vault, order))
     logger.info(
         "exec.open processed",
         extra={
@@ -899,15 +1132,14 @@ def api_exec_open(
 
 
 @app.post("/api/v1/exec/close")
-def api_exec_close(
+async def api_exec_close(
     symbol: str,
     size: float | None = None,
     venue: str = "hyper",
     vault: str = "_global",
     _token: str | None = Depends(require_deployment_key),
 ):
-    svc = ExecService()
-    result = svc.close(vault, symbol=symbol, size=size, venue=venue)
+    result = await _run_serialized(vault, lambda: exec_service.close(vault, symbol=symbol, size=size, venue=venue))
     logger.info(
         "exec.close processed",
         extra={
@@ -924,29 +1156,48 @@ def api_exec_close(
 
 
 @app.get("/api/v1/pretrade")
-def api_pretrade(symbol: str, size: float, side: str, reduce_only: bool = False, leverage: float | None = None, venue: str = "hyper"):
-    svc = ExecService()
+def api_pretrade(
+    symbol: str,
+    size: float,
+    side: str,
+    reduce_only: bool = False,
+    leverage: float | None = None,
+    venue: str = "hyper",
+    vault: str | None = None,
+):
     try:
-        svc._validate(Order(symbol=symbol, size=size, side=side, reduce_only=reduce_only, leverage=leverage, venue=venue))
+        exec_service._validate(
+            Order(symbol=symbol, size=size, side=side, reduce_only=reduce_only, leverage=leverage, venue=venue),
+            vault,
+        )
         return {"ok": True}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
 
 # --- Vaults registry (derive from deployments & positions) ---
-def _vault_registry() -> List[Dict[str, object]]:
+_DEMO_VAULTS: List[Dict[str, object]] = [
+    {"id": "0x1234...5678", "name": "Alpha Momentum Strategy", "type": "public"},
+    {"id": "0x8765...4321", "name": "Quant Arbitrage Fund", "type": "private"},
+]
+
+
+def _registry_positions_path() -> Path:
+    pos_path = os.getenv("POSITIONS_FILE")
+    if pos_path:
+        path = Path(pos_path)
+        if not path.is_absolute():
+            path = REPO_ROOT / path
+        return path
+    return REPO_ROOT / "deployments" / "positions.json"
+
+
+def _build_vault_index(pos_path: Path, dep_path: Path) -> Dict[str, Dict[str, object]]:
     out: Dict[str, Dict[str, object]] = {}
     # 1) positions.json keys → default private vaults
     try:
-        pos_path = os.getenv("POSITIONS_FILE")
-        if pos_path:
-            path = Path(pos_path)
-            if not path.is_absolute():
-                path = REPO_ROOT / path
-        else:
-            path = REPO_ROOT / "deployments" / "positions.json"
-        if path.exists():
-            data = json.loads(path.read_text() or "{}")
+        if pos_path.exists():
+            data = json.loads(pos_path.read_text() or "{}")
             if isinstance(data, dict):
                 for vid in data.keys():
                     if isinstance(vid, str):
@@ -959,9 +1210,8 @@ def _vault_registry() -> List[Dict[str, object]]:
         pass
     # 2) deployments/hyper-testnet.json vault → prefer public entry if present
     try:
-        d = REPO_ROOT / "deployments" / "hyper-testnet.json"
-        if d.exists():
-            meta = json.loads(d.read_text() or "{}")
+        if dep_path.exists():
+            meta = json.loads(dep_path.read_text() or "{}")
             deployments = []
             if isinstance(meta.get("deployments"), list):
                 deployments = meta["deployments"]
@@ -980,11 +1230,39 @@ def _vault_registry() -> List[Dict[str, object]]:
         pass
     # fallback demo if empty
     if not out:
-        return [
-            {"id": "0x1234...5678", "name": "Alpha Momentum Strategy", "type": "public"},
-            {"id": "0x8765...4321", "name": "Quant Arbitrage Fund", "type": "private"},
-        ]
-    return list(out.values())
+        return {str(v["id"]): dict(v) for v in _DEMO_VAULTS}
+    return out
+
+
+_vault_index_cache = FileSignatureCache[Dict[str, Dict[str, object]]]()
+
+
+def _vault_index() -> Dict[str, Dict[str, object]]:
+    """Registry keyed by vault id; rebuilt only when positions/deployments files change."""
+    pos_path = _registry_positions_path()
+    dep_path = _deployments_path()
+    return _vault_index_cache.get(
+        [pos_path, dep_path],
+        lambda: _build_vault_index(pos_path, dep_path),
+        extra=positions_store_generation(),
+    )
+
+
+def _vault_registry() -> List[Dict[str, object]]:
+    return list(_vault_index().values())
+
+
+def _snapshot_cadence(entry: Dict[str, object]) -> float:
+    """Snapshot cadence for a registry entry: per-vault override, then per-type default."""
+    meta = _lookup_vault_meta(str(entry.get("id")))
+    override = meta.get("snapshotIntervalSec")
+    if isinstance(override, (int, float)) and override > 0:
+        return float(override)
+    if entry.get("type") == "public":
+        per_type = getattr(settings, "SNAPSHOT_PUBLIC_INTERVAL_SEC", None)
+    else:
+        per_type = getattr(settings, "SNAPSHOT_PRIVATE_INTERVAL_SEC", None)
+    return float(per_type or settings.SNAPSHOT_INTERVAL_SEC)
 
 
 # demo profiles were replaced by file-backed store (deployments/positions.json)
@@ -992,13 +1270,13 @@ def _vault_registry() -> List[Dict[str, object]]:
 
 @app.get("/api/v1/vaults")
 def api_vaults():
-    return {"vaults": _vault_registry()}
+    return {"vaults": [{**v, "metrics": _stored_metrics(str(v["id"]))} for v in _vault_registry()]}
 
 
 @app.get("/api/v1/vaults/{vault_id}")
 def api_vault_detail(vault_id: str):
     # basic info from registry
-    info = next((v for v in _vault_registry() if v["id"] == vault_id), None)
+    info = _vault_index().get(vault_id)
     if info is None:
         info = {"id": vault_id, "name": "Vault", "type": "private"}
     # compute NAV + metrics
@@ -1013,27 +1291,10 @@ def api_vault_detail(vault_id: str):
         cash=profile.get("cash", 1_000_000.0), positions=positions_flat, index_prices=prices
     )
     unit_nav = round(nav_val / profile.get("denom", 1_000_000.0), 6)
-    nav_series = [unit_nav] * 60
-    m = compute_metrics(nav_series)
+    m = _stored_metrics(vault_id)
     # Attempt to enrich with deployment meta (asset address, if known)
-    asset_addr = None
-    try:
-        d = REPO_ROOT / "deployments" / "hyper-testnet.json"
-        if d.exists():
-            meta = json.loads(d.read_text() or "{}")
-            deployments = []
-            if isinstance(meta.get("deployments"), list):
-                deployments = meta["deployments"]
-            elif meta.get("vault"):
-                deployments = [{"vault": meta.get("vault"), "asset": meta.get("asset")}]
-            for entry in deployments:
-                if isinstance(entry, dict) and entry.get("vault") == vault_id:
-                    a = entry.get("asset")
-                    if isinstance(a, str) and a:
-                        asset_addr = a
-                        break
-    except Exception:
-        pass
+    asset = _lookup_vault_meta(vault_id).get("asset")
+    asset_addr = asset if isinstance(asset, str) and asset else None
     return {
         **info,
         "metrics": m,
@@ -1049,10 +1310,10 @@ def api_vault_detail(vault_id: str):
 
 @app.get("/api/v1/vaults/{vault_id}/risk")
 def api_vault_risk(vault_id: str):
-    base = _collect_status_snapshot().get("flags", {}).get("risk_template", {})
-    effective = _collect_status_snapshot(vault_id).get("flags", {}).get("risk_template", {})
     meta = _lookup_vault_meta(vault_id)
     override = meta.get("risk") if isinstance(meta.get("risk"), dict) else {}
+    base = _risk_template()
+    effective = _risk_template(vault_id)
     return {"vault": vault_id, "base": base, "override": override or {}, "effective": effective}
 
 
@@ -1066,8 +1327,8 @@ def api_vault_risk_update(
     else:
         to_set, to_remove = {}, set(_RISK_FIELDS)
     override = _persist_vault_risk_override(vault_id, to_set, to_remove)
-    base = _collect_status_snapshot().get("flags", {}).get("risk_template", {})
-    effective = _collect_status_snapshot(vault_id).get("flags", {}).get("risk_template", {})
+    base = _risk_template()
+    effective = _risk_template(vault_id)
     return {"vault": vault_id, "base": base, "override": override, "effective": effective}
 
 
@@ -1130,27 +1391,81 @@ def api_quant_prices(
     return {"prices": prices}
 
 
+def _queue_order(response: Response, vault: str, kind: str, job) -> Dict[str, Any]:
+    try:
+        record = order_pipeline.submit(vault, kind, job)
+    except OrderQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    response.status_code = 202
+    return {"vault": vault, "orderId": record["orderId"], "status": record["status"]}
+
+
 @app.post("/api/v1/quant/orders/open")
-def api_quant_order_open(
+async def api_quant_order_open(
     payload: QuantOrderPayload,
+    response: Response,
+    run_async: bool = Query(False, alias="async"),
     _key: str | None = Depends(require_quant_key),
 ):
     _ensure_quant_orders_enabled()
-    svc = ExecService()
-    result = svc.open(payload.vault, payload.to_order())
+    order = payload.to_order()
+    if run_async:
+        return _queue_order(response, payload.vault, "open", lambda: exec_service.open(payload.vault, order))
+    result = await _run_serialized(payload.vault, lambda: exec_service.open(payload.vault, order))
     return {"vault": payload.vault, "venue": payload.venue, "result": result}
 
 
+@app.post("/api/v1/quant/orders/batch")
+async def api_quant_order_batch(
+    payload: QuantBatchPayload,
+    response: Response,
+    run_async: bool = Query(False, alias="async"),
+    _key: str | None = Depends(require_quant_key),
+):
+    _ensure_quant_orders_enabled()
+    if not payload.legs:
+        raise HTTPException(status_code=400, detail="legs required")
+    if len(payload.legs) > int(settings.QUANT_BATCH_MAX_LEGS):
+        raise HTTPException(status_code=400, detail=f"at most {settings.QUANT_BATCH_MAX_LEGS} legs per batch")
+    orders = [leg.to_order() for leg in payload.legs]
+    if run_async:
+        return _queue_order(response, payload.vault, "batch", lambda: exec_service.open_batch(payload.vault, orders))
+    result = await _run_serialized(payload.vault, lambda: exec_service.open_batch(payload.vault, orders))
+    return {"vault": payload.vault, "result": result}
+
+
 @app.post("/api/v1/quant/orders/close")
-def api_quant_order_close(
+async def api_quant_order_close(
     payload: QuantClosePayload,
+    response: Response,
+    run_async: bool = Query(False, alias="async"),
     _key: str | None = Depends(require_quant_key),
 ):
     _ensure_quant_orders_enabled()
-    svc = ExecService()
-    result = svc.close(payload.vault, payload.symbol, payload.size, venue=payload.venue)
+    if run_async:
+        return _queue_order(
+            response,
+            payload.vault,
+            "close",
+            lambda: exec_service.close(payload.vault, payload.symbol, payload.size, venue=payload.venue),
+        )
+    result = await _run_serialized(
+        payload.vault,
+        lambda: exec_service.close(payload.vault, payload.symbol, payload.size, venue=payload.venue),
+    )
     return {"vault": payload.vault, "venue": payload.venue, "result": result}
 
+
+@app.get("/api/v1/quant/orders/{order_id}")
+def api_quant_order_status(
+    order_id: str,
+    _key: str | None = Depends(require_quant_key),
+):
+    record = order_pipeline.get(order_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="unknown order")
+    return record
+
 @app.on_event("startup")
 def _startup():
     global _snapshot_daemon, _user_listener
@@ -1162,14 +1477,53 @@ def _startup():
             pass
         try:
             _nav_cache.clear()
+            _nav_series_cache.clear()
         except Exception:
             pass
     except Exception:
         pass
+    try:
+        restored = event_store.restore(max_bytes=EVENT_RESTORE_MAX_BYTES)
+        if restored:
+            logger.info("event history restored", extra={"event": "events.restore", "count": restored})
+    except Exception:
+        pass
+    # per-vault alert rules live under `alerts` in deployments entries; the model
+    # object only changes when the file or its generation does
+    alert_manager.rules.set_rule_source(
+        lambda vid: _lookup_vault_meta(vid).get("alerts"),
+        generation=_deployments_model,
+    )
+    # per-vault risk overrides live under `risk` in deployments entries
+    exec_service.policies.set_override_source(lambda vid: _lookup_vault_meta(vid).get("risk"))
+    # build venue drivers now so the first order does not pay for wallet/Exchange setup
+    try:
+        ready = exec_service.warm_up()
+        if ready:
+            logger.info("exec drivers warmed", extra={"event": "exec.warm_up", "drivers": ready})
+        # fill the price book for notional checks without holding up startup
+        exec_service.refresh_prices()
+    except Exception:
+        pass
     if settings.ENABLE_SNAPSHOT_DAEMON:
+        cadences: Dict[str, float] = {}
+
         def list_ids() -> List[str]:
-            return [v["id"] for v in _vault_registry()]
-        _snapshot_daemon = SnapshotDaemon(list_vaults=list_ids, interval_sec=float(settings.SNAPSHOT_INTERVAL_SEC))
+            entries = _vault_registry()
+            cadences.clear()
+            cadences.update({str(v["id"]): _snapshot_cadence(v) for v in entries})
+            return list(cadences)
+
+        _snapshot_daemon = SnapshotDaemon(
+            list_vaults=list_ids,
+            interval_sec=float(settings.SNAPSHOT_INTERVAL_SEC),
+            cadence_for=lambda vid: cadences.get(vid, float(settings.SNAPSHOT_INTERVAL_SEC)),
+            max_workers=int(settings.SNAPSHOT_MAX_WORKERS),
+            vault_timeout_sec=settings.SNAPSHOT_VAULT_TIMEOUT_SEC,
+            change_threshold_bps=settings.SNAPSHOT_CHANGE_BPS,
+            heartbeat_sec=float(settings.SNAPSHOT_HEARTBEAT_SEC),
+            on_snapshots=alert_manager.on_snapshots,
+        )
         _snapshot_daemon.start()
     if settings.ENABLE_LIVE_EXEC and settings.ENABLE_USER_WS_LISTENER:
         # Use ADDRESS as the logical vault id; for multi-vault setups, consider per-vault routing
@@ -1190,3 +1544,19 @@ def _shutdown():
             _user_listener.stop()
     except Exception:
         pass
+    try:
+        shutdown_metrics_pool()
+    except Exception:
+        pass
+    try:
+        order_pipeline.close()
+    except Exception:
+        pass
+    try:
+        event_store.close()
+    except Exception:
+        pass
+    try:
+        alert_manager.close()
+    except Exception:
+        pass
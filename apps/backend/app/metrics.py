@@ -1,25 +1,24 @@
 from __future__ import annotations
 
-from math import sqrt
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import exp, log, sqrt
+import multiprocessing
+import os
+import threading
+from typing import Dict, List, Sequence
 
+import numpy as np
 
-def _daily_returns(nav: list[float]) -> list[float]:
-    r = []
-    for i in range(1, len(nav)):
-        if nav[i - 1] == 0:
-            continue
-        r.append(nav[i] / nav[i - 1] - 1.0)
-    return r
 
-
-def _mean(x: list[float]) -> float:
-    return sum(x) / len(x) if x else 0.0
-
-
-def _std(x: list[float]) -> float:
-    m = _mean(x)
-    var = sum((v - m) ** 2 for v in x) / (len(x) - 1) if len(x) > 1 else 0.0
-    return sqrt(var)
+def _empty_metrics() -> dict:
+    return {
+        "ann_return": 0.0,
+        "ann_vol": 0.0,
+        "sharpe": 0.0,
+        "mdd": 0.0,
+        "recovery_days": 0,
+    }
 
 
 def compute_metrics(nav: list[float]) -> dict:
@@ -28,44 +27,31 @@ def compute_metrics(nav: list[float]) -> dict:
     max drawdown and recovery days.
     """
     if not nav or len(nav) < 2:
-        return {
-            "ann_return": 0.0,
-            "ann_vol": 0.0,
-            "sharpe": 0.0,
-            "mdd": 0.0,
-            "recovery_days": 0,
-        }
-
-    r = _daily_returns(nav)
-    n = len(r)
-    prod = 1.0
-    for ri in r:
-        prod *= (1.0 + ri)
+        return _empty_metrics()
+    x = np.asarray(nav, dtype=float)
+    prev, cur = x[:-1], x[1:]
+    keep = prev != 0
+    r = cur[keep] / prev[keep] - 1.0
+    n = int(r.size)
+    # multiply.reduce is sequential, matching the loop product bit for bit
+    prod = float(np.multiply.reduce(1.0 + r)) if n else 1.0
     ann_return = prod ** (365.0 / n) - 1.0 if n > 0 else 0.0
-    ann_vol = _std(r) * sqrt(365.0)
+    ann_vol = float(np.std(r, ddof=1)) * sqrt(365.0) if n > 1 else 0.0
     sharpe = ann_return / ann_vol if ann_vol > 1e-12 else 0.0
 
-    # max drawdown & recovery
-    peak = nav[0]
-    mdd = 0.0
-    peak_idx = 0
-    trough_idx = 0
-    for i, v in enumerate(nav):
-        if v > peak:
-            peak = v
-            peak_idx = i
-        dd = (v / peak) - 1.0
-        if dd < mdd:
-            mdd = dd
-            trough_idx = i
-    # recovery days: from trough to first >= peak again
+    peaks = np.maximum.accumulate(x)
+    dd = x / peaks - 1.0
+    trough_idx = int(np.argmin(dd))
+    mdd = float(dd[trough_idx])
+    if mdd >= 0.0:
+        mdd, trough_idx = 0.0, 0
+    # the loop keeps the first index at which the running peak reaches the global max
+    peak_idx = int(np.argmax(x))
     recovery_days = 0
     if trough_idx > peak_idx:
-        target = nav[peak_idx]
-        for j in range(trough_idx, len(nav)):
-            if nav[j] >= target:
-                recovery_days = j - peak_idx
-                break
+        hits = np.flatnonzero(x[trough_idx:] >= x[peak_idx])
+        if hits.size:
+            recovery_days = trough_idx + int(hits[0]) - peak_idx
 
     return {
         "ann_return": ann_return,
@@ -75,3 +61,267 @@ def compute_metrics(nav: list[float]) -> dict:
         "recovery_days": recovery_days,
     }
 
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # never fork: the API process runs other threads whose held locks a child would inherit
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 2, mp_context=ctx)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def compute_metrics_batch(
+    series: Dict[str, List[float]],
+    pool_min_batch: int = 512,
+    workers: int | None = None,
+) -> Dict[str, dict]:
+    """Compute metrics for many NAV series keyed by id.
+
+    Batches of at least `pool_min_batch` series are fanned out to a shared
+    process pool in chunks; smaller ones run inline.
+    """
+    keys = list(series.keys())
+    if pool_min_batch > 0 and len(keys) >= pool_min_batch:
+        pool = _get_pool(workers)
+        chunksize = max(1, len(keys) // (4 * (getattr(pool, "_max_workers", 1) or 1)))
+        results = list(pool.map(compute_metrics, [series[k] for k in keys], chunksize=chunksize))
+        return dict(zip(keys, results))
+    return {k: compute_metrics(series[k]) for k in keys}
+
+
+class RollingStats:
+    """Incremental counterpart of `compute_metrics` for an append-only NAV series.
+
+    Keeps the return product, Welford mean/M2 of returns and the peak/trough
+    state of the drawdown scan so metrics are available in O(1) after each push.
+    """
+
+    __slots__ = (
+        "count",
+        "last",
+        "n",
+        "prod",
+        "mean",
+        "m2",
+        "peak",
+        "peak_idx",
+        "mdd",
+        "trough_idx",
+        "recovered_idx",
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.last = 0.0
+        self.n = 0
+        self.prod = 1.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.peak = 0.0
+        self.peak_idx = 0
+        self.mdd = 0.0
+        self.trough_idx = 0
+        self.recovered_idx: int | None = None
+
+    def copy(self) -> "RollingStats":
+        other = RollingStats.__new__(RollingStats)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def push(self, v: float) -> None:
+        i = self.count
+        if i == 0:
+            self.peak = v
+        else:
+            if self.last != 0:
+                r = v / self.last - 1.0
+                self.n += 1
+                self.prod *= 1.0 + r
+                delta = r - self.mean
+                self.mean += delta / self.n
+                self.m2 += delta * (r - self.mean)
+            if v > self.peak:
+                self.peak = v
+                self.peak_idx = i
+        dd = (v / self.peak) - 1.0 if self.peak else 0.0
+        if dd < self.mdd:
+            self.mdd = dd
+            self.trough_idx = i
+            self.recovered_idx = None
+        elif self.trough_idx > self.peak_idx and self.recovered_idx is None and v >= self.peak:
+            self.recovered_idx = i
+        self.last = v
+        self.count = i + 1
+
+    def to_metrics(self) -> dict:
+        if self.count < 2:
+            return _empty_metrics()
+        n = self.n
+        ann_return = self.prod ** (365.0 / n) - 1.0 if n > 0 else 0.0
+        var = self.m2 / (n - 1) if n > 1 else 0.0
+        ann_vol = sqrt(max(var, 0.0)) * sqrt(365.0)
+        sharpe = ann_return / ann_vol if ann_vol > 1e-12 else 0.0
+        recovery_days = 0
+        if self.trough_idx > self.peak_idx and self.recovered_idx is not None:
+            recovery_days = self.recovered_idx - self.peak_idx
+        return {
+            "ann_return": ann_return,
+            "ann_vol": ann_vol,
+            "sharpe": sharpe,
+            "mdd": self.mdd,
+            "recovery_days": recovery_days,
+        }
+
+
+class _Span:
+    """Max drawdown summary of a contiguous NAV run; `combine` keeps order."""
+
+    __slots__ = ("hi", "lo", "mdd")
+
+    def __init__(self, hi: float, lo: float, mdd: float):
+        self.hi = hi
+        self.lo = lo
+        self.mdd = mdd
+
+    @staticmethod
+    def point(v: float) -> "_Span":
+        return _Span(v, v, 0.0)
+
+    @staticmethod
+    def combine(a: "_Span | None", b: "_Span | None") -> "_Span | None":
+        if a is None:
+            return b
+        if b is None:
+            return a
+        cross = b.lo / a.hi - 1.0 if a.hi else 0.0
+        return _Span(max(a.hi, b.hi), min(a.lo, b.lo), min(a.mdd, b.mdd, cross))
+
+
+class RollingMetrics:
+    """Trailing-window metrics over a daily NAV series.
+
+    Construction is O(n): prefix sums of log-returns (for the compounded
+    return), of simple and squared returns (for volatility), a monotonic
+    deque for the window peak and a two-stack sliding aggregate for the
+    window's max drawdown. Each window query is then O(1).
+
+    `drawdown` is measured against the highest NAV inside the window and
+    `mdd` is the worst such drawdown seen within the window. A NAV that
+    drops to zero or below has no log-return; it is counted separately, so
+    only windows containing one report a -1 (total loss) `ann_return`.
+    """
+
+    def __init__(self, nav: Sequence[float]):
+        self.nav = [float(v) for v in nav]
+        n = len(self.nav)
+        self._cnt = [0] * n
+        # returns whose gross ratio is <= 0 (no finite log); kept out of _log
+        self._bad = [0] * n
+        self._log = [0.0] * n
+        self._s1 = [0.0] * n
+        self._s2 = [0.0] * n
+        for i in range(1, n):
+            prev, cur = self.nav[i - 1], self.nav[i]
+            c, bad, lg = self._cnt[i - 1], self._bad[i - 1], self._log[i - 1]
+            s1, s2 = self._s1[i - 1], self._s2[i - 1]
+            if prev != 0:
+                r = cur / prev - 1.0
+                c += 1
+                if r > -1.0:
+                    lg += log(1.0 + r)
+                else:
+                    bad += 1
+                s1 += r
+                s2 += r * r
+            self._cnt[i], self._bad[i], self._log[i] = c, bad, lg
+            self._s1[i], self._s2[i] = s1, s2
+        self._dd: Dict[int, tuple[List[float], List[float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.nav)
+
+    def _drawdowns(self, window: int) -> tuple[List[float], List[float]]:
+        cached = self._dd.get(window)
+        if cached is not None:
+            return cached
+        n = len(self.nav)
+        dd = [0.0] * n
+        mdd = [0.0] * n
+        peaks: deque[int] = deque()  # indices with decreasing NAV
+        # sliding-window aggregate of (max, min, mdd) as a two-stack queue:
+        # `front` holds aggregates of the oldest items (top = oldest..end of front),
+        # `back_agg` the aggregate of everything pushed since the last transfer.
+        front: List[_Span] = []
+        back: List[float] = []
+        back_agg: _Span | None = None
+        head = 0  # oldest index still in the window
+        for i, v in enumerate(self.nav):
+            start = i - window
+            while peaks and self.nav[peaks[-1]] <= v:
+                peaks.pop()
+            peaks.append(i)
+            while peaks[0] < start:
+                peaks.popleft()
+            peak = self.nav[peaks[0]]
+            dd[i] = v / peak - 1.0 if peak else 0.0
+
+            back.append(v)
+            back_agg = _Span.combine(back_agg, _Span.point(v))
+            while head < start:
+                if not front:
+                    acc: _Span | None = None
+                    for x in reversed(back):
+                        acc = _Span.combine(_Span.point(x), acc)
+                        front.append(acc)
+                    back.clear()
+                    back_agg = None
+                front.pop()
+                head += 1
+            total = _Span.combine(front[-1] if front else None, back_agg)
+            mdd[i] = min(0.0, total.mdd) if total is not None else 0.0
+        self._dd[window] = (dd, mdd)
+        return dd, mdd
+
+    def at(self, end: int, window: int) -> dict:
+        """Metrics for the `window` returns ending at index `end`."""
+        start = max(0, end - window)
+        n = self._cnt[end] - self._cnt[start]
+        if n <= 0:
+            return {**_empty_metrics(), "drawdown": 0.0}
+        if self._bad[end] - self._bad[start]:
+            ann_return = -1.0
+        else:
+            ann_return = exp((self._log[end] - self._log[start]) * 365.0 / n) - 1.0
+        s1 = self._s1[end] - self._s1[start]
+        s2 = self._s2[end] - self._s2[start]
+        var = (s2 - s1 * s1 / n) / (n - 1) if n > 1 else 0.0
+        ann_vol = sqrt(max(var, 0.0)) * sqrt(365.0)
+        sharpe = ann_return / ann_vol if ann_vol > 1e-12 else 0.0
+        dd, mdd = self._drawdowns(window)
+        return {
+            "ann_return": ann_return,
+            "ann_vol": ann_vol,
+            "sharpe": sharpe,
+            "mdd": mdd[end],
+            "drawdown": dd[end],
+        }
+
+    def series(self, window: int) -> List[dict]:
+        """Rolling metrics for every index with a full trailing window."""
+        return [self.at(i, window) for i in range(window, len(self.nav))]
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+import threading
+import time
 
 from .positions import get_profile
-from .price_provider import PriceRouter
+from .price_provider import PriceProvider, PriceRouter
 from .hyper_exec import HyperExecClient
 from .snapshots import store as snapshot_store
 
@@ -23,17 +26,16 @@ def _flatten_positions(profile: Dict[str, Any]) -> Dict[str, float]:
     return {f"hyper::{sym}": float(val) for sym, val in dict(base).items()}
 
 
-def compute_unit_nav(vault_id: str) -> float:
-    prof = get_profile(vault_id)
-    positions_flat = _flatten_positions(prof)
-    syms = list(positions_flat.keys())
-    router = PriceRouter()
-    prices: Dict[str, float] = {}
-    if syms:
-        try:
-            prices = router.get_index_prices(syms)
-        except Exception:
-            prices = {s: 1000.0 + 100.0 * i for i, s in enumerate(syms)}
+def _fetch_prices(router: PriceProvider, syms: list[str]) -> Dict[str, float]:
+    if not syms:
+        return {}
+    try:
+        return router.get_index_prices(syms)
+    except Exception:
+        return {s: 1000.0 + 100.0 * i for i, s in enumerate(syms)}
+
+
+def _unit_nav(prof: Dict[str, Any], positions_flat: Dict[str, float], prices: Dict[str, float]) -> float:
     nav_val = HyperExecClient.pnl_to_nav(
         cash=prof.get("cash", 1_000_000.0),
         positions=positions_flat,
@@ -43,7 +45,101 @@ def compute_unit_nav(vault_id: str) -> float:
     return float(round(unit, 6))
 
 
+def _gross_exposure(prof: Dict[str, Any], positions_flat: Dict[str, float], prices: Dict[str, float]) -> float | None:
+    """Gross notional over NAV (leverage); None when NAV is not positive."""
+    gross = sum(abs(delta * prices.get(sym, 0.0)) for sym, delta in positions_flat.items())
+    nav_val = HyperExecClient.pnl_to_nav(
+        cash=prof.get("cash", 1_000_000.0),
+        positions=positions_flat,
+        index_prices=prices,
+    )
+    return gross / nav_val if nav_val > 0 else None
+
+
+# vault -> gross exposure at its latest snapshot, for the alert rules
+_exposures: Dict[str, float | None] = {}
+
+
+def last_exposure(vault_id: str) -> float | None:
+    return _exposures.get(vault_id)
+
+
+def compute_unit_nav(vault_id: str) -> float:
+    prof = get_profile(vault_id)
+    positions_flat = _flatten_positions(prof)
+    prices = _fetch_prices(PriceRouter(), list(positions_flat.keys()))
+    return _unit_nav(prof, positions_flat, prices)
+
+
 def snapshot_now(vault_id: str) -> float:
-    unit = compute_unit_nav(vault_id)
+    prof = get_profile(vault_id)
+    positions_flat = _flatten_positions(prof)
+    prices = _fetch_prices(PriceRouter(), list(positions_flat.keys()))
+    unit = _unit_nav(prof, positions_flat, prices)
     snapshot_store.add(vault_id, unit, None)
+    _exposures[vault_id] = _gross_exposure(prof, positions_flat, prices)
     return unit
+
+
+@dataclass
+class _Fingerprint:
+    positions: Tuple[Any, ...]
+    prices: Dict[str, float]
+    ts: float
+
+
+_fingerprints: Dict[str, _Fingerprint] = {}
+_fp_lock = threading.Lock()
+
+
+def _positions_key(prof: Dict[str, Any], positions_flat: Dict[str, float]) -> Tuple[Any, ...]:
+    return (prof.get("cash"), prof.get("denom"), tuple(sorted(positions_flat.items())))
+
+
+def _moved(before: Dict[str, float], after: Dict[str, float], threshold_bps: float) -> bool:
+    if before.keys() != after.keys():
+        return True
+    for sym, px in after.items():
+        prev = before[sym]
+        if prev == 0.0:
+            if px != 0.0:
+                return True
+            continue
+        if abs(px / prev - 1.0) * 10_000.0 > threshold_bps:
+            return True
+    return False
+
+
+def snapshot_if_changed(
+    vault_id: str,
+    threshold_bps: float,
+    heartbeat_sec: float,
+    router: PriceProvider | None = None,
+) -> float | None:
+    """Snapshot only when positions changed, a price moved more than `threshold_bps`
+    since the last snapshot, or `heartbeat_sec` elapsed. Returns None when skipped."""
+    prof = get_profile(vault_id)
+    positions_flat = _flatten_positions(prof)
+    prices = _fetch_prices(router or PriceRouter(), list(positions_flat.keys()))
+    pos_key = _positions_key(prof, positions_flat)
+    now = time.time()
+    with _fp_lock:
+        fp = _fingerprints.get(vault_id)
+    if (
+        fp is not None
+        and fp.positions == pos_key
+        and now - fp.ts < heartbeat_sec
+        and not _moved(fp.prices, prices, threshold_bps)
+    ):
+        return None
+    unit = _unit_nav(prof, positions_flat, prices)
+    snapshot_store.add(vault_id, unit, None)
+    _exposures[vault_id] = _gross_exposure(prof, positions_flat, prices)
+    with _fp_lock:
+        _fingerprints[vault_id] = _Fingerprint(positions=pos_key, prices=dict(prices), ts=now)
+    return unit
+
+
+def reset_fingerprints() -> None:
+    with _fp_lock:
+        _fingerprints.clear()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from .events import store as event_store
+from .exec_scheduler import SchedulerFull, VaultScheduler, scheduler
+from .settings import settings
+
+
+class OrderQueueFull(RuntimeError):
+    pass
+
+
+class OrderPipeline:
+    """Runs order work on the exec scheduler and hands back an order id at once.
+
+    Records go queued -> running -> done | failed (`failed` also covers a
+    result with `ok: false`).
+
+    `submit` queues a job on the vault's FIFO (a full scheduler raises
+    `OrderQueueFull`) and returns its record. The job's result is stored on
+    the record and every status change is logged as an `order` event on the
+    vault, so `/ws/quant` subscribers see progress without polling. The
+    newest `retain` records stay available to `get`.
+    """
+
+    def __init__(self, scheduler: VaultScheduler | None = None, retain: int = 5000):
+        self._scheduler = scheduler or VaultScheduler()
+        self._retain = max(1, int(retain))
+        self._orders: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, vault: str, kind: str, job: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {
+            "orderId": uuid.uuid4().hex,
+            "vault": vault,
+            "kind": kind,
+            "status": "queued",
+            "submittedAt": time.time(),
+        }
+        # events are published outside the lock; the job waits for "queued" to be
+        # logged so it cannot report "running" first
+        queued = threading.Event()
+        with self._lock:
+            try:
+                self._scheduler.submit(vault, lambda: self._execute(record, job, queued))
+            except SchedulerFull:
+                raise OrderQueueFull("order queue full") from None
+            self._orders[record["orderId"]] = record
+            while len(self._orders) > self._retain:
+                self._orders.popitem(last=False)
+            self.submitted += 1
+            snapshot = dict(record)
+        self._publish(snapshot)
+        queued.set()
+        return snapshot
+
+    def get(self, order_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            record = self._orders.get(order_id)
+            return dict(record) if record is not None else None
+
+    def _publish(self, record: Dict[str, Any]) -> None:
+        event: Dict[str, Any] = {
+            "type": "order",
+            "orderId": record["orderId"],
+            "kind": record["kind"],
+            "status": record["status"],
+        }
+        if "result" in record:
+            event["ok"] = bool(record["result"].get("ok"))
+        if "error" in record:
+            event["error"] = record["error"]
+        try:
+            event_store.add(record["vault"], event)
+        except Exception:
+            pass
+
+    def _execute(self, record: Dict[str, Any], job: Callable[[], Dict[str, Any]], queued: threading.Event) -> None:
+        with self._lock:
+            record["status"] = "running"
+            record["startedAt"] = time.time()
+            snapshot = dict(record)
+        queued.wait()
+        self._publish(snapshot)
+        try:
+            result = job()
+            error = None
+        except Exception as exc:
+            result, error = None, str(exc)
+        with self._lock:
+            record["finishedAt"] = time.time()
+            if error is None and isinstance(result, dict):
+                record["result"] = result
+                record["status"] = "done" if result.get("ok") else "failed"
+            else:
+                record["error"] = error or "invalid result"
+                record["status"] = "failed"
+            if record["status"] == "done":
+                self.completed += 1
+            else:
+                self.failed += 1
+            snapshot = dict(record)
+        self._publish(snapshot)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Block until everything scheduled so far has run."""
+        return self._scheduler.join(timeout)
+
+    def close(self) -> None:
+        self._scheduler.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "retained": len(self._orders),
+            }
+
+
+pipeline = OrderPipeline(scheduler, retain=int(settings.EXEC_ORDER_RETAIN))
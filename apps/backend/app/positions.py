@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, Tuple
 
 
 def _repo_root() -> Path:
@@ -25,6 +26,16 @@ def _positions_path() -> Path:
     return path
 
 
+_generation = 0
+# all vaults share one file; serialize read-modify-write cycles across threads
+_write_lock = threading.RLock()
+
+
+def store_generation() -> int:
+    """Number of writes made through this module (for cache invalidation)."""
+    return _generation
+
+
 def _read_all() -> Dict[str, Any]:
     store = _positions_path()
     if not store.exists():
@@ -36,9 +47,11 @@ def _read_all() -> Dict[str, Any]:
 
 
 def _write_all(data: Dict[str, Any]) -> None:
+    global _generation
     store = _positions_path()
     store.parent.mkdir(parents=True, exist_ok=True)
     store.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+    _generation += 1
 
 
 def _compose_key(symbol: str, venue: str | None) -> str:
@@ -98,47 +111,56 @@ def set_profile(vault_id: str, profile: Dict[str, Any]) -> None:
     raw = _prepare_raw_positions(profile)
     cash = float(profile.get("cash", 0.0))
     denom = float(profile.get("denom", max(cash, 1.0)))
-    data = _read_all()
-    data[vault_id] = {"cash": cash, "positions": raw, "denom": denom}
-    _write_all(data)
+    with _write_lock:
+        data = _read_all()
+        data[vault_id] = {"cash": cash, "positions": raw, "denom": denom}
+        _write_all(data)
 
 
 def apply_fill(vault_id: str, symbol: str, size: float, side: str, *, venue: str = "hyper") -> Dict[str, Any]:
     """Apply a filled order (open) and persist."""
-    delta = float(size) if side == "buy" else -float(size)
-    data = _read_all()
-    prof = dict(data.get(vault_id, {}))
-    raw = {str(k): float(v) for k, v in dict(prof.get("positions", {})).items()}
-    key = _compose_key(symbol, venue)
-    raw[key] = raw.get(key, 0.0) + delta
-    prof["positions"] = raw
-    prof.setdefault("cash", 1_000_000.0)
-    prof.setdefault("denom", max(float(prof["cash"]), 1.0))
-    data[vault_id] = prof
-    _write_all(data)
+    return apply_fills(vault_id, [(symbol, size, side, venue)])
+
+
+def apply_fills(vault_id: str, fills: Iterable[Tuple[str, float, str, str]]) -> Dict[str, Any]:
+    """Apply several (symbol, size, side, venue) fills with a single write."""
+    with _write_lock:
+        data = _read_all()
+        prof = dict(data.get(vault_id, {}))
+        raw = {str(k): float(v) for k, v in dict(prof.get("positions", {})).items()}
+        for symbol, size, side, venue in fills:
+            delta = float(size) if side == "buy" else -float(size)
+            key = _compose_key(symbol, venue)
+            raw[key] = raw.get(key, 0.0) + delta
+        prof["positions"] = raw
+        prof.setdefault("cash", 1_000_000.0)
+        prof.setdefault("denom", max(float(prof["cash"]), 1.0))
+        data[vault_id] = prof
+        _write_all(data)
     return get_profile(vault_id)
 
 
 def apply_close(vault_id: str, symbol: str, size: float | None = None, *, venue: str = "hyper") -> Dict[str, Any]:
     """Reduce exposure. If size=None, fully close the venue-specific leg."""
-    data = _read_all()
-    prof = dict(data.get(vault_id, {}))
-    raw = {str(k): float(v) for k, v in dict(prof.get("positions", {})).items()}
-    key = _compose_key(symbol, venue)
-    cur = raw.get(key, 0.0)
-    if size is None:
-        raw[key] = 0.0
-    else:
-        s = float(size)
-        if cur > 0:
-            raw[key] = max(0.0, cur - s)
-        elif cur < 0:
-            raw[key] = min(0.0, cur + s)
-        else:
+    with _write_lock:
+        data = _read_all()
+        prof = dict(data.get(vault_id, {}))
+        raw = {str(k): float(v) for k, v in dict(prof.get("positions", {})).items()}
+        key = _compose_key(symbol, venue)
+        cur = raw.get(key, 0.0)
+        if size is None:
             raw[key] = 0.0
-    prof["positions"] = raw
-    prof.setdefault("cash", 1_000_000.0)
-    prof.setdefault("denom", max(float(prof["cash"]), 1.0))
-    data[vault_id] = prof
-    _write_all(data)
+        else:
+            s = float(size)
+            if cur > 0:
+                raw[key] = max(0.0, cur - s)
+            elif cur < 0:
+                raw[key] = min(0.0, cur + s)
+            else:
+                raw[key] = 0.0
+        prof["positions"] = raw
+        prof.setdefault("cash", 1_000_000.0)
+        prof.setdefault("denom", max(float(prof["cash"]), 1.0))
+        data[vault_id] = prof
+        _write_all(data)
     return get_profile(vault_id)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import time
 
 from .hyper_client import HyperHTTP
@@ -132,6 +132,22 @@ class CachedPriceRouter(PriceProvider):
         ttl = ttl_seconds if ttl_seconds is not None else float(getattr(settings, "PRICE_CACHE_TTL", 5.0))
         self.cache = TTLCache[str, Dict[str, float]](ttl_seconds=ttl)
         self.last_good: Dict[str, Dict[str, float]] = {}
+        # latest price per `venue::SYMBOL`, whatever request fetched it: (price, fetched_at)
+        self.book: Dict[str, Tuple[float, float]] = {}
+
+    @staticmethod
+    def _book_key(token: str) -> str:
+        if "::" in token:
+            venue, sym = token.split("::", 1)
+            return f"{venue.lower()}::{sym.upper()}"
+        return f"hyper::{token.upper()}"
+
+    def peek(self, token: str, max_age: float) -> float | None:
+        """Last fetched price for `token` if younger than `max_age` seconds; never fetches."""
+        entry = self.book.get(self._book_key(token))
+        if entry is None or time.time() - entry[1] > max_age:
+            return None
+        return entry[0]
 
     def get_index_prices(self, symbols: List[str]) -> Dict[str, float]:
         key = ",".join(sorted([s for s in symbols if s]))
@@ -162,4 +178,7 @@ class CachedPriceRouter(PriceProvider):
             return {}
         self.cache.set(key, data)
         self.last_good[key] = data
+        now = time.time()
+        for token, value in data.items():
+            self.book[self._book_key(token)] = (value, now)
         return data
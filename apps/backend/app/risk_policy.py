@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Mapping
+
+from .hyper_exec import Order
+
+# deployments `risk` keys -> RiskPolicy fields
+_SPEC_LIMITS = {
+    "minLeverage": "min_leverage",
+    "maxLeverage": "max_leverage",
+    "minNotionalUsd": "min_notional",
+    "maxNotionalUsd": "max_notional",
+}
+
+
+def _csv_set(value: Any, *, upper: bool) -> FrozenSet[str]:
+    if isinstance(value, str):
+        tokens = value.replace(";", ",").split(",")
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        tokens = [str(v) for v in value]
+    else:
+        return frozenset()
+    return frozenset((t.strip().upper() if upper else t.strip().lower()) for t in tokens if t.strip())
+
+
+class RiskPolicy:
+    """Compiled pre-trade limits for one vault; `check` does no I/O."""
+
+    __slots__ = ("symbols", "venues", "min_leverage", "max_leverage", "min_notional", "max_notional", "source")
+
+    def __init__(
+        self,
+        symbols: FrozenSet[str] = frozenset(),
+        venues: FrozenSet[str] = frozenset({"hyper"}),
+        min_leverage: float = 1.0,
+        max_leverage: float = 50.0,
+        min_notional: float = 0.0,
+        max_notional: float = float("inf"),
+        source: object = None,
+    ):
+        self.symbols = symbols
+        self.venues = venues
+        self.min_leverage = min_leverage
+        self.max_leverage = max_leverage
+        self.min_notional = min_notional
+        self.max_notional = max_notional
+        # the spec object this was compiled from, to detect changes by identity
+        self.source = source
+
+    @classmethod
+    def from_settings(cls, env: Any) -> "RiskPolicy":
+        return cls(
+            symbols=_csv_set(env.EXEC_ALLOWED_SYMBOLS, upper=True),
+            venues=_csv_set(getattr(env, "EXEC_ALLOWED_VENUES", "hyper"), upper=False),
+            min_leverage=float(env.EXEC_MIN_LEVERAGE),
+            max_leverage=float(env.EXEC_MAX_LEVERAGE),
+            min_notional=float(env.EXEC_MIN_NOTIONAL_USD),
+            max_notional=float(env.EXEC_MAX_NOTIONAL_USD),
+        )
+
+    def check(self, order: Order) -> None:
+        """Raise ValueError if `order` breaks a limit other than notional."""
+        if (order.venue or "hyper").lower() not in self.venues:
+            raise ValueError("venue not allowed")
+        if order.symbol.upper() not in self.symbols:
+            raise ValueError("symbol not allowed")
+        if order.size <= 0:
+            raise ValueError("size must be > 0")
+        lev = order.leverage if order.leverage is not None else self.min_leverage
+        if lev < self.min_leverage or lev > self.max_leverage:
+            raise ValueError("leverage out of range")
+        kind = (order.order_type or "market").lower()
+        if kind not in {"market", "limit"}:
+            raise ValueError("unsupported order_type")
+        if kind == "limit" and (order.limit_price is None or order.limit_price <= 0):
+            raise ValueError("limit_price required for limit order")
+        if order.stop_loss is not None and order.stop_loss <= 0:
+            raise ValueError("stop_loss must be positive")
+        if order.take_profit is not None and order.take_profit <= 0:
+            raise ValueError("take_profit must be positive")
+
+    def check_notional(self, order: Order, price: float) -> None:
+        """Notional limits; skipped when no price is known."""
+        if price > 0.0:
+            notional = abs(order.size) * price
+            if notional > self.max_notional:
+                raise ValueError("notional exceeds limit")
+            if notional < self.min_notional:
+                raise ValueError("notional below minimum")
+
+
+def compile_policy(spec: Mapping[str, Any] | None, defaults: RiskPolicy) -> RiskPolicy:
+    """Overlay a per-vault spec (deployments `risk` entry) on the defaults.
+
+    Empty or unparsable values keep the default.
+    """
+    policy = RiskPolicy(
+        defaults.symbols,
+        defaults.venues,
+        defaults.min_leverage,
+        defaults.max_leverage,
+        defaults.min_notional,
+        defaults.max_notional,
+        spec,
+    )
+    if not isinstance(spec, Mapping):
+        return policy
+    symbols = _csv_set(spec.get("allowedSymbols"), upper=True)
+    if symbols:
+        policy.symbols = symbols
+    venues = _csv_set(spec.get("allowedVenues"), upper=False)
+    if venues:
+        policy.venues = venues
+    for key, field in _SPEC_LIMITS.items():
+        if spec.get(key) is None:
+            continue
+        try:
+            setattr(policy, field, float(spec[key]))
+        except (TypeError, ValueError):
+            pass
+    return policy
+
+
+class PolicyBook:
+    """Per-vault risk policies, recompiled only when the override spec changes.
+
+    `overrides_for(vault)` returns the vault's override mapping; a different
+    object than last time triggers a recompile, the same object is a dict hit.
+    """
+
+    def __init__(
+        self,
+        defaults: RiskPolicy | None = None,
+        overrides_for: Callable[[str], Mapping[str, Any] | None] | None = None,
+    ):
+        self.defaults = defaults or RiskPolicy()
+        self._overrides_for = overrides_for or (lambda _vault: None)
+        self._compiled: Dict[str, RiskPolicy] = {}
+        self._lock = threading.Lock()
+
+    def set_override_source(self, overrides_for: Callable[[str], Mapping[str, Any] | None]) -> None:
+        with self._lock:
+            self._overrides_for = overrides_for
+            self._compiled.clear()
+
+    def set_defaults(self, defaults: RiskPolicy) -> None:
+        with self._lock:
+            self.defaults = defaults
+            self._compiled.clear()
+
+    def policy(self, vault: str | None) -> RiskPolicy:
+        if not vault:
+            return self.defaults
+        try:
+            spec = self._overrides_for(vault)
+        except Exception:
+            spec = None
+        if not spec:
+            return self.defaults
+        compiled = self._compiled.get(vault)
+        if compiled is None or compiled.source is not spec:
+            with self._lock:
+                compiled = self._compiled[vault] = compile_policy(spec, self.defaults)
+        return compiled
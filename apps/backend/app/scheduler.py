@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Dict, List
+
+
+class CadenceScheduler:
+    """Min-heap of vault due times, each vault on its own cadence.
+
+    Rescheduling pushes a fresh heap entry and marks the old one dead, so
+    cadence changes are O(log n). After its first (immediate) run a vault is
+    due on wall-clock multiples of its cadence; boundaries that pass while the
+    vault is overdue are skipped and counted in `missed`.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[list] = []
+        # vault -> live heap entry [due, seq, vault, cadence, alive]
+        self._entries: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.missed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _push(self, vault: str, due: float, cadence: float) -> None:
+        old = self._entries.get(vault)
+        if old is not None:
+            old[4] = False
+        entry = [due, next(self._seq), vault, cadence, True]
+        self._entries[vault] = entry
+        heapq.heappush(self._heap, entry)
+
+    def schedule(self, vault: str, cadence: float, now: float | None = None) -> None:
+        """Add `vault` or change its cadence; a new vault is due immediately."""
+        now = time.time() if now is None else now
+        cadence = max(float(cadence), 1e-3)
+        with self._lock:
+            old = self._entries.get(vault)
+            if old is None:
+                due = now
+            else:
+                # re-prioritise: never later than the next boundary of the new cadence
+                due = min(old[0], math.floor(now / cadence) * cadence + cadence)
+            self._push(vault, due, cadence)
+
+    def remove(self, vault: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(vault, None)
+            if entry is not None:
+                entry[4] = False
+
+    def cadence(self, vault: str) -> float | None:
+        with self._lock:
+            entry = self._entries.get(vault)
+            return entry[3] if entry is not None else None
+
+    def vaults(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def pop_due(self, now: float | None = None) -> List[str]:
+        """Return vaults due at `now` and schedule their next run."""
+        now = time.time() if now is None else now
+        out: List[str] = []
+        lag = 0.0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due, _, vault, cadence, alive = heapq.heappop(self._heap)
+                if not alive:
+                    continue
+                lag = max(lag, now - due)
+                nxt = math.floor(due / cadence) * cadence + cadence
+                if nxt <= now:
+                    skipped = int((now - nxt) // cadence) + 1
+                    self.missed += skipped
+                    nxt += skipped * cadence
+                self._push(vault, nxt, cadence)
+                out.append(vault)
+            # drop dead entries at the top so next_due() stays exact
+            while self._heap and not self._heap[0][4]:
+                heapq.heappop(self._heap)
+        if out:
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+        return out
+
+    def next_due(self) -> float | None:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def lag(self, now: float | None = None) -> float:
+        """Seconds the most overdue vault has been waiting (0 when nothing is due)."""
+        now = time.time() if now is None else now
+        nxt = self.next_due()
+        return max(0.0, now - nxt) if nxt is not None else 0.0
+
+    def stats(self, now: float | None = None) -> Dict[str, float]:
+        return {
+            "vaults": len(self),
+            "lagSec": round(self.lag(now), 6),
+            "lastLagSec": round(self.last_lag, 6),
+            "maxLagSec": round(self.max_lag, 6),
+            "missed": self.missed,
+        }
@@ -42,6 +42,8 @@ class Settings(BaseSettings):
     EXEC_MAX_LEVERAGE: float = 50.0
     EXEC_MAX_NOTIONAL_USD: float = 1e9
     EXEC_MIN_NOTIONAL_USD: float = 10.0
+    # notional checks reuse a cached price up to this age before refreshing it in the background
+    EXEC_PRICE_MAX_AGE_SEC: float = 30.0
     EXEC_MARKET_SLIPPAGE_BPS: float = 10.0
     EXEC_RO_SLIPPAGE_BPS: float | None = None
     EXEC_RETRY_ATTEMPTS: int = 0
@@ -54,15 +56,36 @@ class Settings(BaseSettings):
     APPLY_LIVE_TO_POSITIONS: bool = True
     # Optional: on close error, attempt reduce-only fallback using stored position
     ENABLE_CLOSE_FALLBACK_RO: bool = True
+    # Metrics batch endpoint: batches at least this large use the process pool
+    METRICS_BATCH_POOL_MIN: int = 512
+    METRICS_BATCH_WORKERS: int | None = None
     # Background snapshot daemon
     ENABLE_SNAPSHOT_DAEMON: bool = False
     SNAPSHOT_INTERVAL_SEC: float = 15.0
+    SNAPSHOT_MAX_WORKERS: int = 8
+    SNAPSHOT_VAULT_TIMEOUT_SEC: float | None = None  # defaults to SNAPSHOT_INTERVAL_SEC
+    SNAPSHOT_CHANGE_BPS: float | None = None  # unset = snapshot every vault every tick
+    SNAPSHOT_HEARTBEAT_SEC: float = 300.0
+    # Per-type cadence (deployments entries may set `snapshotIntervalSec` per vault)
+    SNAPSHOT_PUBLIC_INTERVAL_SEC: float | None = None
+    SNAPSHOT_PRIVATE_INTERVAL_SEC: float | None = None
     # User WS listener for live fills write-back
     ENABLE_USER_WS_LISTENER: bool = False
     # Alerts
     ALERT_WEBHOOK_URL: str | None = None
     ALERT_COOLDOWN_SEC: float = 120.0
     ALERT_NAV_DRAWDOWN_PCT: float = 0.05
+    ALERT_QUEUE_MAX: int = 1000  # pending webhook deliveries; overflow is dropped
+    ALERT_TIMEOUT_SEC: float = 5.0
+    ALERT_RETRIES: int = 3
+    ALERT_RETRY_BACKOFF_SEC: float = 0.5
+    ALERT_MAX_CONNECTIONS: int = 4
+    ALERT_DIGEST_WINDOW_SEC: float = 0.0  # >0 collects alerts and sends one summary per window
+    ALERT_MAX_SENDS_PER_MIN: int = 0  # webhook call cap; 0 = unlimited
+    # Snapshot rule defaults (deployments entries may override via `alerts`); unset disables
+    ALERT_NAV_JUMP_PCT: float | None = None
+    ALERT_STALE_SEC: float | None = None
+    ALERT_MAX_EXPOSURE: float | None = None
     # Deployment auth
     DEPLOYMENT_API_TOKEN: str | None = None
     # Logging
@@ -73,6 +96,16 @@ class Settings(BaseSettings):
     QUANT_API_KEYS: str | None = None
     QUANT_RATE_LIMIT_PER_MIN: int = 60
     ENABLE_QUANT_ORDERS: bool = False
+    # legs accepted by one /api/v1/quant/orders/batch request
+    QUANT_BATCH_MAX_LEGS: int = 20
+    # exec scheduler: per-vault FIFO, vaults run in parallel on this many workers
+    EXEC_QUEUE_WORKERS: int = 4
+    # queued + running orders across vaults before new ones get 503
+    EXEC_QUEUE_MAX: int = 1000
+    # sync order requests give up with 503 after this long (0 = wait indefinitely)
+    EXEC_REQUEST_TIMEOUT_SEC: float = 30.0
+    # async order records (`?async=1`) kept for status polling
+    EXEC_ORDER_RETAIN: int = 5000
 
     # pydantic v2: model_config covers env loading and extra handling
 
@@ -1,35 +1,161 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from typing import Dict, List, Tuple
+import threading
 import time
 
+from .metrics import RollingMetrics, RollingStats
+
+
+# resolution -> (bucket seconds, buckets retained per vault)
+ROLLUP_RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "1m": (60, 1440),
+    "1h": (3600, 24 * 90),
+    "1d": (86400, 730),
+}
+
+# bucket layout: [start, open, high, low, close, count, first_ts, last_ts]
+_Bucket = List[float]
+
 
 class SnapshotStore:
     def __init__(self, capacity: int = 2048):
         self.capacity = capacity
         self._data: Dict[str, List[Tuple[float, float]]] = {}
+        self._rollups: Dict[str, Dict[str, List[_Bucket]]] = {}
+        # vault -> (stats over closed daily buckets, start of the last folded bucket)
+        self._stats: Dict[str, Tuple[RollingStats, float]] = {}
+        # vault -> (daily bucket starts, RollingMetrics over their closes); dropped on add
+        self._rolling: Dict[str, Tuple[List[float], RollingMetrics]] = {}
+        # writers: daemon pool, exec scheduler and request threads
+        self._lock = threading.Lock()
 
     def add(self, vault: str, nav: float, ts: float | None = None) -> None:
         ts = ts if ts is not None else time.time()
-        arr = self._data.setdefault(vault, [])
-        arr.append((ts, nav))
-        if len(arr) > self.capacity:
-            # drop oldest
-            overflow = len(arr) - self.capacity
-            del arr[0:overflow]
+        with self._lock:
+            arr = self._data.setdefault(vault, [])
+            arr.append((ts, nav))
+            if len(arr) > self.capacity:
+                # drop oldest
+                overflow = len(arr) - self.capacity
+                del arr[0:overflow]
+            self._update_rollups(vault, float(nav), float(ts))
+            self._update_stats(vault)
+            self._rolling.pop(vault, None)
+
+    def _update_rollups(self, vault: str, nav: float, ts: float) -> None:
+        # caller holds _lock
+        per_vault = self._rollups.setdefault(vault, {})
+        for name, (seconds, capacity) in ROLLUP_RESOLUTIONS.items():
+            buckets = per_vault.setdefault(name, [])
+            start = float(int(ts // seconds) * seconds)
+            if buckets and buckets[-1][0] == start:
+                idx = len(buckets) - 1
+            elif not buckets or buckets[-1][0] < start:
+                buckets.append([start, nav, nav, nav, nav, 0, ts, ts])
+                idx = len(buckets) - 1
+            else:
+                # late snapshot: locate (or create) its bucket
+                idx = bisect_left(buckets, start, key=lambda b: b[0])
+                if idx >= len(buckets) or buckets[idx][0] != start:
+                    if idx == 0 and len(buckets) >= capacity:
+                        continue  # older than the retained horizon
+                    buckets.insert(idx, [start, nav, nav, nav, nav, 0, ts, ts])
+            b = buckets[idx]
+            if ts < b[6]:
+                b[1], b[6] = nav, ts
+            if ts >= b[7]:
+                b[4], b[7] = nav, ts
+            b[2] = max(b[2], nav)
+            b[3] = min(b[3], nav)
+            b[5] += 1
+            if len(buckets) > capacity:
+                del buckets[0 : len(buckets) - capacity]
+
+    def _update_stats(self, vault: str) -> None:
+        # caller holds _lock
+        days = self._rollups[vault]["1d"]
+        if len(days) < 2:
+            return
+        stats, through = self._stats.get(vault) or (RollingStats(), float("-inf"))
+        closed = days[-2]
+        if closed[0] > through:
+            stats.push(closed[4])
+            self._stats[vault] = (stats, closed[0])
+
+    def metrics(self, vault: str) -> dict | None:
+        """Daily-close metrics for `vault` (see `compute_metrics`), or None without history.
+
+        Closed days are folded into running statistics as they roll over; the
+        current day contributes its latest close, so each call is O(1).
+        """
+        with self._lock:
+            days = self._rollups.get(vault, {}).get("1d")
+            if not days:
+                return None
+            committed = self._stats.get(vault)
+            stats = committed[0].copy() if committed else RollingStats()
+            last_close = days[-1][4]
+        stats.push(last_close)
+        return stats.to_metrics()
+
+    def rolling(self, vault: str) -> Tuple[List[float], RollingMetrics]:
+        """Daily bucket starts and a `RollingMetrics` over their closes, built once per change.
+
+        Daily rollups are capped (730 buckets), so the O(n) build is cheap
+        enough to do under the lock.
+        """
+        with self._lock:
+            cached = self._rolling.get(vault)
+            if cached is None:
+                days = self._rollups.get(vault, {}).get("1d", [])
+                cached = self._rolling[vault] = ([b[0] for b in days], RollingMetrics([b[4] for b in days]))
+            return cached
 
     def get(self, vault: str, window: int = 60) -> List[Tuple[float, float]]:
-        arr = self._data.get(vault, [])
         if window <= 0:
             return []
-        return arr[-window:]
+        with self._lock:
+            return self._data.get(vault, [])[-window:]
 
     def get_since(self, vault: str, since_ts: float) -> List[Tuple[float, float]]:
-        arr = self._data.get(vault, [])
+        with self._lock:
+            arr = list(self._data.get(vault, []))
         return [item for item in arr if item[0] >= since_ts]
 
+    def get_rollup(
+        self,
+        vault: str,
+        resolution: str,
+        since_ts: float | None = None,
+        window: int | None = None,
+    ) -> List[Tuple[float, float, float, float, float]]:
+        """Return (start, open, high, low, close) buckets at `resolution`.
+
+        Buckets are maintained on `add`, so this never touches raw snapshots.
+        """
+        if resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"unsupported resolution: {resolution}")
+        if window is not None and window <= 0:
+            return []
+        with self._lock:
+            buckets = self._rollups.get(vault, {}).get(resolution, [])
+            if since_ts is not None:
+                seconds = ROLLUP_RESOLUTIONS[resolution][0]
+                # include the bucket that contains `since_ts`
+                floor = float(int(since_ts // seconds) * seconds)
+                buckets = buckets[bisect_left(buckets, floor, key=lambda b: b[0]) :]
+            if window is not None:
+                buckets = buckets[-window:]
+            return [(b[0], b[1], b[2], b[3], b[4]) for b in buckets]
+
     def clear(self) -> None:
-        self._data.clear()
+        with self._lock:
+            self._data.clear()
+            self._rollups.clear()
+            self._stats.clear()
+            self._rolling.clear()
 
 
 store = SnapshotStore()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Sequence
+
+
+# seconds; the final bucket catches everything above the last bound
+DEFAULT_BUCKETS: Sequence[float] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, safe to observe from worker threads."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._bounds = list(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def _quantile(self, q: float) -> float:
+        # upper bound of the bucket holding the q-th observation
+        target = q * self._count
+        seen = 0
+        for i, c in enumerate(self._counts):
+            seen += c
+            if c and seen >= target:
+                return self._bounds[i] if i < len(self._bounds) else self._max
+        return 0.0
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            labels = [f"{b:g}" for b in self._bounds] + ["+Inf"]
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 6),
+                "avg": round(self._sum / self._count, 6) if self._count else 0.0,
+                "max": round(self._max, 6),
+                "p50": self._quantile(0.5),
+                "p95": self._quantile(0.95),
+                "buckets": {label: c for label, c in zip(labels, self._counts) if c},
+            }
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import threading
+from concurrent.futures import Future
 from typing import Any, Dict, List, Tuple
 import time
 
 from .settings import Settings
 from .navcalc import snapshot_now
 from .events import store as event_store
+from .exec_scheduler import SchedulerFull, scheduler as exec_scheduler
 from .listener_registry import all_vaults
 
 _last_ws_event: Dict[str, float] = {}
@@ -51,39 +53,55 @@ def _extract_fills(evt: Dict[str, Any]) -> List[Tuple[str, str, float]]:
     return out
 
 
-def process_user_event(vault: str, evt: Dict[str, Any]) -> None:
-    """Apply user event fills to positions, snapshot NAV, and log events."""
+def _apply_fills(target: str, fills: List[Tuple[str, str, float]], now: float) -> None:
+    for name, side, sz in fills:
+        try:
+            unit = None
+            try:
+                unit = snapshot_now(target)
+            except Exception:
+                unit = None
+            event_store.add(
+                target,
+                {
+                    "type": "fill",
+                    "status": "applied",
+                    "source": "ws",
+                    "symbol": name,
+                    "side": side,
+                    "size": sz,
+                    **({"unitNav": unit} if unit is not None else {}),
+                },
+            )
+            _last_ws_event[target] = now
+        except Exception as e:
+            event_store.add(target, {"type": "fill", "status": "error", "error": str(e), "symbol": name})
+            _last_ws_event.setdefault(target, now)
+
+
+def process_user_event(vault: str, evt: Dict[str, Any]) -> List[Future]:
+    """Apply user event fills to positions, snapshot NAV, and log events.
+
+    The work runs on the exec scheduler in each target vault's queue, so
+    fills never interleave with that vault's orders. Returns the queued
+    futures; the listener thread does not wait on them.
+    """
     fills = _extract_fills(evt)
     if not fills:
-        return
+        return []
     now = time.time()
     targets = all_vaults()
     if not targets:
         targets = {vault}
-    for name, side, sz in fills:
-        for target in targets:
-            try:
-                unit = None
-                try:
-                    unit = snapshot_now(target)
-                except Exception:
-                    unit = None
-                event_store.add(
-                    target,
-                    {
-                        "type": "fill",
-                        "status": "applied",
-                        "source": "ws",
-                        "symbol": name,
-                        "side": side,
-                        "size": sz,
-                        **({"unitNav": unit} if unit is not None else {}),
-                    },
-                )
-                _last_ws_event[target] = now
-            except Exception as e:
+    futures: List[Future] = []
+    for target in targets:
+        try:
+            futures.append(exec_scheduler.submit(target, lambda t=target: _apply_fills(t, fills, now)))
+        except SchedulerFull as e:
+            for name, _, _ in fills:
                 event_store.add(target, {"type": "fill", "status": "error", "error": str(e), "symbol": name})
-                _last_ws_event.setdefault(target, now)
+            _last_ws_event.setdefault(target, now)
+    return futures
 
 
 def last_ws_event(vault: str | None = None) -> float | Dict[str, float] | None:
@@ -1,55 +1,296 @@
 from __future__ import annotations
 
+import threading
+import time
 from typing import Any, Dict, List, Tuple
 
+import httpx
 import pytest
 
 from app import alerts, events
+from app.settings import settings
 
 
-def test_alert_manager_nav_drawdown(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("ALERT_WEBHOOK_URL", "http://example.com")
-    monkeypatch.setenv("ALERT_COOLDOWN_SEC", "0")
-    monkeypatch.setenv("ALERT_NAV_DRAWDOWN_PCT", "0.05")
+def _recording_dispatcher(calls: List[Tuple[str, Dict[str, Any]]], **kwargs: Any) -> alerts.AlertDispatcher:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append((f"{request.url.scheme}://{request.url.host}", dict(request.url.params)))
+        return httpx.Response(200)
 
-    calls: List[Tuple[str, Dict[str, Any]]] = []
+    return alerts.AlertDispatcher(transport=httpx.MockTransport(handler), **kwargs)
 
-    def fake_get(url: str, params: Dict[str, Any] | None = None, timeout: float | None = None) -> None:
-        calls.append((url, params or {}))
 
-    monkeypatch.setattr(alerts.httpx, "get", fake_get)
-    mgr = alerts.AlertManager()
+def test_alert_manager_nav_drawdown(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ALERT_WEBHOOK_URL", "http://example.com")
+    monkeypatch.setattr(settings, "ALERT_COOLDOWN_SEC", 0.0)
+    monkeypatch.setattr(settings, "ALERT_NAV_DRAWDOWN_PCT", 0.05)
+
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    mgr = alerts.AlertManager(dispatcher=_recording_dispatcher(calls))
 
     mgr.on_nav("vault", 1.0)  # establish high watermark
     mgr.on_nav("vault", 0.96)  # <5% drop, no alert
+    assert mgr.flush()
     assert calls == []
 
     mgr.on_nav("vault", 0.9)  # 10% drop, should alert
+    assert mgr.flush()
     assert len(calls) == 1
     assert calls[0][0] == "http://example.com"
     assert "message" in calls[0][1]
 
     mgr.on_nav("vault", 0.85)
+    assert mgr.flush()
     assert len(calls) == 2
+    mgr.close()
 
 
 def test_event_store_triggers_alert(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("ALERT_WEBHOOK_URL", "http://example.com")
-    monkeypatch.setenv("ALERT_COOLDOWN_SEC", "0")
+    monkeypatch.setattr(settings, "ALERT_WEBHOOK_URL", "http://example.com")
+    monkeypatch.setattr(settings, "ALERT_COOLDOWN_SEC", 0.0)
 
     calls: List[Tuple[str, Dict[str, Any]]] = []
-
-    def fake_get(url: str, params: Dict[str, Any] | None = None, timeout: float | None = None) -> None:
-        calls.append((url, params or {}))
-
-    monkeypatch.setattr(alerts.httpx, "get", fake_get)
-    mgr = alerts.AlertManager()
+    mgr = alerts.AlertManager(dispatcher=_recording_dispatcher(calls))
     monkeypatch.setattr(events, "alert_manager", mgr)
 
     store = events.EventStore()
     store.add("vault1", {"type": "exec_open", "status": "ok"})
+    assert mgr.flush()
     assert calls == []  # no alert for ok status
 
     store.add("vault1", {"type": "exec_open", "status": "error", "error": "failed to execute"})
+    assert mgr.flush()
     assert len(calls) == 1
     assert calls[0][0] == "http://example.com"
+    mgr.close()
+
+
+def test_slow_webhook_does_not_block_event_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ALERT_WEBHOOK_URL", "http://example.com")
+    monkeypatch.setattr(settings, "ALERT_COOLDOWN_SEC", 0.0)
+    release = threading.Event()
+    attempts: List[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(1)
+        release.wait(5.0)
+        # first attempt fails server-side, the retry succeeds
+        return httpx.Response(503 if len(attempts) == 1 else 200)
+
+    mgr = alerts.AlertManager(
+        dispatcher=alerts.AlertDispatcher(transport=httpx.MockTransport(handler), backoff=0.0, max_queue=2)
+    )
+    started = time.perf_counter()
+    for i in range(3):
+        mgr.on_event(f"v{i}", {"type": "exec_open", "status": "error"})
+    assert time.perf_counter() - started < 0.5
+    release.set()
+    assert mgr.flush()
+    stats = mgr.stats()
+    assert stats["sent"] == 2 and stats["retried"] == 1 and stats["dropped"] == 1
+    assert stats["failed"] == 0 and stats["pending"] == 0
+    mgr.close()
+
+
+def test_dispatcher_gives_up_after_retries() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("down", request=request)
+
+    d = alerts.AlertDispatcher(transport=httpx.MockTransport(handler), retries=2, backoff=0.0)
+    assert d.submit("http://example.com", {"message": "x"})
+    assert d.flush()
+    stats = d.stats()
+    assert (stats["sent"], stats["failed"], stats["retried"]) == (0, 1, 2)
+    assert stats["latencySec"]["count"] == 3
+    d.close()
+
+
+def test_dispatcher_holds_delivery_tasks_until_done(caplog: pytest.LogCaptureFixture) -> None:
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    d = _recording_dispatcher(calls)
+    assert d.submit("http://example.com", {"message": "x"})
+    assert d.flush()
+    deadline = time.monotonic() + 2.0
+    while d._tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert d._tasks == set() and len(calls) == 1
+
+    async def broken(url: str, params: Dict[str, Any]) -> None:
+        raise RuntimeError("boom")
+
+    d._deliver = broken  # type: ignore[method-assign]
+    with caplog.at_level("ERROR", logger="app.alerts"):
+        d.submit("http://example.com", {"message": "y"})
+        deadline = time.monotonic() + 2.0
+        while "alert delivery failed" not in caplog.text and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert "alert delivery failed" in caplog.text
+    d.close(timeout=0.1)
+
+
+def test_digest_groups_a_burst_into_one_message(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ALERT_WEBHOOK_URL", "http://example.com")
+    monkeypatch.setattr(settings, "ALERT_COOLDOWN_SEC", 0.0)
+    monkeypatch.setattr(settings, "ALERT_DIGEST_WINDOW_SEC", 0.05)
+
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    mgr = alerts.AlertManager(dispatcher=_recording_dispatcher(calls))
+    for i in range(50):
+        mgr.on_event(f"v{i}", {"type": "exec_open", "status": "rejected"})
+    mgr.on_event("v0", {"type": "exec_close", "status": "error"})
+    mgr.on_event("v0", {"type": "exec_close", "status": "error"})
+    deadline = time.monotonic() + 5.0
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert mgr.flush()
+    assert len(calls) == 1
+    lines = calls[0][1]["message"].splitlines()
+    assert lines[0] == "[VaultCraft] Alert digest: 52 alerts"
+    assert lines[1].startswith("- exec_open rejected x50 (50 vaults: ")
+    assert lines[1].endswith(", +45 more)")
+    assert lines[2] == "- exec_close error x2 (1 vaults: v0 x2)"
+    assert mgr.stats()["digestsSent"] == 1 and mgr.stats()["digestPending"] == 0
+    mgr.close()
+
+
+def test_webhook_rate_cap_defers_overflow_into_digest(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ALERT_WEBHOOK_URL", "http://example.com")
+    monkeypatch.setattr(settings, "ALERT_COOLDOWN_SEC", 0.0)
+    monkeypatch.setattr(settings, "ALERT_MAX_SENDS_PER_MIN", 2)
+
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    mgr = alerts.AlertManager(dispatcher=_recording_dispatcher(calls))
+    for i in range(4):
+        mgr.on_event("v", {"type": f"t{i}", "status": "error"})
+    assert mgr.flush()
+    assert len(calls) == 2
+    stats = mgr.stats()
+    assert stats["rateLimited"] == 1 and stats["digestPending"] == 2
+
+    # still capped: the digest stays queued
+    mgr.flush_digest()
+    assert mgr.flush() and len(calls) == 2
+    # once the minute has passed the held alerts go out as one summary
+    mgr._webhook_calls.clear()
+    mgr.flush_digest()
+    assert mgr.flush()
+    assert len(calls) == 3
+    assert calls[2][1]["message"].startswith("[VaultCraft] Alert digest: 2 alerts")
+    mgr.close()
+
+
+def test_rule_engine_per_vault_rules() -> None:
+    from app.alert_rules import RuleEngine, VaultRules
+
+    specs: Dict[str, Dict[str, Any]] = {
+        "hot": {"navJumpPct": 0.05, "staleSec": 10, "maxExposure": 3},
+        "quiet": {"drawdownPct": 0},
+    }
+    engine = RuleEngine(defaults=VaultRules(drawdown_pct=0.05), rules_for=specs.get)
+
+    fired = engine.evaluate([("hot", 1.0, 0.0, 1.0), ("quiet", 1.0, 0.0, 9.0), ("other", 1.0, 0.0, None)])
+    assert fired == []
+    fired = engine.evaluate([("hot", 1.1, 1.0, 3.5), ("quiet", 0.5, 1.0, 9.0), ("other", 0.9, 1.0, None)])
+    assert sorted((kind, vault) for kind, vault, _, _ in fired) == [
+        ("exposure", "hot"),
+        ("nav_drawdown", "other"),
+        ("nav_jump", "hot"),
+    ]
+
+    # staleness fires once per quiet spell and only for vaults with the rule
+    assert engine.check_stale(5.0) == []
+    assert [(k, v) for k, v, _, _ in engine.check_stale(12.0)] == [("stale", "hot")]
+    assert engine.check_stale(30.0) == []
+    engine.evaluate([("hot", 1.1, 31.0, 1.0)])
+    assert engine.check_stale(35.0) == []
+    assert [v for _, v, _, _ in engine.check_stale(41.0)] == ["hot"]
+
+    # a new spec object recompiles that vault's rules
+    specs["quiet"] = {"drawdownPct": 0.1}
+    assert engine.rules("quiet").drawdown_pct == 0.1
+    assert engine.stats()["vaults"] == 3
+
+
+def test_rule_engine_looks_up_specs_once_per_generation() -> None:
+    from app.alert_rules import RuleEngine, VaultRules
+
+    lookups: List[str] = []
+    specs: Dict[str, Dict[str, Any]] = {"a": {"drawdownPct": 0.2}}
+    token = [object()]
+
+    def rules_for(vault: str) -> Dict[str, Any] | None:
+        lookups.append(vault)
+        return specs.get(vault)
+
+    engine = RuleEngine(defaults=VaultRules(drawdown_pct=0.05), rules_for=rules_for, generation=lambda: token[0])
+    batch = [("a", 1.0, 0.0, None), ("b", 1.0, 0.0, None)]
+    engine.evaluate(batch)
+    engine.evaluate(batch)
+    engine.check_stale(1.0)
+    assert sorted(lookups) == ["a", "b"]
+    assert engine.rules("a").drawdown_pct == 0.2
+
+    # a new generation recompiles on the next batch
+    specs["a"] = {"drawdownPct": 0.5}
+    token[0] = object()
+    fired = engine.evaluate([("a", 0.7, 1.0, None)])
+    assert fired == [] and engine.rules("a").drawdown_pct == 0.5
+    assert lookups.count("a") == 2
+
+
+def test_alert_manager_rebuilds_defaults_when_settings_change(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ALERT_NAV_DRAWDOWN_PCT", 0.05)
+    mgr = alerts.AlertManager()
+    token = object()
+    mgr.rules.set_rule_source(lambda _vault: None, generation=lambda: token)
+    rules = mgr._get_rules()
+    rules.evaluate([("v", 1.0, 0.0, None)])
+    assert rules.rules("v").drawdown_pct == 0.05
+
+    # same deployments generation, new settings: the vault is recompiled
+    monkeypatch.setattr(settings, "ALERT_NAV_DRAWDOWN_PCT", 0.2)
+    rules = mgr._get_rules()
+    rules.evaluate([("v", 0.9, 1.0, None)])
+    assert rules.rules("v").drawdown_pct == 0.2
+    mgr.close()
+
+
+def test_rule_engine_batch_is_fast() -> None:
+    from app.alert_rules import RuleEngine, VaultRules
+
+    engine = RuleEngine(defaults=VaultRules(drawdown_pct=0.05, jump_pct=0.5, stale_sec=60, max_exposure=10))
+    vaults = [f"v{i}" for i in range(5000)]
+    engine.evaluate([(v, 1.0, 0.0, 1.0) for v in vaults])
+    started = time.perf_counter()
+    fired = engine.evaluate([(v, 0.99, 1.0, 1.0) for v in vaults])
+    fired += engine.check_stale(2.0)
+    assert fired == []
+    assert time.perf_counter() - started < 0.5
+
+
+def test_daemon_hands_snapshot_batches_to_alert_rules(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app import daemon as daemon_mod
+
+    monkeypatch.setattr(settings, "ALERT_WEBHOOK_URL", "http://example.com")
+    monkeypatch.setattr(settings, "ALERT_COOLDOWN_SEC", 0.0)
+    monkeypatch.setattr(settings, "ALERT_NAV_DRAWDOWN_PCT", 0.1)
+    navs = {"a": [1.0, 0.8], "b": [1.0, 1.0]}
+    monkeypatch.setattr(daemon_mod, "snapshot_now", lambda vid: navs[vid].pop(0))
+
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    mgr = alerts.AlertManager(dispatcher=_recording_dispatcher(calls))
+    batches: List[int] = []
+
+    def on_snapshots(batch):
+        batches.append(len(batch))
+        mgr.on_snapshots(batch)
+
+    d = daemon_mod.SnapshotDaemon(list_vaults=lambda: ["a", "b"], interval_sec=10.0, on_snapshots=on_snapshots)
+    try:
+        d.tick()
+        d.tick()
+    finally:
+        d.stop()
+    assert batches == [2, 2]
+    assert mgr.flush()
+    assert len(calls) == 1 and "Vault a NAV drawdown 20.00%" in calls[0][1]["message"]
+    mgr.close()
@@ -8,11 +8,13 @@ from app.hyper_client import HyperHTTP
 
 
 def test_markets_pairs_from_deployments(monkeypatch, tmp_path, capsys):
-    # monkeypatch deployments file path by changing CWD temporarily via monkeypatch.chdir
+    from app import main as main_mod
+
+    # deployments resolve from the repo root, not the working directory
     d = tmp_path / "deployments"
     d.mkdir()
     (d / "hyper-testnet.json").write_text('{"config":{"pairs":[{"symbol":"BTC","leverage":3}]}}')
-    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main_mod, "REPO_ROOT", tmp_path, raising=False)
     c = TestClient(app)
     r = c.get("/api/v1/markets")
     assert r.status_code == 200
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 from app.daemon import SnapshotDaemon
 from app.snapshots import store as snapshot_store
 
@@ -20,3 +22,208 @@ def test_snapshot_daemon_tick(monkeypatch):
     d = SnapshotDaemon(list_vaults=lambda: ids, interval_sec=0.1)
     d.tick()
     assert calls["n"] == len(ids)
+
+
+def test_snapshot_daemon_parallel_with_deadline(monkeypatch):
+    import threading
+    import time
+
+    from app import daemon as daemon_mod
+
+    release = threading.Event()
+    done: list[str] = []
+
+    def fake_snapshot(vault_id: str) -> float:
+        if vault_id == "slow":
+            release.wait(2.0)
+        done.append(vault_id)
+        return 1.0
+
+    monkeypatch.setattr(daemon_mod, "snapshot_now", fake_snapshot)
+    d = SnapshotDaemon(list_vaults=lambda: ["slow", "a", "b"], interval_sec=10.0, max_workers=4, vault_timeout_sec=0.1)
+    try:
+        started = time.time()
+        d.tick()
+        assert time.time() - started < 1.0
+        assert sorted(done) == ["a", "b"]
+        assert d.vault_timeouts == 1
+        d.tick()  # slow vault still in flight → skipped, not queued again
+        assert d.vault_skipped_busy == 1
+        assert done.count("a") == 2
+    finally:
+        release.set()
+        d.stop()
+
+
+def test_snapshot_daemon_deadline_excludes_queue_wait(monkeypatch):
+    import threading
+
+    from app import daemon as daemon_mod
+
+    release = threading.Event()
+
+    def fake_snapshot(vault_id: str) -> float:
+        if vault_id == "slow":
+            release.wait(2.0)
+        return 1.0
+
+    monkeypatch.setattr(daemon_mod, "snapshot_now", fake_snapshot)
+    # one worker: "queued" waits behind "slow" and must not count as timed out
+    d = SnapshotDaemon(list_vaults=lambda: ["slow", "queued"], interval_sec=10.0, max_workers=1, vault_timeout_sec=0.1)
+    try:
+        d.tick()
+        assert d.vault_timeouts == 1
+        release.set()
+        d._inflight["queued"].future.result(2.0)
+        d._reap(time.time() + 10.0)
+        assert d.vault_timeouts == 1
+        assert d.stats()["queueWaitSec"]["count"] == 2
+    finally:
+        release.set()
+        d.stop()
+
+
+def test_snapshot_daemon_skips_overrunning_vaults(monkeypatch):
+    import time
+
+    from app import daemon as daemon_mod
+
+    monkeypatch.setattr(daemon_mod, "snapshot_now", lambda vid: time.sleep(0.25) or 1.0)
+    d = SnapshotDaemon(list_vaults=lambda: ["x"], interval_sec=0.1, vault_timeout_sec=1.0)
+    d.start()
+    time.sleep(0.9)
+    d.stop()
+    assert d.ticks >= 2
+    # runs that would overlap an in-flight snapshot are skipped, not queued
+    assert d.vault_skipped_busy >= 1
+
+
+def test_cadence_scheduler_per_vault_and_reprioritize():
+    from app.scheduler import CadenceScheduler
+
+    s = CadenceScheduler()
+    s.schedule("fast", 2.0, now=100.0)
+    s.schedule("slow", 300.0, now=100.0)
+    assert sorted(s.pop_due(100.0)) == ["fast", "slow"]  # new vaults run immediately
+    assert s.next_due() == 102.0
+    assert s.pop_due(101.0) == []
+    assert s.pop_due(102.5) == ["fast"]
+    assert s.lag(104.5) == 0.5
+    # fell behind by several boundaries: run once, count the rest as missed
+    assert s.pop_due(109.0) == ["fast"]
+    assert s.missed == 2
+    assert s.next_due() == 110.0
+    # promote the slow vault
+    s.schedule("slow", 5.0, now=109.0)
+    assert s.pop_due(110.0) == ["fast", "slow"]
+    s.remove("fast")
+    assert s.vaults() == ["slow"]
+    assert s.stats(110.0)["vaults"] == 1
+
+
+def test_snapshot_daemon_uses_per_vault_cadence(monkeypatch):
+    import time
+
+    from app import daemon as daemon_mod
+
+    calls: list[str] = []
+    monkeypatch.setattr(daemon_mod, "snapshot_now", lambda vid: calls.append(vid) or 1.0)
+    cadence = {"hot": 0.05, "cold": 60.0}
+    d = SnapshotDaemon(list_vaults=lambda: list(cadence), interval_sec=10.0, cadence_for=cadence.__getitem__)
+    d.start()
+    time.sleep(0.4)
+    d.stop()
+    assert calls.count("cold") == 1
+    assert calls.count("hot") >= 3
+
+
+def test_snapshot_daemon_cadence_override_survives_refresh(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main as main_mod
+
+    d = SnapshotDaemon(list_vaults=lambda: ["hot", "cold"], interval_sec=10.0, cadence_for=lambda _vid: 15.0)
+    d._refresh_schedule(100.0)
+    d.set_cadence("hot", 2.0)
+    d._refresh_schedule(110.0)
+    assert d.scheduler.cadence("hot") == 2.0
+    assert d.scheduler.cadence("cold") == 15.0
+
+    monkeypatch.setattr(main_mod, "_snapshot_daemon", d)
+    c = TestClient(main_mod.app)
+    assert c.post("/api/v1/ops/snapshots/cadence/cold", params={"sec": 0}).status_code == 400
+    r = c.post("/api/v1/ops/snapshots/cadence/cold", params={"sec": 5})
+    assert r.json() == {"vault": "cold", "cadenceSec": 5.0, "override": True}
+    assert c.get("/api/v1/ops/snapshots").json()["cadenceOverrides"] == {"hot": 2.0, "cold": 5.0}
+    # clearing the override restores the configured cadence on the next refresh
+    c.post("/api/v1/ops/snapshots/cadence/hot")
+    d._refresh_schedule(120.0)
+    assert d.scheduler.cadence("hot") == 15.0
+    assert d.scheduler.cadence("cold") == 5.0
+
+
+def test_snapshot_daemon_skips_idle_vaults(monkeypatch, tmp_path):
+    from app import navcalc
+    from app.positions import set_profile
+
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    navcalc.reset_fingerprints()
+    vid = "0xidle"
+    set_profile(vid, {"cash": 1000.0, "positions": {"ETH": 1.0}, "denom": 1000.0})
+    prices = {"hyper::ETH": 2000.0}
+
+    class FakePrices:
+        def get_index_prices(self, symbols):
+            return {s: prices[s] for s in symbols}
+
+    d = SnapshotDaemon(list_vaults=lambda: [vid], interval_sec=10.0, change_threshold_bps=5.0, heartbeat_sec=60.0)
+    d._prices = FakePrices()
+    try:
+        before = len(snapshot_store.get(vid, window=100))
+        d.tick()  # first sighting always snapshots
+        prices["hyper::ETH"] = 2000.5  # 2.5 bps: below threshold
+        d.tick()
+        assert d.vault_skipped_idle == 1
+        prices["hyper::ETH"] = 2002.0  # 10 bps vs last snapshot
+        d.tick()
+        set_profile(vid, {"cash": 1000.0, "positions": {"ETH": 2.0}, "denom": 1000.0})
+        d.tick()
+        assert d.vault_skipped_idle == 1
+        navs = [v for (_, v) in snapshot_store.get(vid, window=100)[before:]]
+        assert navs == [3.0, 3.002, 5.004]
+    finally:
+        d.stop()
+        navcalc.reset_fingerprints()
+
+
+def test_snapshot_daemon_instrumentation(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import daemon as daemon_mod
+    from app import main as main_mod
+
+    def fake_snapshot(vault_id: str) -> float:
+        if vault_id == "bad":
+            raise KeyError(vault_id)
+        return 1.0
+
+    monkeypatch.setattr(daemon_mod, "snapshot_now", fake_snapshot)
+    d = SnapshotDaemon(list_vaults=lambda: ["ok", "bad"], interval_sec=10.0)
+    try:
+        d.tick()
+        d.tick()
+        stats = d.stats(per_vault=True)
+        assert stats["failures"] == {"KeyError": 2}
+        assert set(stats["lastSuccessByVault"]) == {"ok"}
+        assert stats["vaultLatencySec"]["count"] == 4
+        assert stats["tickDurationSec"]["count"] == 2
+
+        monkeypatch.setattr(main_mod, "_snapshot_daemon", d)
+        c = TestClient(main_mod.app)
+        ops = c.get("/api/v1/ops/snapshots").json()
+        assert ops["running"] is False and ops["failures"] == {"KeyError": 2}
+        state = c.get("/api/v1/status").json()["state"]
+        assert state["snapshotStats"]["failures"] == {"KeyError": 2}
+        assert "lag" in " ".join(state["snapshotQueue"])
+    finally:
+        d.stop()
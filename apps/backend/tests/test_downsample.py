@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.downsample import lttb
+from app.main import app
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    pts = [(float(i), 1.0) for i in range(100)]
+    pts[37] = (37.0, 5.0)
+    pts[71] = (71.0, -3.0)
+    out = lttb(pts, 10)
+    assert len(out) == 10
+    assert out[0] == pts[0] and out[-1] == pts[-1]
+    assert (37.0, 5.0) in out and (71.0, -3.0) in out
+    assert [p[0] for p in out] == sorted(p[0] for p in out)
+    assert lttb(pts[:5], 10) == pts[:5]
+
+
+def test_nav_series_max_points():
+    c = TestClient(app)
+    vid = "0xlttb"
+    for i in range(50):
+        c.post(f"/api/v1/nav/snapshot/{vid}", params={"nav": 1.0 + (i % 7) * 0.01, "ts": 1000.0 + i})
+    r = c.get(f"/api/v1/nav_series/{vid}", params={"window": 50, "max_points": 12})
+    series = r.json()["series"]
+    assert len(series) == 12
+    assert series[0]["ts"] == 1000.0 and series[-1]["ts"] == 1049.0
+    r2 = c.get(f"/api/v1/nav/{vid}", params={"window": 50, "max_points": 12})
+    assert len(r2.json()["nav"]) == 12
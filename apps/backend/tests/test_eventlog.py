@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from app import events
+from app.eventlog import EventLogWriter
+
+
+def test_event_store_batches_log_writes_off_the_caller(tmp_path):
+    log = tmp_path / "logs" / "events.jsonl"
+    store = events.EventStore(log_file=str(log), flush_interval=60.0)
+    for i in range(5):
+        store.add("v1", {"type": "fill", "i": i})
+    # nothing hits the disk until the writer flushes
+    assert not log.exists()
+    assert store.log_stats()["queueDepth"] == 5
+    store.flush()
+    lines = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [e["i"] for e in lines] == list(range(5))
+    assert all(e["vault"] == "v1" for e in lines)
+    stats = store.log_stats()
+    assert stats["written"] == 5 and stats["batches"] == 1 and stats["queueDepth"] == 0
+    store.close()
+
+
+def test_writer_drops_and_counts_when_queue_full(tmp_path):
+    w = EventLogWriter(tmp_path / "e.jsonl", flush_interval=60.0, max_queue=3)
+    results = [w.append(json.dumps({"i": i})) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert w.stats()["dropped"] == 2
+    w.close()
+    assert len((tmp_path / "e.jsonl").read_text().splitlines()) == 3
+
+
+def test_writer_background_flush_and_sync_mode(tmp_path):
+    w = EventLogWriter(tmp_path / "bg.jsonl", flush_interval=0.01, durability="fsync")
+    w.append("{}")
+    done = threading.Event()
+    for _ in range(200):
+        if w.stats()["written"] == 1:
+            done.set()
+            break
+        done.wait(0.01)
+    assert done.is_set()
+    w.close()
+
+    s = EventLogWriter(tmp_path / "sync.jsonl", durability="sync")
+    s.append('{"a": 1}')
+    assert (tmp_path / "sync.jsonl").read_text() == '{"a": 1}\n'
+    assert s.stats()["queueDepth"] == 0
+
+
+def test_restore_loads_newest_events_per_vault_from_log_tail(tmp_path):
+    log = tmp_path / "events.jsonl"
+    lines = []
+    for i in range(50):
+        lines.append(json.dumps({"vault": "a" if i % 5 else "b", "type": "fill", "ts": float(i)}))
+    lines.insert(10, "not json")
+    log.write_text("\n".join(lines) + "\n")
+
+    store = events.EventStore(log_file=str(log), capacity=4)
+    assert store.restore() == 8
+    assert [e["ts"] for e in store.list("a")] == [46.0, 47.0, 48.0, 49.0]
+    assert [e["ts"] for e in store.list("b")] == [30.0, 35.0, 40.0, 45.0]
+    assert [e["ts"] for e in store.list("b", types=["fill"], since=40.0)] == [40.0, 45.0]
+    # pre-seq records are numbered in log order and new events continue from there
+    assert [e["seq"] for e in store.list("a")] == [1, 2, 3, 4]
+    store.add("a", {"type": "fill", "ts": 50.0})
+    assert store.page("a", after_seq=4)["events"][0]["seq"] == 5
+    # only the new event is appended; restored ones are not re-logged
+    store.flush()
+    assert log.read_text().count("\n") == 52
+
+
+def test_restore_reads_only_the_byte_budget(tmp_path):
+    from app.eventlog import iter_lines_reversed
+
+    log = tmp_path / "events.jsonl"
+    log.write_text("".join(json.dumps({"vault": "v", "ts": float(i)}) + "\n" for i in range(1000)))
+    line_len = len(json.dumps({"vault": "v", "ts": 999.0})) + 1
+    tail = list(iter_lines_reversed(log, max_bytes=line_len * 3 + 5, chunk_size=7))
+    # the line cut by the budget is skipped
+    assert [json.loads(t)["ts"] for t in tail] == [999.0, 998.0, 997.0]
+
+    store = events.EventStore(log_file=str(log), capacity=100)
+    assert store.restore(max_bytes=line_len * 10) == 10
+    assert store.list("v")[0]["ts"] == 990.0
+    # a zero budget reads nothing rather than everything
+    assert list(iter_lines_reversed(log, max_bytes=0)) == []
+
+
+def test_recent_lines_stream_only_the_budgeted_tail_of_segments(tmp_path):
+    from app.eventlog import iter_recent_lines, list_segments
+
+    log = tmp_path / "events.jsonl"
+    w = EventLogWriter(log, flush_interval=60.0)
+    for i in range(200):
+        w.append(json.dumps({"vault": "v", "ts": float(i)}))
+    w.rotate()
+    for i in range(200, 205):
+        w.append(json.dumps({"vault": "v", "ts": float(i)}))
+    w.close()
+    assert list_segments(log)[0]["bytes"] > 0
+
+    line_len = len(json.dumps({"vault": "v", "ts": 100.0})) + 1
+    got = [json.loads(t)["ts"] for t in iter_recent_lines(log, max_bytes=line_len * 8 + 3)]
+    assert got == [204.0, 203.0, 202.0, 201.0, 200.0, 199.0, 198.0, 197.0]
+    everything = [json.loads(t)["ts"] for t in iter_recent_lines(log)]
+    assert everything == [float(i) for i in reversed(range(205))]
+
+
+def test_rotation_seals_compressed_indexed_segments(tmp_path):
+    from app.eventlog import list_segments, read_segment
+
+    log = tmp_path / "events.jsonl"
+    store = events.EventStore(log_file=str(log), capacity=3, flush_interval=60.0, retain_segments=2)
+    for day in range(3):
+        for i in range(4):
+            store.add("a" if i % 2 else "b", {"type": "fill", "ts": day * 100.0 + i})
+        store._writer.rotate()
+    store.add("a", {"type": "ack", "ts": 300.0})
+    store.flush()
+
+    segs = list_segments(log)
+    # retention keeps the newest two segments
+    assert [s["minTs"] for s in segs] == [100.0, 200.0]
+    assert all(s["file"].endswith(".jsonl.gz") for s in segs)
+    meta = segs[0]["vaults"]["a"]
+    assert (meta["minTs"], meta["maxTs"], meta["count"]) == (101.0, 103.0, 2)
+    assert meta["first"] < meta["last"]
+    assert [e["ts"] for e in read_segment(log, segs[1], "b", since=201.0)] == [202.0]
+    assert list(read_segment(log, segs[0], "zzz")) == []
+
+    assert [e["ts"] for e in store.history("a", since=102.0)] == [103.0, 201.0, 203.0, 300.0]
+    assert [e["ts"] for e in store.history("a", since=0.0, until=203.0, types=["fill"])] == [101.0, 103.0, 201.0]
+
+    # restore walks the active file, then segments newest first
+    fresh = events.EventStore(log_file=str(log), capacity=3)
+    fresh.restore()
+    assert [e["ts"] for e in fresh.list("a")] == [201.0, 203.0, 300.0]
+    assert [e["ts"] for e in fresh.list("b")] == [102.0, 200.0, 202.0]
+    store.close()
+
+
+def test_writer_clamps_flush_interval_and_rotation_is_opt_in(tmp_path):
+    from app.eventlog import MIN_FLUSH_INTERVAL, list_segments
+
+    log = tmp_path / "events.jsonl"
+    w = EventLogWriter(log, flush_interval=0)
+    assert w._interval == MIN_FLUSH_INTERVAL
+    w.append(json.dumps({"ts": 1.0}))
+    w.flush()
+    w._segment_start = 0.0
+    w.append(json.dumps({"ts": 2.0}))
+    w.flush()
+    w.close()
+    assert list_segments(log) == []
+    assert len(log.read_text().splitlines()) == 2
+
+
+def test_writers_continue_while_a_segment_is_sealed(monkeypatch, tmp_path):
+    from app import eventlog
+
+    log = tmp_path / "events.jsonl"
+    w = EventLogWriter(log, flush_interval=60.0, segment_max_bytes=1)
+    sealing, release = threading.Event(), threading.Event()
+    real_seal = eventlog.seal_segment
+
+    def slow_seal(source, active, compress=True):
+        sealing.set()
+        release.wait(5)
+        return real_seal(source, active, compress=compress)
+
+    monkeypatch.setattr(eventlog, "seal_segment", slow_seal)
+    w.append(json.dumps({"vault": "v", "ts": 1.0}))
+    t = threading.Thread(target=w.flush)
+    t.start()
+    assert sealing.wait(5)
+    # the active file was moved aside; a second batch goes to a fresh one meanwhile
+    w._segment_max_bytes = 0
+    w.append(json.dumps({"vault": "v", "ts": 2.0}))
+    w.flush()
+    assert [json.loads(l)["ts"] for l in log.read_text().splitlines()] == [2.0]
+    release.set()
+    t.join(5)
+    w.close()
+    assert [s["minTs"] for s in eventlog.list_segments(log)] == [1.0]
+
+
+def test_seq_numbering_survives_a_restart_beyond_the_restore_budget(tmp_path):
+    log = tmp_path / "events.jsonl"
+    store = events.EventStore(log_file=str(log), capacity=10, flush_interval=60.0)
+    for i in range(5):
+        store.add("quiet", {"type": "fill", "ts": float(i)})
+    store._writer.rotate()
+    for i in range(3):
+        store.add("gone", {"type": "fill", "ts": 50.0 + i})
+    for i in range(50):
+        store.add("busy", {"type": "fill", "ts": 100.0 + i})
+    store.flush()
+    held, held_gone = store.page("quiet")["lastSeq"], store.page("gone")["lastSeq"]
+    store.close()
+
+    # restart with a budget that reaches neither the sealed "quiet" events nor the "gone" ones
+    line_len = len(log.read_text().splitlines()[-1]) + 1
+    fresh = events.EventStore(log_file=str(log), capacity=10)
+    fresh.restore(max_bytes=line_len * 3)
+    assert fresh.list("quiet") == []
+    page = fresh.page("quiet", after_seq=held)
+    assert (page["events"], page["lastSeq"], page["gap"]) == ([], 5, False)
+    fresh.add("quiet", {"type": "fill", "ts": 300.0})
+    page = fresh.page("quiet", after_seq=held)
+    assert [e["seq"] for e in page["events"]] == [6] and page["gap"] is False
+
+    # "gone" only lived in the unindexed active file: its numbering restarts, so an
+    # old cursor beyond lastSeq reports a gap and resyncs from the oldest event held
+    fresh.add("gone", {"type": "fill", "ts": 301.0})
+    page = fresh.page("gone", after_seq=held_gone)
+    assert page["gap"] is True
+    assert [e["seq"] for e in page["events"]] == [1] and page["nextSeq"] == 1
+    fresh.close()
+
+
+def test_restore_keeps_logged_seqs_in_seq_order(tmp_path):
+    log = tmp_path / "events.jsonl"
+    # concurrent writers could once log seqs out of order
+    recs = [{"vault": "v", "type": "fill", "ts": 1.0 + s / 10, "seq": s} for s in (1, 3, 2)]
+    log.write_text("".join(json.dumps(rec) + "\n" for rec in recs))
+    store = events.EventStore(log_file=str(log), capacity=10)
+    assert store.restore() == 3
+    page = store.page("v")
+    assert [e["seq"] for e in page["events"]] == [1, 2, 3]
+    assert page["lastSeq"] == 3
+    assert [e["seq"] for e in store.page("v", after_seq=2)["events"]] == [3]
+    store.add("v", {"type": "fill"})
+    assert store.page("v", after_seq=3)["events"][0]["seq"] == 4
+    store.close()
+
+
+def test_events_endpoint_serves_history_beyond_memory_window(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app import main as main_mod
+
+    store = events.EventStore(log_file=str(tmp_path / "events.jsonl"), capacity=2, flush_interval=60.0)
+    for i in range(6):
+        store.add("v", {"type": "fill" if i % 2 else "ack", "ts": float(i)})
+        if i == 2:
+            store._writer.rotate()
+    monkeypatch.setattr(main_mod, "event_store", store)
+    client = TestClient(main_mod.app)
+
+    assert [e["ts"] for e in client.get("/api/v1/events/v").json()["events"]] == [4.0, 5.0]
+    data = client.get("/api/v1/events/v", params={"since": 1.0}).json()["events"]
+    assert [e["ts"] for e in data] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    data = client.get("/api/v1/events/v", params={"since": 0.0, "types": "fill", "limit": 2}).json()["events"]
+    assert [e["ts"] for e in data] == [3.0, 5.0]
+    store.close()
+
+
+def test_events_endpoint_skips_disk_unless_vault_was_evicted(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app import main as main_mod
+
+    store = events.EventStore(log_file=str(tmp_path / "events.jsonl"), capacity=4, flush_interval=60.0)
+    for i in range(3):
+        store.add("v", {"type": "fill", "ts": 10.0 + i})
+
+    def no_disk(*_a, **_k):
+        raise AssertionError("history read without eviction")
+
+    monkeypatch.setattr(store, "history", no_disk)
+    monkeypatch.setattr(main_mod, "event_store", store)
+    client = TestClient(main_mod.app)
+    assert [e["ts"] for e in client.get("/api/v1/events/v", params={"since": 0.0}).json()["events"]] == [10.0, 11.0, 12.0]
+    assert client.get("/api/v1/events/unknown", params={"since": 0.0}).json()["events"] == []
+    assert not store.evicted("v") and not store.evicted("unknown")
+    store.add("v", {"type": "fill", "ts": 13.0})
+    store.add("v", {"type": "fill", "ts": 14.0})
+    assert store.evicted("v")
+    store.close()
+
+
+def test_read_active_stops_at_since(tmp_path):
+    from app.eventlog import read_active
+
+    log = tmp_path / "events.jsonl"
+    # a record stamped in range ahead of an older one is beyond the scan's stop point
+    lines = [{"vault": "v", "ts": 50.0}, {"vault": "w", "ts": 1.0}] + [{"vault": "v", "ts": float(t)} for t in range(10, 15)]
+    log.write_text("".join(json.dumps(rec) + "\n" for rec in lines))
+    assert [e["ts"] for e in read_active(log, "v", since=11.0, until=14.0)] == [13.0, 12.0, 11.0]
+    assert [e["ts"] for e in read_active(log, "v", since=0.0)] == [14.0, 13.0, 12.0, 11.0, 10.0, 50.0]
+    line_len = len(json.dumps({"vault": "v", "ts": 10.0})) + 1
+    assert [e["ts"] for e in read_active(log, "v", max_bytes=line_len * 2)] == [14.0, 13.0]
@@ -35,3 +35,58 @@ def test_nav_series_since(monkeypatch):
     series = r.json()["series"]
     assert [round(p["nav"], 2) for p in series] == [1.1, 1.2]
 
+
+def test_event_store_indexed_queries():
+    from app.events import EventStore
+
+    store = EventStore(capacity=5)
+    for ts, ty in [(1.0, "fill"), (3.0, "exec_open"), (2.0, "fill"), (4.0, "ack"), (5.0, "fill")]:
+        store.add("v", {"type": ty, "ts": ts})
+    # late events are slotted into ts order
+    assert [e["ts"] for e in store.list("v")] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert [e["ts"] for e in store.list("v", since=3.0)] == [3.0, 4.0, 5.0]
+    assert [e["ts"] for e in store.list("v", types=["fill"], since=1.5)] == [2.0, 5.0]
+    assert [e["ts"] for e in store.list("v", types=["fill", "ack"], limit=2)] == [4.0, 5.0]
+    assert store.list("v", since=6.0) == []
+    assert len(store.list("v", limit=0)) == 5
+
+    # trimming past capacity keeps the per-type index in step
+    store.add("v", {"type": "ack", "ts": 6.0})
+    store.add("v", {"type": "ack", "ts": 7.0})
+    assert [e["ts"] for e in store.list("v")] == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert [e["ts"] for e in store.list("v", types=["fill"])] == [5.0]
+    assert [e["ts"] for e in store.list("v", types=["ack", "exec_open"])] == [3.0, 4.0, 6.0, 7.0]
+
+
+def test_event_seq_cursor_pagination(monkeypatch):
+    from app import main as main_mod
+    from app.events import EventStore
+
+    store = EventStore(capacity=4)
+    monkeypatch.setattr(main_mod, "event_store", store)
+    # identical timestamps would collide under a ts cursor
+    for i in range(6):
+        store.add("v", {"type": "fill" if i % 2 else "ack", "ts": 100.0, "i": i})
+    c = TestClient(app)
+
+    r = c.get("/api/v1/events/v", params={"after_seq": 0, "limit": 2}).json()
+    # seqs 1-2 fell out of the 4-event window
+    assert r["gap"] is True
+    assert [e["seq"] for e in r["events"]] == [3, 4]
+    assert (r["nextSeq"], r["lastSeq"], r["hasMore"]) == (4, 6, True)
+
+    r = c.get("/api/v1/events/v", params={"after_seq": r["nextSeq"], "limit": 2}).json()
+    assert [e["i"] for e in r["events"]] == [4, 5]
+    assert r["hasMore"] is False and r["gap"] is False
+
+    r = c.get("/api/v1/events/v", params={"after_seq": 6}).json()
+    assert r["events"] == [] and r["nextSeq"] == 6
+
+    r = c.get("/api/v1/events/v", params={"after_seq": 2, "types": "fill", "limit": 1}).json()
+    assert [e["seq"] for e in r["events"]] == [4]
+    # the non-matching seq 5 is consumed too, so the next page starts at 6
+    assert r["nextSeq"] == 5 and r["hasMore"] is True
+    r = c.get("/api/v1/events/v", params={"after_seq": r["nextSeq"], "types": "fill", "limit": 1}).json()
+    assert [e["seq"] for e in r["events"]] == [6] and r["hasMore"] is False
+
+    assert c.get("/api/v1/events/v", params={"after_seq": -1}).status_code == 400
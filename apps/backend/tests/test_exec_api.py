@@ -87,3 +87,27 @@ def test_exec_limit_order_payload(tmp_path, monkeypatch):
     assert payload["order_type"]["limit"]["price"] == 2500
     assert payload.get("take_profit") == 3000
     assert payload.get("stop_loss") == 2200
+
+
+def test_exec_open_times_out_with_503_and_drops_the_queued_order(tmp_path, monkeypatch):
+    import threading
+
+    from app import main as main_mod
+    from app.exec_scheduler import VaultScheduler
+
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    monkeypatch.setattr(settings, "EXEC_REQUEST_TIMEOUT_SEC", 0.2)
+    sched = VaultScheduler(max_workers=1)
+    monkeypatch.setattr(main_mod, "exec_scheduler", sched)
+    opened = []
+    monkeypatch.setattr(main_mod.exec_service, "open", lambda vault, order: opened.append(vault) or {"ok": True})
+    gate = threading.Event()
+    sched.submit("0xslow", lambda: gate.wait(5))
+
+    c = TestClient(app)
+    r = c.post("/api/v1/exec/open", params={"symbol": "ETH", "size": 1.0, "side": "buy", "vault": "0xslow"})
+    assert r.status_code == 503 and r.json()["detail"] == "exec timed out in queue"
+    gate.set()
+    assert sched.join(5)
+    assert opened == []
+    sched.shutdown()
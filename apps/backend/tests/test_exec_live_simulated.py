@@ -39,3 +39,106 @@ def test_live_exec_simulated_applies_positions_and_events(tmp_path, monkeypatch)
     ev = event_store.list("0xV")
     assert any(e.get("type") == "exec_close" and e.get("status") == "ack" for e in ev)
 
+
+def test_exec_service_builds_drivers_once_and_warms_up(monkeypatch, tmp_path):
+    from app import exec_service as exec_mod
+
+    built: list[str] = []
+
+    def factory():
+        built.append("hyper")
+        return FakeDriver()
+
+    monkeypatch.setitem(exec_mod._DRIVER_FACTORIES, "hyper", factory)
+    monkeypatch.setenv("ENABLE_LIVE_EXEC", "1")
+    monkeypatch.setenv("EXEC_ALLOWED_VENUES", "hyper,mock_gold")
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+
+    svc = ExecService()
+    assert svc.warm_up() == {"hyper": True, "mock_gold": True}
+    assert built == ["hyper"]
+    svc.open("0xW", Order(symbol="ETH", size=0.1, side="buy"))
+    svc.open("0xW", Order(symbol="ETH", size=0.1, side="sell"))
+    assert built == ["hyper"]
+    assert svc.stats()["drivers"] == ["hyper", "mock_gold"]
+
+    def broken():
+        raise RuntimeError("missing key")
+
+    monkeypatch.setitem(exec_mod._DRIVER_FACTORIES, "hyper", broken)
+    svc.reset()
+    assert svc.warm_up()["hyper"] is False
+    assert svc.stats()["warmErrors"] == {"hyper": "missing key"}
+
+
+def test_open_batch_sends_one_bulk_and_writes_positions_once(tmp_path, monkeypatch):
+    from app import exec_service as exec_mod
+    from app import positions as positions_mod
+
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    monkeypatch.setenv("ENABLE_LIVE_EXEC", "1")
+    monkeypatch.setenv("EXEC_ALLOWED_SYMBOLS", "ETH,BTC,SOL")
+
+    class FakeExchange:
+        def __init__(self):
+            self.bulk_calls = []
+
+        def _slippage_price(self, name, is_buy, slippage, px):
+            return 101.0 if is_buy else 99.0
+
+        def bulk_orders(self, requests):
+            self.bulk_calls.append(requests)
+            statuses = [{"filled": {"totalSz": str(r["sz"])}} for r in requests]
+            statuses[1] = {"error": "Insufficient margin"}
+            return {"status": "ok", "response": {"type": "order", "data": {"statuses": statuses}}}
+
+    driver = exec_mod.HyperSDKDriver.__new__(exec_mod.HyperSDKDriver)
+    driver._exch = FakeExchange()
+    driver._market_slippage = driver._reduce_slippage = 0.01
+    svc = ExecService(driver=driver)
+    monkeypatch.setattr(svc, "_price", lambda venue, symbol: 0.0)
+
+    gen = positions_mod.store_generation()
+    out = svc.open_batch(
+        "0xB",
+        [
+            Order(symbol="ETH", size=1.0, side="buy"),
+            Order(symbol="BTC", size=0.1, side="sell"),
+            Order(symbol="SOL", size=2.0, side="sell", order_type="limit", limit_price=150.0),
+        ],
+    )
+    assert len(driver._exch.bulk_calls) == 1
+    reqs = driver._exch.bulk_calls[0]
+    assert [r["coin"] for r in reqs] == ["ETH", "BTC", "SOL"]
+    assert reqs[0]["order_type"] == {"limit": {"tif": "Ioc"}} and reqs[0]["limit_px"] == 101.0
+    assert reqs[2]["order_type"] == {"limit": {"tif": "Gtc"}} and reqs[2]["limit_px"] == 150.0
+
+    assert out["ok"] is False
+    assert [r["ok"] for r in out["results"]] == [True, False, True]
+    assert positions_mod.store_generation() == gen + 1
+    prof = get_profile("0xB")
+    assert prof["positions"] == {"ETH": 1.0, "SOL": -2.0}
+    ev = event_store.list("0xB")
+    assert [e["symbol"] for e in ev if e.get("type") == "fill"] == ["ETH", "SOL"]
+    assert ev[-1]["type"] == "exec_batch" and ev[-1]["status"] == "partial"
+
+
+def test_open_batch_rejects_all_legs_on_validation_error(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    monkeypatch.setenv("ENABLE_LIVE_EXEC", "1")
+    monkeypatch.setenv("EXEC_ALLOWED_SYMBOLS", "ETH")
+
+    class CountingDriver(FakeDriver):
+        calls = 0
+
+        def open(self, order: Order):
+            CountingDriver.calls += 1
+            return super().open(order)
+
+    svc = ExecService(driver=CountingDriver())
+    monkeypatch.setattr(svc, "_price", lambda venue, symbol: 0.0)
+    out = svc.open_batch("0xR", [Order(symbol="ETH", size=1.0, side="buy"), Order(symbol="DOGE", size=1.0, side="buy")])
+    assert out["ok"] is False
+    assert out["results"] == [{"index": 1, "symbol": "DOGE", "ok": False, "error": "symbol not allowed"}]
+    assert CountingDriver.calls == 0
+    assert get_profile("0xR")["positions"] == {}
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.exec_scheduler import SchedulerFull, VaultScheduler
+
+
+def test_same_vault_runs_in_order_without_overlap():
+    sched = VaultScheduler(max_workers=4, batch=2)
+    seen: list[int] = []
+    running = {"n": 0, "max": 0}
+    lock = threading.Lock()
+
+    def job(i: int):
+        def run():
+            with lock:
+                running["n"] += 1
+                running["max"] = max(running["max"], running["n"])
+            time.sleep(0.002)
+            seen.append(i)
+            with lock:
+                running["n"] -= 1
+            return i
+
+        return run
+
+    futures = [sched.submit("0xA", job(i)) for i in range(20)]
+    assert [f.result(5) for f in futures] == list(range(20))
+    assert seen == list(range(20))
+    assert running["max"] == 1
+    assert sched.join(5) and sched.stats()["pending"] == 0
+    sched.shutdown()
+
+
+def test_different_vaults_run_in_parallel():
+    sched = VaultScheduler(max_workers=2)
+    barrier = threading.Barrier(2, timeout=5)
+    # each job only finishes if the other vault's job is running at the same time
+    f1 = sched.submit("0xA", barrier.wait)
+    f2 = sched.submit("0xB", barrier.wait)
+    f1.result(5)
+    f2.result(5)
+    sched.shutdown()
+
+
+def test_busy_vault_does_not_starve_others_and_errors_propagate():
+    sched = VaultScheduler(max_workers=1, batch=1)
+    order: list[str] = []
+    gate = threading.Event()
+    sched.submit("0xA", lambda: gate.wait(5))
+    for i in range(3):
+        sched.submit("0xA", lambda i=i: order.append(f"a{i}"))
+    sched.submit("0xB", lambda: order.append("b0"))
+    gate.set()
+    assert sched.join(5)
+    assert order.index("b0") < order.index("a2")
+
+    def boom():
+        raise RuntimeError("venue down")
+
+    with pytest.raises(RuntimeError, match="venue down"):
+        sched.run("0xA", boom)
+    sched.shutdown()
+    # usable again after shutdown
+    assert sched.run("0xA", lambda: 7) == 7
+    sched.shutdown()
+
+
+def test_scheduler_caps_pending_jobs():
+    sched = VaultScheduler(max_workers=1, max_pending=1)
+    gate = threading.Event()
+    sched.submit("0xA", lambda: gate.wait(5))
+    with pytest.raises(SchedulerFull):
+        sched.submit("0xB", lambda: None)
+    gate.set()
+    assert sched.join(5)
+    sched.shutdown()
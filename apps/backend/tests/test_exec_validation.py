@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import threading
+import time
+
+import pytest
+
 from app.exec_service import ExecService
 from app.hyper_exec import Order
 
 
+def _wait_for(cond, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cond()
+
+
 def test_exec_validation_symbol_and_notional(monkeypatch, tmp_path):
     # Isolate positions file
     monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
@@ -131,3 +143,61 @@ def test_exec_retry_attempts(monkeypatch, tmp_path):
     out = svc.open("0xrv", Order(symbol="ETH", size=0.1, side="buy"))
     assert out["ok"] is True
     assert out.get("attempts") == 2
+
+
+def test_validation_uses_price_book_and_vault_overrides(monkeypatch, tmp_path):
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    monkeypatch.setenv("EXEC_ALLOWED_SYMBOLS", "ETH")
+    monkeypatch.setenv("EXEC_MAX_NOTIONAL_USD", "10000")
+    from app.price_provider import CachedPriceRouter
+
+    fetches = []
+    gate = threading.Event()
+    gate.set()
+
+    class FakePR:
+        def get_index_prices(self, symbols):
+            fetches.append(list(symbols))
+            gate.wait(2.0)
+            return {s: 2000.0 for s in symbols}
+
+    prices = CachedPriceRouter(FakePR(), ttl_seconds=60)
+    svc = ExecService(prices=prices)
+    # plain symbols fetched elsewhere land in the book under venue::SYMBOL
+    prices.get_index_prices(["ETH"])
+    fetches.clear()
+
+    overrides = {"0xrisk": {"allowedSymbols": "ETH,BTC", "maxNotionalUsd": 1000}}
+    svc.policies.set_override_source(lambda vid: overrides.get(vid))
+
+    svc._validate(Order(symbol="ETH", size=1.0, side="buy"), "0xother")
+    with pytest.raises(ValueError, match="notional exceeds"):
+        svc._validate(Order(symbol="ETH", size=1.0, side="buy"), "0xrisk")
+    svc._validate(Order(symbol="ETH", size=0.4, side="buy"), "0xrisk")
+    assert fetches == []
+
+    # BTC only allowed for the overridden vault; no cached price yet, so the
+    # order goes on unpriced while one fetch runs in the background
+    gate.clear()
+    svc._validate(Order(symbol="BTC", size=1.0, side="buy"), "0xrisk")
+    gate.set()
+    _wait_for(lambda: prices.peek("hyper::BTC", 60) is not None)
+    assert fetches == [["hyper::BTC"]]
+    with pytest.raises(ValueError, match="notional exceeds"):
+        svc._validate(Order(symbol="BTC", size=1.0, side="buy"), "0xrisk")
+
+    # a stale price is still used, and refreshed off the order path
+    prices.book["hyper::BTC"] = (100.0, time.time() - 3600)
+    prices.cache.clear()
+    gate.clear()
+    svc._validate(Order(symbol="BTC", size=1.0, side="buy"), "0xrisk")
+    gate.set()
+    _wait_for(lambda: prices.peek("hyper::BTC", 60) == 2000.0)
+    assert fetches == [["hyper::BTC"], ["hyper::BTC"]]
+    r = svc.open("0xother", Order(symbol="BTC", size=0.01, side="buy"))
+    assert r["ok"] is False and "symbol not allowed" in r["error"]
+
+    # a changed spec object is recompiled
+    overrides["0xrisk"] = {"allowedSymbols": "ETH"}
+    r = svc.open("0xrisk", Order(symbol="BTC", size=0.01, side="buy"))
+    assert r["ok"] is False and "symbol not allowed" in r["error"]
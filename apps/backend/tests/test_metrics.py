@@ -1,3 +1,5 @@
+from math import sqrt
+
 from app.metrics import compute_metrics
 
 
@@ -26,3 +28,179 @@ def test_metrics_drawdown_and_recovery():
     assert m["mdd"] < 0
     assert m["recovery_days"] > 0
 
+
+def test_rolling_stats_matches_compute_metrics():
+    from app.metrics import RollingStats
+
+    series = [
+        [1.0, 1.1, 1.2, 0.9, 0.95, 1.2],
+        [1.0, 1.01, 0.99, 1.03, 1.05],
+        [1.0, 0.8, 1.0, 0.7, 1.1, 1.0],
+        [1.0] * 10,
+    ]
+    for nav in series:
+        stats = RollingStats()
+        for v in nav:
+            stats.push(v)
+        got = stats.to_metrics()
+        want = compute_metrics(nav)
+        assert got["recovery_days"] == want["recovery_days"]
+        for key in ("ann_return", "ann_vol", "sharpe", "mdd"):
+            assert abs(got[key] - want[key]) < 1e-9, (nav, key)
+
+
+def test_snapshot_store_daily_metrics():
+    from app.snapshots import SnapshotStore
+
+    s = SnapshotStore()
+    assert s.metrics("v") is None
+    day = 86400.0
+    closes = [1.0, 1.1, 1.2, 0.9, 0.95, 1.2]
+    for i, v in enumerate(closes):
+        s.add("v", 5.0, i * day)  # intraday noise, superseded by the close
+        s.add("v", v, i * day + 60)
+    got = s.metrics("v")
+    want = compute_metrics(closes)
+    assert got["recovery_days"] == want["recovery_days"]
+    for key in ("ann_return", "ann_vol", "sharpe", "mdd"):
+        assert abs(got[key] - want[key]) < 1e-9
+
+
+def _loop_metrics(nav):
+    # straightforward reference for the vectorized implementation
+    r = [nav[i] / nav[i - 1] - 1.0 for i in range(1, len(nav)) if nav[i - 1] != 0]
+    n = len(r)
+    prod = 1.0
+    for ri in r:
+        prod *= 1.0 + ri
+    ann_return = prod ** (365.0 / n) - 1.0 if n > 0 else 0.0
+    m = sum(r) / n if n else 0.0
+    ann_vol = sqrt(sum((v - m) ** 2 for v in r) / (n - 1)) * sqrt(365.0) if n > 1 else 0.0
+    sharpe = ann_return / ann_vol if ann_vol > 1e-12 else 0.0
+    peak, mdd, peak_idx, trough_idx = nav[0], 0.0, 0, 0
+    for i, v in enumerate(nav):
+        if v > peak:
+            peak, peak_idx = v, i
+        if v / peak - 1.0 < mdd:
+            mdd, trough_idx = v / peak - 1.0, i
+    recovery_days = 0
+    if trough_idx > peak_idx:
+        for j in range(trough_idx, len(nav)):
+            if nav[j] >= nav[peak_idx]:
+                recovery_days = j - peak_idx
+                break
+    return {"ann_return": ann_return, "ann_vol": ann_vol, "sharpe": sharpe, "mdd": mdd, "recovery_days": recovery_days}
+
+
+def test_vectorized_metrics_match_loop():
+    import random
+
+    rng = random.Random(7)
+    cases = [[1.0, 1.1, 1.2, 0.9, 0.95, 1.2], [1.0, 0.0, 1.0, 2.0], [1.0, 0.8, 1.0, 0.7, 1.0]]
+    for _ in range(20):
+        nav = [1.0]
+        for _ in range(rng.randint(2, 300)):
+            nav.append(nav[-1] * (1.0 + rng.gauss(0.0, 0.02)))
+        cases.append(nav)
+    for nav in cases:
+        want = _loop_metrics(nav)
+        got = compute_metrics(nav)
+        assert got["recovery_days"] == want["recovery_days"]
+        assert got["mdd"] == want["mdd"]
+        for key in ("ann_return", "ann_vol", "sharpe"):
+            assert abs(got[key] - want[key]) <= 1e-12 * max(1.0, abs(want[key])), (nav, key)
+
+
+def test_compute_metrics_batch_pool():
+    from app.metrics import compute_metrics_batch, shutdown_pool
+
+    series = {f"v{i}": [1.0, 1.0 + i * 0.01, 1.0 + i * 0.02] for i in range(8)}
+    try:
+        pooled = compute_metrics_batch(series, pool_min_batch=4, workers=2)
+    finally:
+        shutdown_pool()
+    assert pooled == compute_metrics_batch(series, pool_min_batch=0)
+    assert list(pooled) == list(series)
+
+
+def test_metrics_batch_endpoint():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    c = TestClient(app)
+    r = c.post(
+        "/api/v1/metrics/batch",
+        json={"series": {"a": [1.0, 1.01, 1.02]}, "vaults": ["0xnohistory"]},
+    )
+    assert r.status_code == 200
+    body = r.json()["metrics"]
+    assert body["a"]["ann_return"] > 0
+    assert body["0xnohistory"]["ann_return"] == 0.0
+
+
+def test_rolling_metrics_match_window_slices():
+    import random
+
+    from app.metrics import RollingMetrics
+
+    rng = random.Random(11)
+    nav = [1.0]
+    for _ in range(120):
+        nav.append(nav[-1] * (1.0 + rng.gauss(0.0, 0.03)))
+    engine = RollingMetrics(nav)
+    w = 30
+    for end in range(w, len(nav)):
+        window = nav[end - w : end + 1]
+        want = compute_metrics(window)
+        got = engine.at(end, w)
+        for key in ("ann_return", "ann_vol", "sharpe"):
+            assert abs(got[key] - want[key]) <= 1e-9 * max(1.0, abs(want[key]))
+        peak = max(window)
+        assert abs(got["drawdown"] - (window[-1] / peak - 1.0)) < 1e-12
+        assert abs(got["mdd"] - want["mdd"]) < 1e-12
+
+
+def test_rolling_metrics_endpoint():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    c = TestClient(app)
+    vid = "0xrolling"
+    for i in range(40):
+        c.post(f"/api/v1/nav/snapshot/{vid}", params={"nav": 1.0 + 0.01 * i, "ts": i * 86400.0})
+    r = c.get(f"/api/v1/metrics/{vid}/rolling", params={"window": "30d"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["days"] == 30
+    assert len(body["series"]) == 10
+    assert body["latest"]["ann_return"] > 0 and body["latest"]["mdd"] == 0.0
+    assert c.get(f"/api/v1/metrics/{vid}/rolling", params={"window": "abc"}).status_code == 400
+
+
+def test_rolling_metrics_isolate_non_positive_nav():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.metrics import RollingMetrics
+
+    nav = [1.0, 1.1, -0.2, 0.5, 0.6, 0.66, 0.7]
+    engine = RollingMetrics(nav)
+    # windows spanning the wipe-out report a total loss, later ones are finite again
+    assert engine.at(3, 2)["ann_return"] == -1.0
+    want = compute_metrics(nav[4:7])["ann_return"]
+    assert abs(engine.at(6, 2)["ann_return"] - want) <= 1e-9 * abs(want)
+
+    c = TestClient(app)
+    vid = "0xrolling-neg"
+    for i, v in enumerate(nav[:4]):
+        c.post(f"/api/v1/nav/snapshot/{vid}", params={"nav": v, "ts": i * 86400.0})
+    first = c.get(f"/api/v1/metrics/{vid}/rolling", params={"window": "2"})
+    assert first.status_code == 200 and len(first.json()["series"]) == 2
+    # a new snapshot invalidates the cached engine
+    for i, v in enumerate(nav[4:], start=4):
+        c.post(f"/api/v1/nav/snapshot/{vid}", params={"nav": v, "ts": i * 86400.0})
+    body = c.get(f"/api/v1/metrics/{vid}/rolling", params={"window": "2"}).json()
+    assert len(body["series"]) == 5
+    assert abs(body["latest"]["ann_return"] - want) <= 1e-9 * abs(want)
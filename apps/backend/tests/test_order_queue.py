@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app.events import store as event_store
+from app.exec_scheduler import VaultScheduler
+from app.order_queue import OrderPipeline, OrderQueueFull
+
+
+def test_pipeline_runs_jobs_and_logs_status_events():
+    pipe = OrderPipeline(VaultScheduler(max_workers=2, max_pending=10))
+    vault = "0xpipe"
+    ok = pipe.submit(vault, "open", lambda: {"ok": True, "dry_run": True})
+    bad = pipe.submit(vault, "open", lambda: {"ok": False, "error": "symbol not allowed"})
+
+    def boom():
+        raise RuntimeError("venue down")
+
+    crashed = pipe.submit(vault, "close", boom)
+    assert ok["status"] == "queued" and ok["orderId"] != bad["orderId"]
+    pipe.join()
+
+    assert pipe.get(ok["orderId"])["status"] == "done"
+    assert pipe.get(ok["orderId"])["result"] == {"ok": True, "dry_run": True}
+    assert pipe.get(bad["orderId"])["status"] == "failed"
+    failed = pipe.get(crashed["orderId"])
+    assert failed["status"] == "failed" and failed["error"] == "venue down"
+    assert pipe.get("nope") is None
+
+    statuses = [e["status"] for e in event_store.list(vault) if e.get("type") == "order" and e["orderId"] == ok["orderId"]]
+    assert statuses == ["queued", "running", "done"]
+    assert pipe.stats()["completed"] == 1 and pipe.stats()["failed"] == 2
+    pipe.close()
+
+
+def test_pipeline_rejects_when_queue_full_and_trims_records():
+    pipe = OrderPipeline(VaultScheduler(max_workers=1, max_pending=2), retain=2)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def blocked():
+        started.set()
+        gate.wait(5)
+        return {"ok": True}
+
+    first = pipe.submit("0xfull", "open", blocked)
+    assert started.wait(5)
+    pipe.submit("0xfull", "open", lambda: {"ok": True})
+    with pytest.raises(OrderQueueFull):
+        pipe.submit("0xfull", "open", lambda: {"ok": True})
+    gate.set()
+    pipe.join()
+    pipe.submit("0xfull", "open", lambda: {"ok": True})
+    pipe.join()
+    # only the newest `retain` records are kept
+    assert pipe.get(first["orderId"]) is None
+    assert pipe.stats()["retained"] == 2
+    pipe.close()
+
+
+def test_pipeline_publishes_outside_its_lock_in_status_order(monkeypatch):
+    from app import order_queue
+
+    pipe = OrderPipeline(VaultScheduler(max_workers=2, max_pending=10))
+    seen = []
+
+    def add(vault, event):
+        # the pipeline lock is not reentrant, so this times out if the publisher holds it
+        free = pipe._lock.acquire(timeout=1)
+        if free:
+            pipe._lock.release()
+        seen.append((event["orderId"], event["status"], free))
+
+    monkeypatch.setattr(order_queue, "event_store", type("Store", (), {"add": staticmethod(add)})())
+    rec = pipe.submit("0xlock", "open", lambda: {"ok": True})
+    pipe.join()
+    pipe.close()
+    assert seen == [(rec["orderId"], s, True) for s in ("queued", "running", "done")]
@@ -37,3 +37,22 @@ def test_nav_uses_positions(tmp_path, monkeypatch):
     # cash 1000 + 1*1000 price = 2000, denom 1000 -> unit nav = 2.0
     assert all(abs(x - 2.0) < 1e-9 for x in nav)
 
+
+def test_concurrent_fills_across_vaults_keep_every_update(tmp_path, monkeypatch):
+    import threading
+
+    from app.positions import apply_fill, get_profile
+
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+
+    def fill(vault: str):
+        for _ in range(10):
+            apply_fill(vault, "ETH", 1.0, "buy")
+
+    threads = [threading.Thread(target=fill, args=(f"0xv{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for i in range(4):
+        assert get_profile(f"0xv{i}")["positions"]["ETH"] == 10.0
@@ -93,6 +93,43 @@ def test_quant_ws_includes_events_and_deltas(monkeypatch, tmp_path):
         assert delta["hyper::BTC"] == -1.0
 
 
+def test_quant_ws_pushes_events_without_waiting_for_interval(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "QUANT_API_KEYS", "alpha", raising=False)
+    monkeypatch.setattr(settings, "EXEC_ALLOWED_SYMBOLS", "ETH", raising=False)
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    from app import main as main_mod
+
+    quotes = []
+
+    class FakePrice:
+        def get_index_prices(self, symbols):
+            quotes.append(symbols)
+            return {s: 1500.0 for s in symbols}
+
+    monkeypatch.setattr(main_mod, "_price_provider", FakePrice())
+    pings = []
+    real_status = main_mod._collect_status_snapshot
+    monkeypatch.setattr(main_mod, "_collect_status_snapshot", lambda *a: pings.append(1) or real_status(*a))
+    vault = "vault-quant-push"
+    c = TestClient(app)
+    with c.websocket_connect(f"/ws/quant?vault={vault}&interval=30", headers={"X-Quant-Key": "alpha"}) as ws:
+        first = ws.receive_json()
+        assert first["events"] == []
+        assert event_store.bus.stats()["subscribers"] >= 1
+        started = time.monotonic()
+        event_store.add(vault, {"type": "exec_ack", "status": "ok"})
+        event_store.add(vault, {"type": "fill", "status": "applied"})
+        pushed = ws.receive_json()
+        assert time.monotonic() - started < 5.0  # far below the 30s interval
+        types = [e["type"] for e in pushed["events"]]
+        if types == ["exec_ack"]:
+            types += [e["type"] for e in ws.receive_json()["events"]]
+        assert types == ["exec_ack", "fill"]
+    # status (and its RPC ping) and prices are not refreshed per pushed event
+    assert len(pings) == 1
+    assert quotes == [["ETH"]]
+
+
 def test_quant_orders_require_flag(monkeypatch):
     monkeypatch.setattr(settings, "QUANT_API_KEYS", "alpha", raising=False)
     monkeypatch.setattr(settings, "ENABLE_QUANT_ORDERS", False, raising=False)
@@ -119,7 +156,7 @@ def test_quant_orders_open_close(monkeypatch):
             calls["close"] = (vault, symbol, size, venue)
             return {"ok": True}
 
-    monkeypatch.setattr(main_mod, "ExecService", lambda: DummySvc())
+    monkeypatch.setattr(main_mod, "exec_service", DummySvc())
     c = TestClient(app)
     resp = c.post(
         "/api/v1/quant/orders/open",
@@ -151,3 +188,59 @@ def test_quant_orders_open_close(monkeypatch):
     close_body = resp_close.json()
     assert close_body["venue"] == "mock_gold"
     assert calls["close"] == ("vault-open", "ETH", 1.0, "mock_gold")
+
+
+def test_quant_orders_batch_dry_run(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "QUANT_API_KEYS", "alpha", raising=False)
+    monkeypatch.setattr(settings, "ENABLE_QUANT_ORDERS", True, raising=False)
+    monkeypatch.setattr(settings, "QUANT_BATCH_MAX_LEGS", 2, raising=False)
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    monkeypatch.setattr(main_mod.exec_service, "_price", lambda venue, symbol: 0.0)
+    vault = "vault-batch"
+    c = TestClient(app)
+    legs = [
+        {"symbol": "ETH", "size": 1.0, "side": "buy"},
+        {"symbol": "BTC", "size": 0.5, "side": "sell"},
+    ]
+    resp = c.post("/api/v1/quant/orders/batch", json={"vault": vault, "legs": legs}, headers={"X-Quant-Key": "alpha"})
+    assert resp.status_code == 200
+    result = resp.json()["result"]
+    assert result["ok"] is True
+    assert [(r["index"], r["symbol"], r["dry_run"]) for r in result["results"]] == [(0, "ETH", True), (1, "BTC", True)]
+    positions = c.get("/api/v1/quant/positions", params={"vault": vault}, headers={"X-Quant-Key": "alpha"}).json()
+    assert positions["positionsFlat"]["hyper::ETH"] == 1.0
+    assert positions["positionsFlat"]["hyper::BTC"] == -0.5
+
+    too_many = c.post(
+        "/api/v1/quant/orders/batch",
+        json={"vault": vault, "legs": legs + legs[:1]},
+        headers={"X-Quant-Key": "alpha"},
+    )
+    assert too_many.status_code == 400
+
+
+def test_quant_orders_async_returns_order_id(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "QUANT_API_KEYS", "alpha", raising=False)
+    monkeypatch.setattr(settings, "ENABLE_QUANT_ORDERS", True, raising=False)
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    monkeypatch.setattr(main_mod.exec_service, "_price", lambda venue, symbol: 0.0)
+    vault = "vault-async"
+    c = TestClient(app)
+    resp = c.post(
+        "/api/v1/quant/orders/open",
+        params={"async": "1"},
+        json={"symbol": "ETH", "size": 1.0, "side": "buy", "vault": vault},
+        headers={"X-Quant-Key": "alpha"},
+    )
+    assert resp.status_code == 202
+    order_id = resp.json()["orderId"]
+    main_mod.order_pipeline.join()
+
+    status = c.get(f"/api/v1/quant/orders/{order_id}", headers={"X-Quant-Key": "alpha"})
+    assert status.status_code == 200
+    body = status.json()
+    assert body["status"] == "done" and body["result"]["dry_run"] is True
+    assert c.get("/api/v1/quant/orders/unknown", headers={"X-Quant-Key": "alpha"}).status_code == 404
+    types = [e.get("type") for e in event_store.list(vault)]
+    assert types.index("order") < types.index("exec_open")
+    assert [e["status"] for e in event_store.list(vault) if e.get("type") == "order"] == ["queued", "running", "done"]
@@ -40,3 +40,26 @@ def test_vaults_from_positions_and_detail(tmp_path, monkeypatch):
     assert abs(body["unitNav"] - 3.0) < 1e-9
     assert body["aum"] == 3000
     assert body["totalShares"] == 1000
+
+
+def test_vault_index_cached_until_files_change(tmp_path, monkeypatch):
+    import json
+
+    from app import main as main_mod
+    from app.positions import set_profile
+
+    monkeypatch.setattr(main_mod, "REPO_ROOT", tmp_path, raising=False)
+    monkeypatch.setenv("POSITIONS_FILE", str(tmp_path / "positions.json"))
+    set_profile("0xa", {"cash": 1.0, "positions": {}})
+    first = main_mod._vault_index()
+    assert main_mod._vault_index() is first
+    assert set(first) == {"0xa"}
+
+    set_profile("0xb", {"cash": 1.0, "positions": {}})
+    assert set(main_mod._vault_index()) == {"0xa", "0xb"}
+
+    dep = tmp_path / "deployments" / "hyper-testnet.json"
+    dep.parent.mkdir(parents=True, exist_ok=True)
+    dep.write_text(json.dumps({"deployments": [{"vault": "0xb", "type": "public", "name": "B"}]}))
+    index = main_mod._vault_index()
+    assert index["0xb"]["type"] == "public" and index["0xb"]["name"] == "B"
@@ -62,3 +62,37 @@ def test_vault_risk_creates_entry(monkeypatch, tmp_path):
     doc = json.loads((tmp_path / "deployments" / "hyper-testnet.json").read_text())
     assert doc["deployments"][0]["vault"] == "0xNEW"
     assert doc["deployments"][0]["risk"]["minLeverage"] == 2.0
+
+
+def test_vault_risk_uses_cached_deployments_model(monkeypatch, tmp_path):
+    from app import main as main_mod
+
+    monkeypatch.setattr(main_mod, "REPO_ROOT", tmp_path, raising=False)
+    _seed_deployments(
+        tmp_path,
+        {"deployments": [{"vault": "0xAbC", "risk": {"maxLeverage": 3.0}}]},
+    )
+
+    def no_ping(self):
+        raise AssertionError("risk endpoints must not hit the RPC")
+
+    monkeypatch.setattr(main_mod.HyperHTTP, "rpc_ping", no_ping)
+    parses = []
+    real_build = main_mod._build_deployments_model
+    monkeypatch.setattr(
+        main_mod, "_build_deployments_model", lambda f: parses.append(f) or real_build(f)
+    )
+    client = TestClient(app)
+    for _ in range(3):
+        data = client.get("/api/v1/vaults/0xabc/risk").json()
+        assert data["effective"]["maxLeverage"] == 3.0
+    assert len(parses) == 1
+
+    # external edits are picked up via the file signature
+    _seed_deployments(
+        tmp_path,
+        {"deployments": [{"vault": "0xAbC", "risk": {"maxLeverage": 4.0, "minLeverage": 1.5}}]},
+    )
+    data = client.get("/api/v1/vaults/0xABC/risk").json()
+    assert data["effective"]["maxLeverage"] == 4.0
+    assert data["override"]["minLeverage"] == 1.5
@@ -57,3 +57,53 @@ def test_snapshot_compute_when_nav_omitted(tmp_path, monkeypatch):
     r2 = c.get(f"/api/v1/nav/{vid}", params={"window": 1})
     assert r2.status_code == 200
     assert abs(r2.json()["nav"][0] - 3.0) < 1e-9
+
+
+def test_snapshot_rollups_ohlc():
+    from app.snapshots import SnapshotStore
+
+    s = SnapshotStore(capacity=2)
+    for ts, nav in [(0.0, 1.0), (30.0, 1.3), (45.0, 0.8), (70.0, 1.1), (20.0, 0.7)]:
+        s.add("v", nav, ts)
+    # raw store is truncated, rollups keep the full history
+    assert len(s.get("v", window=10)) == 2
+    assert s.get_rollup("v", "1m") == [(0.0, 1.0, 1.3, 0.7, 0.8), (60.0, 1.1, 1.1, 1.1, 1.1)]
+    assert s.get_rollup("v", "1h") == [(0.0, 1.0, 1.3, 0.7, 1.1)]
+    assert s.get_rollup("v", "1m", since_ts=65.0) == [(60.0, 1.1, 1.1, 1.1, 1.1)]
+    assert s.get_rollup("v", "1m", window=1) == [(60.0, 1.1, 1.1, 1.1, 1.1)]
+
+
+def test_nav_series_resolution():
+    c = TestClient(app)
+    vid = "0xrollup"
+    day = 86400.0
+    for i in range(400):
+        c.post(f"/api/v1/nav/snapshot/{vid}", params={"nav": 1.0 + i * 0.001, "ts": i * day / 2})
+    r = c.get(f"/api/v1/nav_series/{vid}", params={"resolution": "1d"})
+    assert r.status_code == 200
+    series = r.json()["series"]
+    assert len(series) == 200
+    assert series[0]["open"] == 1.0 and series[0]["close"] == 1.001
+    bad = c.get(f"/api/v1/nav_series/{vid}", params={"resolution": "5s"})
+    assert bad.status_code == 400
+
+
+def test_snapshot_store_concurrent_adds_keep_every_bucket_count():
+    import threading
+
+    from app.snapshots import SnapshotStore
+
+    s = SnapshotStore(capacity=10_000)
+
+    def writer(k: int) -> None:
+        for i in range(500):
+            s.add("v", 1.0 + (i % 7) * 0.01, float(k * 1000 + i))
+
+    threads = [threading.Thread(target=writer, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        s.metrics("v")
+        t.join()
+    assert len(s.get("v", window=10_000)) == 2000
+    assert sum(b[5] for b in s._rollups["v"]["1m"]) == 2000
@@ -26,7 +26,8 @@ def test_process_user_event_applies(monkeypatch, tmp_path):
     register_listener_vault(vid)
     event_store._events.clear()
     evt = {"fills": [{"name": "ETH", "dir": True, "sz": 1.0}]}
-    process_user_event(vid, evt)
+    for fut in process_user_event(vid, evt):
+        fut.result(5)
     events = event_store.list(vid)
     assert any(e.get("type") == "fill" and e.get("source") == "ws" for e in events)
 
@@ -38,7 +39,8 @@ def test_process_user_event_logs_ws_source(monkeypatch, tmp_path):
     register_listener_vault(vid)
     event_store._events.clear()
     evt = {"fills": [{"name": "BTC", "side": "sell", "sz": 0.5}]}
-    process_user_event(vid, evt)
+    for fut in process_user_event(vid, evt):
+        fut.result(5)
     events = event_store.list(vid)
     assert any(e.get("type") == "fill" and e.get("source") == "ws" for e in events)
     ts = last_ws_event(vid)